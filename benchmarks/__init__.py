@@ -0,0 +1 @@
+"""Benchmarks de la API (arranque, endpoints, carga de datos)."""
@@ -0,0 +1,118 @@
+"""
+Mide el costo de arranque de la API en cada STARTUP_MODO:
+
+- tiempo de `import src.main`
+- tiempo del lifespan (startup) hasta poder atender requests
+- latencia del primer request a cada ruta pedida
+- qué dependencias pesadas quedaron cargadas
+
+Cada modo corre en un subproceso limpio. Uso:
+
+    python -m benchmarks.arranque
+    python -m benchmarks.arranque --rutas / /reportes/total --repeticiones 5
+
+Los tres modos son de la versión actual de la API: "eager" carga motor y
+renderizadores en el lifespan, antes de atender, pero los imports de los
+routers ya son perezosos. No mide el costo de import de versiones
+anteriores, que importaban openpyxl / reportlab / matplotlib al cargar los
+routers; para compararlas, correr este script sobre cada versión.
+`pesados_tras_import` muestra qué dependencias de PESADOS carga el solo
+`import src.main` (debería quedar vacío).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+MODOS = ["eager", "lazy", "warmup"]
+PESADOS = ["numpy", "pandas", "pyarrow", "matplotlib", "reportlab", "openpyxl"]
+
+
+def medir_en_este_proceso(rutas):
+    import asyncio
+    import time
+
+    t0 = time.perf_counter()
+    from src.main import app
+    importacion = time.perf_counter() - t0
+    cargados = [m for m in PESADOS if m in sys.modules]
+
+    from benchmarks.asgi import ClienteASGI
+
+    async def correr():
+        cliente = ClienteASGI(app)
+        t1 = time.perf_counter()
+        await cliente.iniciar()
+        lifespan = time.perf_counter() - t1
+
+        primeros = {}
+        for ruta in rutas:
+            status, _, _, _, total = await cliente.get(ruta)
+            primeros[ruta] = {"status": status, "segundos": total}
+        listo = time.perf_counter() - t0
+        await cliente.cerrar()
+        return lifespan, primeros, listo
+
+    lifespan, primeros, listo = asyncio.run(correr())
+    return {
+        "importacion": importacion,
+        "lifespan": lifespan,
+        "primer_request": primeros,
+        "hasta_primer_respuesta": importacion + lifespan + next(iter(primeros.values()))["segundos"],
+        "total": listo,
+        "pesados_tras_import": cargados,
+    }
+
+
+def medir_modo(modo, rutas):
+    entorno = dict(os.environ, STARTUP_MODO=modo)
+    salida = subprocess.run(
+        [sys.executable, "-m", "benchmarks.arranque", "--hijo", "--rutas", *rutas],
+        env=entorno, capture_output=True, text=True, check=True,
+    )
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rutas", nargs="+", default=["/"])
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--modos", nargs="+", default=MODOS, choices=MODOS)
+    parser.add_argument("--salida", help="archivo JSON donde guardar los resultados")
+    parser.add_argument("--hijo", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.hijo:
+        print(json.dumps(medir_en_este_proceso(args.rutas)))
+        return
+
+    resultados = {}
+    for modo in args.modos:
+        corridas = [medir_modo(modo, args.rutas) for _ in range(args.repeticiones)]
+        resultados[modo] = {
+            "importacion_s": statistics.median(c["importacion"] for c in corridas),
+            "lifespan_s": statistics.median(c["lifespan"] for c in corridas),
+            "hasta_primer_respuesta_s": statistics.median(c["hasta_primer_respuesta"] for c in corridas),
+            "primer_request_s": {
+                ruta: statistics.median(c["primer_request"][ruta]["segundos"] for c in corridas)
+                for ruta in args.rutas
+            },
+            "pesados_tras_import": corridas[-1]["pesados_tras_import"],
+        }
+
+    print(f"{'modo':<8} {'import':>9} {'lifespan':>9} {'1ra resp.':>10}  pesados tras import")
+    for modo, r in resultados.items():
+        print(
+            f"{modo:<8} {r['importacion_s']:>8.3f}s {r['lifespan_s']:>8.3f}s "
+            f"{r['hasta_primer_respuesta_s']:>9.3f}s  {', '.join(r['pesados_tras_import']) or '-'}"
+        )
+
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import asyncio
+import time
+
+
+class ClienteASGI:
+    """
+    Cliente mínimo que habla ASGI directamente con la app (sin red ni
+    httpx): corre el lifespan y permite hacer requests midiendo tiempos.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.estado = {}
+        self._entrada = None
+        self._salida = None
+        self._tarea = None
+
+    async def iniciar(self):
+        self._entrada = asyncio.Queue()
+        self._salida = asyncio.Queue()
+        scope = {"type": "lifespan", "asgi": {"version": "3.0"}, "state": self.estado}
+        self._tarea = asyncio.create_task(self.app(scope, self._entrada.get, self._salida.put))
+        await self._entrada.put({"type": "lifespan.startup"})
+        mensaje = await self._salida.get()
+        if mensaje["type"] != "lifespan.startup.complete":
+            raise RuntimeError(f"Falló el arranque: {mensaje}")
+
+    async def cerrar(self):
+        await self._entrada.put({"type": "lifespan.shutdown"})
+        await self._salida.get()
+        await self._tarea
+
+    async def get(self, ruta: str, headers: dict | None = None):
+        """
+        Devuelve (status, headers, cuerpo, segundos_hasta_primer_byte,
+        segundos_totales)
+        """
+        path, _, query = ruta.partition("?")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "root_path": "",
+            "query_string": query.encode(),
+            "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+            "client": ("127.0.0.1", 0),
+            "server": ("127.0.0.1", 8000),
+            "state": dict(self.estado),
+        }
+
+        enviado = False
+
+        async def recibir():
+            nonlocal enviado
+            if not enviado:
+                enviado = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await asyncio.Event().wait()  # sin desconexión del cliente
+
+        partes = []
+        inicio = {}
+        primer_byte = None
+        t0 = time.perf_counter()
+
+        async def enviar(mensaje):
+            nonlocal primer_byte
+            if mensaje["type"] == "http.response.start":
+                inicio.update(mensaje)
+            elif mensaje["type"] == "http.response.body":
+                if primer_byte is None:
+                    primer_byte = time.perf_counter() - t0
+                partes.append(mensaje.get("body", b""))
+
+        await self.app(scope, recibir, enviar)
+        total = time.perf_counter() - t0
+        cabeceras = {k.decode(): v.decode() for k, v in inicio.get("headers", [])}
+        return inicio.get("status"), cabeceras, b"".join(partes), primer_byte or total, total
@@ -0,0 +1,198 @@
+"""
+Base local (SQLite, o una MySQL de pruebas) que reemplaza a la de
+producción en los benchmarks.
+
+Crea tablas base (categorías, instituciones, sedes, actividades,
+adolescentes, inscripciones) y, encima, las dos vistas de reportes con
+las mismas columnas que VistaActividad / VistaEdadSexo, así la API corre
+sin cambios apuntando DATABASE_URL a la base. Los datos salen de
+benchmarks/generador_datos.py.
+
+Uso:
+
+    python -m benchmarks.base_local --filas 100000 --archivo /tmp/bench.db
+"""
+import argparse
+import math
+import os
+import tempfile
+import time
+
+from sqlalchemy import Column, Index, Integer, MetaData, String, Table, create_engine, event, inspect, text
+
+from benchmarks.generador_datos import GeneradorDatos, cargar, filas_confirmadas_por_adolescente
+from src.models.models_orm import ResumenConteo, ResumenEstado
+from src.reports import snapshots
+
+metadata = MetaData()
+
+Table("categorias", metadata,
+      Column("id", Integer, primary_key=True),
+      Column("valor", String(255)))
+Table("instituciones", metadata,
+      Column("id", Integer, primary_key=True),
+      Column("valor", String(200)))
+Table("sedes", metadata,
+      Column("id", Integer, primary_key=True),
+      Column("valor", String(200)),
+      Column("direccion", String(255)),
+      Column("institucion_id", Integer),
+      Index("ix_sedes_institucion", "institucion_id", "id"))
+Table("actividades", metadata,
+      Column("id", Integer, primary_key=True),
+      Column("valor", String(255)),
+      Column("vigente", Integer),
+      Column("categoria_id", Integer),
+      Index("ix_actividades_categoria", "categoria_id", "id"))
+Table("adolescentes", metadata,
+      Column("id", Integer, primary_key=True),
+      Column("nombre", String(100)),
+      Column("apellido", String(100)),
+      Column("dni", String(20)),
+      Column("fecha_nacimiento", String(20)),
+      Column("genero", String(20)))
+Table("inscripciones", metadata,
+      Column("id", Integer, primary_key=True, autoincrement=True),
+      Column("adolescente_id", Integer),
+      Column("sede_id", Integer),
+      Column("actividad_id", Integer),
+      Column("dia", String(50)),
+      Column("horario", String(100)),
+      Column("confirmada", Integer),
+      Index("ix_inscripciones_adolescente", "adolescente_id"),
+      Index("ix_inscripciones_sede", "sede_id", "adolescente_id"),
+      Index("ix_inscripciones_actividad", "actividad_id", "adolescente_id"))
+
+# Edad al 2025 a partir de fecha_nacimiento ('AAAA-MM-DD'), por dialecto
+EDAD = {
+    "sqlite": "2025 - CAST(substr(a.fecha_nacimiento, 1, 4) AS INTEGER)",
+    "mysql": "2025 - YEAR(a.fecha_nacimiento)",
+}
+
+VISTA_ACTIVIDAD = """
+CREATE VIEW vista_adolescentes_confirmados_segun_actividad AS
+SELECT
+    a.id AS id_adolescente,
+    a.nombre AS Nombre,
+    a.apellido AS Apellido,
+    a.dni AS DNI,
+    i.valor AS Institucion,
+    s.valor AS Sede,
+    ac.valor AS Actividad,
+    ins.dia AS Dia,
+    ins.horario AS Horario,
+    c.id AS categoria_id,
+    c.valor AS Categoria
+FROM inscripciones ins
+JOIN adolescentes a ON a.id = ins.adolescente_id
+JOIN sedes s ON s.id = ins.sede_id
+JOIN instituciones i ON i.id = s.institucion_id
+JOIN actividades ac ON ac.id = ins.actividad_id
+JOIN categorias c ON c.id = ac.categoria_id
+WHERE ins.confirmada = 1
+"""
+
+VISTA_EDAD_SEXO = """
+CREATE VIEW vista_adolescentes_confirmados_segun_edad_sexo AS
+SELECT
+    a.id AS id_adolescente,
+    a.nombre AS Nombre,
+    a.apellido AS Apellido,
+    a.dni AS DNI,
+    a.fecha_nacimiento AS fecha_nacimiento,
+    {edad} AS edad2025,
+    a.genero AS genero,
+    CASE
+        WHEN {edad} <= 14 THEN '12 a 14'
+        WHEN {edad} <= 17 THEN '15 a 17'
+        ELSE '18 o más'
+    END AS tramo_edad
+FROM adolescentes a
+WHERE EXISTS (
+    SELECT 1 FROM inscripciones ins
+    WHERE ins.adolescente_id = a.id AND ins.confirmada = 1
+)
+"""
+
+VISTAS = [
+    "vista_adolescentes_confirmados_segun_actividad",
+    "vista_adolescentes_confirmados_segun_edad_sexo",
+]
+
+
+def ruta_por_defecto(filas: int) -> str:
+    return os.path.join(tempfile.gettempdir(), "bench_estadisticas", f"base_{filas}.db")
+
+
+def crear_esquema(engine, reemplazar: bool = False):
+    """
+    Crea tablas, vistas y tablas resumen. Si alguna tabla ya existe
+    falla, salvo con `reemplazar` (nunca apuntar esto a la base de
+    producción).
+    """
+    existentes = set(inspect(engine).get_table_names()) & set(metadata.tables)
+    if existentes and not reemplazar:
+        raise RuntimeError(f"Ya existen {sorted(existentes)}; usar reemplazar=True para borrarlas")
+
+    with engine.begin() as conexion:
+        for vista in VISTAS:
+            conexion.execute(text(f"DROP VIEW IF EXISTS {vista}"))
+        metadata.drop_all(conexion)
+        for tabla in (ResumenConteo.__table__, ResumenEstado.__table__):
+            tabla.drop(conexion, checkfirst=True)
+        metadata.create_all(conexion)
+        edad = EDAD.get(engine.dialect.name, EDAD["mysql"])
+        conexion.execute(text(VISTA_ACTIVIDAD))
+        conexion.execute(text(VISTA_EDAD_SEXO.format(edad=edad)))
+        # Tablas resumen de los snapshots (en MySQL: sql/resumen_snapshots.sql)
+        snapshots.crear_tablas(conexion)
+
+
+def _sqlite_sin_diario(conexion_dbapi, _):
+    # Sólo para la siembra: sin journal ni fsync
+    conexion_dbapi.execute("PRAGMA journal_mode = OFF")
+    conexion_dbapi.execute("PRAGMA synchronous = OFF")
+
+
+def crear_base(archivo: str, filas: int, semilla: int = 0, regenerar: bool = False) -> str:
+    """
+    Crea (o reutiliza) la base SQLite con aproximadamente `filas` filas
+    en la vista por actividad.
+
+    Returns:
+        la ruta del archivo
+    """
+    if os.path.exists(archivo) and not regenerar:
+        return archivo
+    os.makedirs(os.path.dirname(os.path.abspath(archivo)), exist_ok=True)
+    if os.path.exists(archivo):
+        os.remove(archivo)
+
+    engine = create_engine(f"sqlite:///{archivo}")
+    event.listen(engine, "connect", _sqlite_sin_diario)
+    try:
+        crear_esquema(engine)
+        adolescentes = max(1, math.ceil(filas / filas_confirmadas_por_adolescente()))
+        cargar(engine, GeneradorDatos(adolescentes, semilla=semilla))
+        with engine.begin() as conexion:
+            conexion.execute(text("ANALYZE"))
+    finally:
+        engine.dispose()
+    return archivo
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, default=100_000)
+    parser.add_argument("--archivo", help="por defecto, en el directorio temporal")
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+
+    archivo = args.archivo or ruta_por_defecto(args.filas)
+    t0 = time.perf_counter()
+    crear_base(archivo, args.filas, args.semilla, regenerar=True)
+    print(f"{archivo}: {args.filas} filas en {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Filas por segundo de StorageUtils.dataframe_to_database en cada modo
+(to_sql de pandas, lotes, lotes en paralelo, LOAD DATA, upsert), sobre
+un DataFrame de adolescentes sintéticos (benchmarks/generador_datos.py).
+
+Por defecto escribe en una SQLite temporal, que hace de reemplazo local
+de MySQL; con --url se mide contra otra base (los modos 'hilos' y
+'load_data' sólo tienen sentido en MySQL). 'load_data' se mide sólo con
+MYSQL_LOCAL_INFILE=true (y local_infile habilitado en el servidor): si
+no, StorageUtils cargaría por lotes y el resultado quedaría mal rotulado.
+Uso:
+
+    python -m benchmarks.carga_masiva --filas 200000
+    MYSQL_LOCAL_INFILE=true python -m benchmarks.carga_masiva --filas 1000000 --url mysql+pymysql://u:p@host/pruebas --hilos 4
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, make_url, text
+from sqlalchemy.orm import Session
+
+from benchmarks.generador_datos import GeneradorDatos
+from config.settings import MySQLConfig
+from src.utils.storage_utils import StorageUtils
+
+TABLA = "bench_carga_adolescentes"
+COLUMNAS = ["id", "nombre", "apellido", "dni", "fecha_nacimiento", "genero"]
+
+
+def crear_tabla(engine):
+    """Tabla destino con clave primaria (la necesita el upsert en SQLite)"""
+    metadata = MetaData()
+    tabla = Table(TABLA, metadata,
+                  Column("id", Integer, primary_key=True, autoincrement=False),
+                  Column("nombre", String(100)),
+                  Column("apellido", String(100)),
+                  Column("dni", String(20)),
+                  Column("fecha_nacimiento", String(20)),
+                  Column("genero", String(20)))
+    metadata.drop_all(engine, tables=[tabla])
+    metadata.create_all(engine, tables=[tabla])
+
+
+def generar(filas: int, semilla: int) -> pd.DataFrame:
+    generador = GeneradorDatos(filas, semilla=semilla)
+    return pd.DataFrame([fila for lote in generador.lotes_adolescentes() for fila in lote], columns=COLUMNAS)
+
+
+def medir(engine, df, vaciar: bool = True, **opciones) -> dict:
+    if vaciar:
+        with engine.begin() as conexion:
+            conexion.execute(text(f"DELETE FROM {TABLA}"))
+    with Session(bind=engine) as sesion:
+        t0 = time.perf_counter()
+        StorageUtils.dataframe_to_database(df, TABLA, sesion, if_exists="append", **opciones)
+        segundos = time.perf_counter() - t0
+    return {"segundos": segundos, "filas_por_s": len(df) / segundos}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, default=200_000)
+    parser.add_argument("--url", help="por defecto, una SQLite en el directorio temporal")
+    parser.add_argument("--chunksize", type=int, default=10_000)
+    parser.add_argument("--hilos", type=int, default=4)
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+
+    archivo = None
+    if args.url:
+        url = args.url
+    else:
+        archivo = os.path.join(tempfile.gettempdir(), "bench_carga_masiva.db")
+        if os.path.exists(archivo):
+            os.remove(archivo)
+        url = f"sqlite:///{archivo}"
+
+    opciones = {}
+    if make_url(url).get_backend_name() == "mysql":
+        # LOAD DATA LOCAL INFILE lo tiene que habilitar también el cliente
+        opciones["connect_args"] = {"local_infile": MySQLConfig.LOCAL_INFILE}
+    engine = create_engine(url, **opciones)
+    dialecto = engine.dialect.name
+    df = generar(args.filas, args.semilla)
+    crear_tabla(engine)
+
+    escenarios = [
+        ("to_sql (pandas)", dict(modo="to_sql"), True),
+        (f"lotes de {args.chunksize}", dict(modo="lotes", chunksize=args.chunksize), True),
+    ]
+    if dialecto != "sqlite":
+        escenarios.append((f"lotes, {args.hilos} hilos", dict(modo="lotes", chunksize=args.chunksize, hilos=args.hilos), True))
+    if dialecto == "mysql" and MySQLConfig.LOCAL_INFILE:
+        escenarios.append(("load_data", dict(modo="load_data", chunksize=args.chunksize), True))
+    elif dialecto == "mysql":
+        print("load_data omitido: requiere MYSQL_LOCAL_INFILE=true")
+    # Sobre la tabla ya cargada: todas las filas existen y se actualizan
+    escenarios.append(("upsert (filas existentes)", dict(modo="lotes", chunksize=args.chunksize, upsert=True), False))
+
+    try:
+        print(f"{len(df)} filas -> {dialecto}")
+        base = None
+        for nombre, opciones, vaciar in escenarios:
+            r = medir(engine, df, vaciar, **opciones)
+            base = base or r["filas_por_s"]
+            print(f"{nombre:<28} {r['segundos']:>7.2f}s {r['filas_por_s']:>12,.0f} filas/s  x{r['filas_por_s'] / base:.1f}")
+    finally:
+        engine.dispose()
+        if archivo:
+            os.remove(archivo)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""
+Mide cada endpoint GET de /reportes, /reportes-excel y /reportes-pdf
+contra una base SQLite local sembrada a distintas escalas (ver
+benchmarks/base_local.py), vía ASGI en proceso:
+
+- latencia del primer request en un proceso recién arrancado
+  (STARTUP_MODO=lazy: motor, imports y renderizadores sin precargar)
+- latencia p50 / p95 / máx. de requests secuenciales
+- throughput (requests/s) con N requests concurrentes
+- memoria: pico de tracemalloc durante un request y RSS máximo del proceso
+
+Cada escala corre en dos subprocesos limpios (la configuración se lee al
+importar la app):
+
+- sin cache: CACHE_TTL=0, cache de gráficos deshabilitado y un parámetro
+  distinto en cada request, así ningún request se sirve de CacheRespuestas
+  ni del cache de PNG. Mide el costo real de cada endpoint.
+- cache caliente: configuración por defecto; después del primer request
+  las respuestas salen del cache.
+
+Los snapshots de /reportes se refrescan antes de medir y el refresco
+periódico queda apagado (SNAPSHOT_REFRESCO=0), para que no corra en
+paralelo con las mediciones. Uso:
+
+    python -m benchmarks.endpoints --escalas 10000 100000 --salida res.json
+    python -m benchmarks.endpoints --escalas 1000000 --rutas /reportes/total --comparar res.json
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+PREFIJOS = ("/reportes", "/reportes-excel", "/reportes-pdf")
+ESCALAS = [10_000, 100_000, 1_000_000]
+
+# Valores de ejemplo para las rutas con parámetros de path
+PARAMETROS_RUTA = {"dimension": "institucion"}
+
+# Entorno de la corrida sin cache (ver docstring)
+ENTORNO_SIN_CACHE = {
+    "CACHE_TTL": "0",
+    "CACHE_TTL_ENDPOINTS": "",
+    "GRAFICOS_CACHE_MEMORIA_ENTRADAS": "0",
+    "GRAFICOS_CACHE_DISCO_BYTES": "0",
+}
+
+
+def descubrir_rutas(app) -> list:
+    """GET de los routers de reportes, con los parámetros de path completados"""
+    rutas = []
+    for ruta in app.routes:
+        path = getattr(ruta, "path", "")
+        if "GET" not in getattr(ruta, "methods", ()) or not path.startswith(PREFIJOS):
+            continue
+        rutas.append(path.format(**PARAMETROS_RUTA))
+    return rutas
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+def _rss_maximo_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(maximo / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _urls(ruta: str, sin_cache: bool):
+    """La misma ruta, o con un parámetro distinto cada vez (clave de cache nueva)"""
+    if not sin_cache:
+        return itertools.repeat(ruta)
+    separador = "&" if "?" in ruta else "?"
+    return (f"{ruta}{separador}_sin_cache={n}" for n in itertools.count())
+
+
+async def medir_ruta(cliente, ruta, repeticiones, concurrencia, sin_cache=False):
+    import tracemalloc
+
+    urls = _urls(ruta, sin_cache)
+
+    # Primer request a la ruta
+    status, _, cuerpo, _, frio = await cliente.get(next(urls))
+
+    # Secuencial
+    tiempos = []
+    for _ in range(repeticiones):
+        _, _, _, _, total = await cliente.get(next(urls))
+        tiempos.append(total)
+
+    # Concurrente
+    t0 = time.perf_counter()
+    await asyncio.gather(*(cliente.get(next(urls)) for _ in range(concurrencia)))
+    throughput = concurrencia / (time.perf_counter() - t0)
+
+    # Memoria de un request (tracemalloc agrega overhead: se mide aparte)
+    tracemalloc.start()
+    await cliente.get(next(urls))
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "status": status,
+        "bytes": len(cuerpo),
+        "frio_s": frio,
+        "p50_s": statistics.median(tiempos),
+        "p95_s": _percentil(tiempos, 95),
+        "max_s": max(tiempos),
+        "requests_por_s": throughput,
+        "pico_memoria_mb": round(pico / (1024 * 1024), 2),
+    }
+
+
+def medir_en_este_proceso(rutas, repeticiones, concurrencia, sin_cache):
+    from benchmarks.asgi import ClienteASGI
+    from src.main import app
+
+    async def correr():
+        cliente = ClienteASGI(app)
+        await cliente.iniciar()
+        try:
+            resultados = {}
+            for ruta in rutas or descubrir_rutas(app):
+                resultados[ruta] = await medir_ruta(cliente, ruta, repeticiones, concurrencia, sin_cache)
+            return resultados
+        finally:
+            await cliente.cerrar()
+
+    resultados = asyncio.run(correr())
+    return {"rutas": resultados, "rss_maximo_mb": _rss_maximo_mb()}
+
+
+def refrescar_snapshots(archivo: str):
+    """Deja los snapshots al día, como los tendría la API en producción"""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    from src.reports import snapshots
+
+    engine = create_engine(f"sqlite:///{archivo}")
+    try:
+        with Session(bind=engine) as sesion:
+            snapshots.refrescar_todo(sesion)
+    finally:
+        engine.dispose()
+
+
+def _correr_hijo(archivo, args, sin_cache: bool) -> dict:
+    with tempfile.TemporaryDirectory(prefix="bench_graficos_") as graficos:
+        entorno = dict(
+            os.environ,
+            DATABASE_URL=f"sqlite:///{archivo}",
+            DB_MODO="sync",
+            STARTUP_MODO="lazy",
+            SNAPSHOT_REFRESCO="0",
+            # Cache de gráficos en disco vacío en cada corrida
+            GRAFICOS_DIRECTORIO=graficos,
+        )
+        if sin_cache:
+            entorno.update(ENTORNO_SIN_CACHE)
+        # El registro de consultas lentas pediría EXPLAIN en segundo plano
+        entorno.setdefault("CONSULTAS_LENTAS_HABILITADO", "false")
+        comando = [
+            sys.executable, "-m", "benchmarks.endpoints", "--hijo",
+            "--repeticiones", str(args.repeticiones), "--concurrencia", str(args.concurrencia),
+        ]
+        if sin_cache:
+            comando.append("--sin-cache")
+        if args.rutas:
+            comando += ["--rutas", *args.rutas]
+        salida = subprocess.run(comando, env=entorno, capture_output=True, text=True, check=True)
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def medir_escala(filas, args):
+    from benchmarks.base_local import crear_base, ruta_por_defecto
+
+    archivo = ruta_por_defecto(filas) if not args.directorio else os.path.join(args.directorio, f"base_{filas}.db")
+    t0 = time.perf_counter()
+    crear_base(archivo, filas, args.semilla, regenerar=args.regenerar)
+    refrescar_snapshots(archivo)
+    siembra = time.perf_counter() - t0
+
+    resultado = _correr_hijo(archivo, args, sin_cache=True)
+    caliente = _correr_hijo(archivo, args, sin_cache=False)
+    resultado["rutas_cache"] = caliente["rutas"]
+    resultado["rss_maximo_cache_mb"] = caliente["rss_maximo_mb"]
+    resultado["siembra_s"] = siembra
+    return resultado
+
+
+def imprimir(escalas, anterior=None):
+    print(f"{'':>9} {'':<42} {'sin cache':-^44} {'cache caliente':-^17}")
+    print(
+        f"{'escala':>9} {'ruta':<42} {'frío':>8} {'p50':>8} {'p95':>8} {'req/s':>8} {'MB':>7}"
+        f" {'p50':>8} {'req/s':>8}  vs. anterior"
+    )
+    for filas, resultado in escalas.items():
+        for ruta, r in resultado["rutas"].items():
+            comparacion = ""
+            previo = (anterior or {}).get(str(filas), {}).get("rutas", {}).get(ruta)
+            if previo:
+                comparacion = f"p50 x{r['p50_s'] / previo['p50_s']:.2f}" if previo["p50_s"] else ""
+            c = resultado.get("rutas_cache", {}).get(ruta)
+            cache = f" {c['p50_s']:>7.3f}s {c['requests_por_s']:>8.1f}" if c else f" {'':>8} {'':>8}"
+            print(
+                f"{filas:>9} {ruta:<42} {r['frio_s']:>7.3f}s {r['p50_s']:>7.3f}s {r['p95_s']:>7.3f}s "
+                f"{r['requests_por_s']:>8.1f} {r['pico_memoria_mb']:>7.1f}{cache}  {comparacion}"
+            )
+        print(
+            f"{filas:>9} RSS máximo {resultado['rss_maximo_mb']} MB sin cache, "
+            f"{resultado.get('rss_maximo_cache_mb')} MB con cache, siembra {resultado['siembra_s']:.1f}s"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escalas", nargs="+", type=int, default=ESCALAS, help="filas de la vista por actividad")
+    parser.add_argument("--rutas", nargs="+", help="por defecto, todos los GET de reportes")
+    parser.add_argument("--repeticiones", type=int, default=10)
+    parser.add_argument("--concurrencia", type=int, default=8)
+    parser.add_argument("--directorio", help="dónde guardar las bases sembradas")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--regenerar", action="store_true", help="volver a sembrar aunque la base exista")
+    parser.add_argument("--salida", help="archivo JSON donde guardar los resultados")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior")
+    parser.add_argument("--hijo", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--sin-cache", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.hijo:
+        print(json.dumps(medir_en_este_proceso(args.rutas, args.repeticiones, args.concurrencia, args.sin_cache)))
+        return
+
+    escalas = {filas: medir_escala(filas, args) for filas in args.escalas}
+
+    anterior = None
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            anterior = json.load(f)["escalas"]
+    imprimir(escalas, anterior)
+
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump({
+                "fecha": datetime.now().isoformat(),
+                "python": platform.python_version(),
+                "plataforma": platform.platform(),
+                "parametros": {"repeticiones": args.repeticiones, "concurrencia": args.concurrencia},
+                "escalas": {str(filas): r for filas, r in escalas.items()},
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""
+Generador de datos sintéticos con distribuciones realistas, para probar
+consultas y exportaciones a escala:
+
+- instituciones con tamaños sesgados (Zipf): unas pocas enormes y una
+  cola larga de chicas, como los cuartiles que muestra el dashboard
+- sedes por institución proporcionales a su tamaño
+- categorías y actividades con popularidad desigual
+- adolescentes de 12 a 18 años (más concentrados en 14-15), con
+  fecha_nacimiento, género y DNI coherente con el año de nacimiento
+- 1 a 4 inscripciones por adolescente, en su mayoría confirmadas
+
+Todo se genera vectorizado con NumPy, por lotes, y se carga con INSERT
+de muchas filas por lote (executemany del driver), sin ORM. Sirve para
+SQLite o MySQL (ver benchmarks/base_local.py para el esquema). Uso:
+
+    python -m benchmarks.generador_datos --adolescentes 500000 --url sqlite:////tmp/escala.db
+    python -m benchmarks.generador_datos --adolescentes 2000000 --url mysql+pymysql://u:p@host/pruebas --reemplazar
+"""
+import argparse
+import time
+
+import numpy as np
+from sqlalchemy import create_engine
+
+TAMANO_LOTE = 20_000
+
+CATEGORIAS = {
+    "Deporte": ["Fútbol", "Vóley", "Básquet", "Handball", "Natación", "Atletismo", "Boxeo", "Hockey"],
+    "Arte": ["Teatro", "Dibujo y pintura", "Murga", "Danza urbana", "Fotografía", "Circo"],
+    "Música": ["Guitarra", "Percusión", "Canto", "Producción musical", "Rap y freestyle"],
+    "Tecnología": ["Programación", "Robótica", "Diseño de videojuegos", "Edición de video"],
+    "Apoyo escolar": ["Matemática", "Lengua", "Inglés", "Técnicas de estudio"],
+    "Oficios": ["Carpintería", "Electricidad", "Panadería", "Peluquería", "Huerta"],
+    "Recreación": ["Juegos de mesa", "Campamentos", "Ajedrez"],
+    "Salud": ["ESI", "Salud mental", "Primeros auxilios"],
+}
+
+TIPOS_INSTITUCION = ["Club", "Centro Cultural", "Escuela", "Parroquia", "Sociedad de Fomento", "Biblioteca Popular", "ONG"]
+BARRIOS = [
+    "Centro", "Norte", "Sur", "Oeste", "La Costa", "San Martín", "Belgrano", "Villa Nueva",
+    "Los Aromos", "El Progreso", "Barrio Obrero", "San José", "Las Flores", "La Loma",
+]
+NOMBRES = [
+    "Sofía", "Martina", "Valentina", "Camila", "Lucía", "Julieta", "Milagros", "Abril", "Agustina", "Micaela",
+    "Mateo", "Santiago", "Benjamín", "Thiago", "Joaquín", "Lautaro", "Tomás", "Facundo", "Bautista", "Lucas",
+    "Alex", "Ariel", "Noa", "Sasha",
+]
+APELLIDOS = [
+    "González", "Rodríguez", "Gómez", "Fernández", "López", "Díaz", "Martínez", "Pérez", "García", "Sánchez",
+    "Romero", "Sosa", "Torres", "Álvarez", "Ruiz", "Ramírez", "Flores", "Benítez", "Acosta", "Medina",
+]
+GENEROS = ["Mujer", "Varón", "No binario", "Prefiere no decir"]
+PROBABILIDAD_GENERO = [0.49, 0.475, 0.02, 0.015]
+DIAS = ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado"]
+PROBABILIDAD_DIA = [0.18, 0.18, 0.18, 0.18, 0.18, 0.10]
+HORARIOS = ["09:00 a 11:00", "11:00 a 13:00", "14:00 a 16:00", "16:00 a 18:00", "18:00 a 20:00"]
+
+ANIO_REFERENCIA = 2025
+# Inscripciones por adolescente: 1 + Poisson(λ), tope 4; 92% confirmadas
+LAMBDA_INSCRIPCIONES = 0.6
+CONFIRMADAS = 0.92
+
+
+def pesos_zipf(n: int, sesgo: float) -> np.ndarray:
+    pesos = 1.0 / np.arange(1, n + 1) ** sesgo
+    return pesos / pesos.sum()
+
+
+def filas_confirmadas_por_adolescente() -> float:
+    """Filas esperadas de la vista por actividad por cada adolescente"""
+    k = np.arange(0, 4)
+    poisson = np.exp(-LAMBDA_INSCRIPCIONES) * LAMBDA_INSCRIPCIONES ** k / np.array([1, 1, 2, 6])
+    poisson[-1] = 1 - poisson[:-1].sum()  # el tope acumula la cola
+    return float(((k + 1) * poisson).sum() * CONFIRMADAS)
+
+
+class GeneradorDatos:
+    """
+    Args:
+        adolescentes: cantidad de adolescentes a generar
+        instituciones: por defecto, ~1 cada 400 adolescentes (mín. 10)
+        sesgo: exponente de Zipf del tamaño de las instituciones
+        semilla: para reproducir la misma base
+    """
+
+    def __init__(self, adolescentes: int, instituciones: int | None = None, sesgo: float = 1.1, semilla: int = 0):
+        self.adolescentes = adolescentes
+        self.instituciones = instituciones or max(10, adolescentes // 400)
+        self.sesgo = sesgo
+        self.rng = np.random.default_rng(semilla)
+
+        self.peso_institucion = pesos_zipf(self.instituciones, sesgo)
+        # Sedes: crecen con la raíz del tamaño relativo (1 a 16 por institución)
+        relativo = self.peso_institucion / self.peso_institucion[-1]
+        self.sedes_por_institucion = np.clip(np.round(np.sqrt(relativo) / 2), 1, 16).astype(np.int64)
+        self.primera_sede = np.concatenate(([0], np.cumsum(self.sedes_por_institucion)[:-1]))
+
+        self.actividades = [(a, c) for c, nombres in CATEGORIAS.items() for a in nombres]
+        self.peso_actividad = self.rng.permutation(pesos_zipf(len(self.actividades), 0.8))
+
+    # -----------------------------------------------
+    # CATÁLOGOS
+    # -----------------------------------------------
+
+    def categorias(self) -> list:
+        return [(i, nombre) for i, nombre in enumerate(CATEGORIAS, start=1)]
+
+    def tabla_instituciones(self) -> list:
+        tipos = self.rng.integers(0, len(TIPOS_INSTITUCION), self.instituciones)
+        barrios = self.rng.integers(0, len(BARRIOS), self.instituciones)
+        return [
+            (i + 1, f"{TIPOS_INSTITUCION[t]} {BARRIOS[b]} {i + 1}")
+            for i, (t, b) in enumerate(zip(tipos, barrios))
+        ]
+
+    def tabla_sedes(self) -> list:
+        instituciones = np.repeat(np.arange(1, self.instituciones + 1), self.sedes_por_institucion)
+        barrios = self.rng.integers(0, len(BARRIOS), len(instituciones))
+        calles = self.rng.integers(1, 5000, len(instituciones))
+        return [
+            (i, f"Sede {BARRIOS[b]} {i}", f"Calle {c}", int(institucion))
+            for i, (institucion, b, c) in enumerate(zip(instituciones, barrios, calles), start=1)
+        ]
+
+    def tabla_actividades(self) -> list:
+        codigo_categoria = {nombre: i for i, nombre in self.categorias()}
+        return [(i, nombre, 1, codigo_categoria[categoria]) for i, (nombre, categoria) in enumerate(self.actividades, start=1)]
+
+    # -----------------------------------------------
+    # ADOLESCENTES E INSCRIPCIONES, POR LOTES
+    # -----------------------------------------------
+
+    def lotes_adolescentes(self, tamano_lote: int = TAMANO_LOTE):
+        """Tuplas (id, nombre, apellido, dni, fecha_nacimiento, genero)"""
+        nombres = np.array(NOMBRES, dtype=object)
+        apellidos = np.array(APELLIDOS, dtype=object)
+        generos = np.array(GENEROS, dtype=object)
+        for inicio in range(0, self.adolescentes, tamano_lote):
+            ids = np.arange(inicio + 1, min(inicio + tamano_lote, self.adolescentes) + 1)
+            n = len(ids)
+            edades = np.clip(self.rng.normal(14.8, 1.7, n), 12, 18.99)
+            nacimiento = (
+                np.datetime64(f"{ANIO_REFERENCIA}-07-01")
+                - (edades * 365.25).astype("timedelta64[D]")
+            )
+            anios = nacimiento.astype("datetime64[Y]").astype(np.int64) + 1970
+            # DNI creciente con el año de nacimiento (~800 mil por año) + ruido
+            dni = 40_000_000 + (anios - 2000) * 800_000 + self.rng.integers(0, 800_000, n)
+            yield list(zip(
+                ids.tolist(),
+                nombres[self.rng.integers(0, len(nombres), n)].tolist(),
+                apellidos[self.rng.integers(0, len(apellidos), n)].tolist(),
+                dni.astype(str).tolist(),
+                np.datetime_as_string(nacimiento, unit="D").tolist(),
+                generos[self.rng.choice(len(generos), n, p=PROBABILIDAD_GENERO)].tolist(),
+            ))
+
+    def lotes_inscripciones(self, tamano_lote: int = TAMANO_LOTE):
+        """Tuplas (adolescente_id, sede_id, actividad_id, dia, horario, confirmada)"""
+        dias = np.array(DIAS, dtype=object)
+        horarios = np.array(HORARIOS, dtype=object)
+        for inicio in range(0, self.adolescentes, tamano_lote):
+            ids = np.arange(inicio + 1, min(inicio + tamano_lote, self.adolescentes) + 1)
+            por_adolescente = 1 + np.minimum(self.rng.poisson(LAMBDA_INSCRIPCIONES, len(ids)), 3)
+            adolescentes = np.repeat(ids, por_adolescente)
+            n = len(adolescentes)
+
+            institucion = self.rng.choice(self.instituciones, n, p=self.peso_institucion)
+            sede = (
+                self.primera_sede[institucion]
+                + (self.rng.random(n) * self.sedes_por_institucion[institucion]).astype(np.int64)
+                + 1
+            )
+            actividad = self.rng.choice(len(self.actividades), n, p=self.peso_actividad) + 1
+            yield list(zip(
+                adolescentes.tolist(),
+                sede.tolist(),
+                actividad.tolist(),
+                dias[self.rng.choice(len(dias), n, p=PROBABILIDAD_DIA)].tolist(),
+                horarios[self.rng.integers(0, len(horarios), n)].tolist(),
+                (self.rng.random(n) < CONFIRMADAS).astype(np.int64).tolist(),
+            ))
+
+
+# ---------------------------------------------------
+# CARGA MASIVA
+# ---------------------------------------------------
+
+def _insert(conexion, tabla: str, columnas: list) -> str:
+    marcador = "?" if conexion.dialect.paramstyle == "qmark" else "%s"
+    return f"INSERT INTO {tabla} ({', '.join(columnas)}) VALUES ({', '.join([marcador] * len(columnas))})"
+
+
+def insertar_lotes(engine, tabla: str, columnas: list, lotes) -> int:
+    """
+    Inserta cada lote con un executemany del driver (PyMySQL lo convierte
+    en INSERT de muchas filas; sqlite3 reutiliza la sentencia preparada).
+    Una transacción por lote.
+    """
+    total = 0
+    with engine.connect() as conexion:
+        sentencia = _insert(conexion, tabla, columnas)
+        for lote in lotes:
+            if not lote:
+                continue
+            with conexion.begin():
+                conexion.exec_driver_sql(sentencia, lote)
+            total += len(lote)
+    return total
+
+
+def cargar(engine, generador: GeneradorDatos, tamano_lote: int = TAMANO_LOTE) -> dict:
+    """
+    Carga todas las tablas (el esquema tiene que existir).
+
+    Returns:
+        {tabla: {"filas": n, "segundos": s, "filas_por_s": r}}
+    """
+    tablas = [
+        ("categorias", ["id", "valor"], [generador.categorias()]),
+        ("instituciones", ["id", "valor"], [generador.tabla_instituciones()]),
+        ("sedes", ["id", "valor", "direccion", "institucion_id"], [generador.tabla_sedes()]),
+        ("actividades", ["id", "valor", "vigente", "categoria_id"], [generador.tabla_actividades()]),
+        ("adolescentes", ["id", "nombre", "apellido", "dni", "fecha_nacimiento", "genero"],
+         generador.lotes_adolescentes(tamano_lote)),
+        ("inscripciones", ["adolescente_id", "sede_id", "actividad_id", "dia", "horario", "confirmada"],
+         generador.lotes_inscripciones(tamano_lote)),
+    ]
+    resumen = {}
+    for tabla, columnas, lotes in tablas:
+        t0 = time.perf_counter()
+        filas = insertar_lotes(engine, tabla, columnas, lotes)
+        segundos = time.perf_counter() - t0
+        resumen[tabla] = {"filas": filas, "segundos": segundos, "filas_por_s": filas / segundos if segundos else None}
+    return resumen
+
+
+def main():
+    from benchmarks.base_local import crear_esquema
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", required=True, help="URL SQLAlchemy de la base destino")
+    parser.add_argument("--adolescentes", type=int, default=100_000)
+    parser.add_argument("--instituciones", type=int)
+    parser.add_argument("--sesgo", type=float, default=1.1)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--lote", type=int, default=TAMANO_LOTE)
+    parser.add_argument("--reemplazar", action="store_true", help="borrar las tablas existentes")
+    args = parser.parse_args()
+
+    engine = create_engine(args.url)
+    crear_esquema(engine, reemplazar=args.reemplazar)
+    generador = GeneradorDatos(args.adolescentes, args.instituciones, args.sesgo, args.semilla)
+    for tabla, r in cargar(engine, generador, args.lote).items():
+        print(f"{tabla:<15} {r['filas']:>10} filas {r['segundos']:>7.2f}s {r['filas_por_s'] or 0:>10.0f} filas/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Mide la capa de respuesta rápida (orjson + compresión + listados desde
+tuplas) sobre la base configurada en DATABASE_URL:
+
+1. Por ruta y por Accept-Encoding (identity, gzip, br): latencia total,
+   tiempo al primer byte y bytes enviados, vía ASGI en proceso.
+2. Sólo la serialización, con los mismos datos: el camino anterior
+   (entidades ORM + Pydantic + json / json.dumps por fila) contra el
+   actual (tuplas + una llamada a orjson).
+
+Uso:
+
+    python -m benchmarks.serializacion
+    python -m benchmarks.serializacion --rutas /sedes/ --repeticiones 20 --salida res.json
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+RUTAS = ["/reportes/actividad-detalle", "/sedes/"]
+CODIFICACIONES = ["identity", "gzip", "br"]
+
+
+async def medir_rutas(rutas, repeticiones):
+    from benchmarks.asgi import ClienteASGI
+    from src.main import app
+
+    cliente = ClienteASGI(app)
+    await cliente.iniciar()
+    resultados = {}
+    try:
+        for ruta in rutas:
+            for codificacion in CODIFICACIONES:
+                headers = {"Accept-Encoding": codificacion}
+                await cliente.get(ruta, headers)  # calentamiento
+                corridas = [await cliente.get(ruta, headers) for _ in range(repeticiones)]
+                status, cabeceras, cuerpo, _, _ = corridas[-1]
+                resultados[f"{ruta} [{codificacion}]"] = {
+                    "status": status,
+                    "content_encoding": cabeceras.get("content-encoding", "identity"),
+                    "bytes": len(cuerpo),
+                    "primer_byte_s": statistics.median(c[3] for c in corridas),
+                    "total_s": statistics.median(c[4] for c in corridas),
+                }
+    finally:
+        await cliente.cerrar()
+    return resultados
+
+
+def _cronometrar(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - t0)
+    return statistics.median(tiempos)
+
+
+def medir_serializadores(repeticiones):
+    from pydantic import TypeAdapter
+    from sqlalchemy.orm import Session
+
+    from src.crud.sedes import COLUMNAS_SEDE, get_sedes, get_sedes_filas
+    from src.database.conexiones import obtener_engine
+    from src.models.schemas import SedeOut
+    from src.reports import detalle
+    from src.utils.respuestas import filas_json
+
+    adaptador = TypeAdapter(list[SedeOut])
+    columnas_sede = [c.key for c in COLUMNAS_SEDE]
+    proyeccion = detalle.COLUMNAS_POR_DEFECTO
+
+    def sedes_anterior():
+        with Session(bind=obtener_engine()) as db:
+            json.dumps(adaptador.dump_python(get_sedes(db))).encode()
+
+    def sedes_actual():
+        with Session(bind=obtener_engine()) as db:
+            filas_json(columnas_sede, get_sedes_filas(db))
+
+    lotes = list(detalle.iterar_detalle(obtener_engine(), proyeccion))
+
+    def detalle_anterior():
+        for lote in lotes:
+            ",".join(json.dumps(dict(zip(proyeccion, f)), ensure_ascii=False) for f in lote).encode()
+
+    def detalle_actual():
+        for i, lote in enumerate(lotes):
+            detalle.lote_a_json(lote, proyeccion, "json", i == 0)
+
+    return {
+        "sedes": {
+            "orm_pydantic_json_s": _cronometrar(sedes_anterior, repeticiones),
+            "tuplas_orjson_s": _cronometrar(sedes_actual, repeticiones),
+        },
+        "actividad-detalle": {
+            "filas": sum(len(l) for l in lotes),
+            "json_por_fila_s": _cronometrar(detalle_anterior, repeticiones),
+            "orjson_por_lote_s": _cronometrar(detalle_actual, repeticiones),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rutas", nargs="+", default=RUTAS)
+    parser.add_argument("--repeticiones", type=int, default=10)
+    parser.add_argument("--salida", help="archivo JSON donde guardar los resultados")
+    args = parser.parse_args()
+
+    rutas = asyncio.run(medir_rutas(args.rutas, args.repeticiones))
+    serializadores = medir_serializadores(args.repeticiones)
+
+    print(f"{'ruta':<45} {'bytes':>12} {'1er byte':>10} {'total':>10}")
+    for nombre, r in rutas.items():
+        print(f"{nombre:<45} {r['bytes']:>12} {r['primer_byte_s']:>9.4f}s {r['total_s']:>9.4f}s")
+    print()
+    for endpoint, tiempos in serializadores.items():
+        detalle = ", ".join(
+            f"{k}={v:.4f}s" if isinstance(v, float) else f"{k}={v}" for k, v in tiempos.items()
+        )
+        print(f"{endpoint:<20} {detalle}")
+
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump({"rutas": rutas, "serializadores": serializadores}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
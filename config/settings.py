@@ -1,4 +1,5 @@
-from os import getenv
+import tempfile
+from os import getenv, path
 
 class SQLServerConfig:
     SERVER = getenv('MSSQL_SERVER')
@@ -10,4 +11,102 @@ class MySQLConfig:
     HOST = getenv('MYSQL_HOST')
     USER = getenv('MYSQL_USER')
     PASSWORD = getenv('MYSQL_PASSWORD')
-    DB = getenv('MYSQL_DB')
\ No newline at end of file
+    DB = getenv('MYSQL_DB')
+    PUERTO = int(getenv('MYSQL_PUERTO', '3306'))
+    # Pool de conexiones (por motor: primario y cada réplica)
+    POOL_SIZE = int(getenv('MYSQL_POOL_SIZE', '5'))
+    MAX_OVERFLOW = int(getenv('MYSQL_MAX_OVERFLOW', '10'))
+    POOL_TIMEOUT = int(getenv('MYSQL_POOL_TIMEOUT', '30'))
+    POOL_RECYCLE = int(getenv('MYSQL_POOL_RECYCLE', '3600'))
+    POOL_PRE_PING = getenv('MYSQL_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'si')
+    # LOAD DATA LOCAL INFILE para StorageUtils (modo 'load_data'); el
+    # servidor también tiene que tener local_infile habilitado
+    LOCAL_INFILE = getenv('MYSQL_LOCAL_INFILE', 'false').lower() in ('1', 'true', 'si')
+    # Réplicas de lectura para los reportes: "host1,host2:3307"
+    REPLICAS = getenv('MYSQL_REPLICAS', '')
+
+class DatabaseConfig:
+    # "sync" (PyMySQL en threadpool) o "async" (SQLAlchemy asyncio)
+    MODO = getenv('DB_MODO', 'sync')
+    # URLs opcionales que reemplazan a MySQL, p. ej. para pruebas locales:
+    # sqlite:///./local.db  /  sqlite+aiosqlite:///./local.db
+    URL = getenv('DATABASE_URL')
+    URL_ASYNC = getenv('DATABASE_URL_ASYNC')
+    # Réplicas de lectura como URLs separadas por coma (reemplazan a
+    # MYSQL_REPLICAS, igual que DATABASE_URL reemplaza a MySQL)
+    URLS_REPLICAS = getenv('DATABASE_URLS_REPLICAS', '')
+    URLS_REPLICAS_ASYNC = getenv('DATABASE_URLS_REPLICAS_ASYNC', '')
+    # Segundos que una réplica caída queda fuera de la rotación
+    REPLICA_ESPERA_REINTENTO = int(getenv('DB_REPLICA_ESPERA_REINTENTO', '30'))
+
+class SnapshotConfig:
+    # Cada cuánto la API refresca los snapshots en segundo plano (0 = sólo
+    # con POST /reportes/snapshots/refrescar o un proceso externo)
+    REFRESCO = int(getenv('SNAPSHOT_REFRESCO', '300'))
+    # Antigüedad a partir de la cual las respuestas se marcan vencidas
+    # (header X-Snapshot-Vencido)
+    MAX_ANTIGUEDAD = int(getenv('SNAPSHOT_MAX_ANTIGUEDAD', '900'))
+    # Cada cuánto se reconstruye todo (captura bajas y reasignaciones)
+    RECONSTRUCCION = int(getenv('SNAPSHOT_RECONSTRUCCION', '86400'))
+
+class CacheConfig:
+    TTL_POR_DEFECTO = int(getenv('CACHE_TTL', '300'))
+    # TTL por endpoint, p. ej. "total=60,genero=600"
+    TTL_ENDPOINTS = getenv('CACHE_TTL_ENDPOINTS', '')
+    MAX_ENTRADAS = int(getenv('CACHE_MAX_ENTRADAS', '512'))
+    MAX_BYTES = int(getenv('CACHE_MAX_BYTES', str(16 * 1024 * 1024)))
+    # Versiones recientes de la matriz institución x actividad que se
+    # guardan para responder deltas (?base=<version>)
+    VERSIONES_MATRIZ = int(getenv('CACHE_VERSIONES_MATRIZ', '8'))
+
+class CompresionConfig:
+    # Respuestas de tamaño conocido por debajo de esto van sin comprimir
+    MINIMO_BYTES = int(getenv('COMPRESION_MINIMO_BYTES', '1024'))
+    NIVEL_GZIP = int(getenv('COMPRESION_NIVEL_GZIP', '6'))
+    NIVEL_BROTLI = int(getenv('COMPRESION_NIVEL_BROTLI', '4'))
+
+class ParaleloConfig:
+    # Consultas simultáneas (conexiones del pool) por request compuesto
+    MAX_POR_REQUEST = int(getenv('REPORTES_MAX_PARALELO', '4'))
+
+class GraficosConfig:
+    # Procesos para renderizar gráficos (0 = en el thread del request)
+    PROCESOS = int(getenv('GRAFICOS_PROCESOS', '2'))
+    DPI = int(getenv('GRAFICOS_DPI', '150'))
+    CACHE_MEMORIA_ENTRADAS = int(getenv('GRAFICOS_CACHE_MEMORIA_ENTRADAS', '128'))
+    CACHE_MEMORIA_BYTES = int(getenv('GRAFICOS_CACHE_MEMORIA_BYTES', str(32 * 1024 * 1024)))
+    CACHE_DISCO_BYTES = int(getenv('GRAFICOS_CACHE_DISCO_BYTES', str(256 * 1024 * 1024)))
+    DIRECTORIO = getenv('GRAFICOS_DIRECTORIO') or path.join(tempfile.gettempdir(), 'graficos_reportes')
+
+class CuboConfig:
+    # ttl | manual | watermark (ver src/reports/cubo.py)
+    POLITICA = getenv('CUBO_POLITICA', 'ttl')
+    TTL = int(getenv('CUBO_TTL', '600'))
+    # Política watermark: cada cuánto se consulta el máximo id_adolescente
+    # y cada cuánto se recarga igual (bajas / cambios)
+    CHEQUEO = int(getenv('CUBO_CHEQUEO', '30'))
+    MAX_ANTIGUEDAD = int(getenv('CUBO_MAX_ANTIGUEDAD', '86400'))
+
+class MetricasConfig:
+    # Middleware de latencia, eventos de SQLAlchemy y GET /metrics
+    HABILITADAS = getenv('METRICAS_HABILITADAS', 'true').lower() in ('1', 'true', 'si')
+
+class DiagnosticoConfig:
+    # Registro de consultas lentas / repetidas (GET /admin/consultas-*)
+    HABILITADO = getenv('CONSULTAS_LENTAS_HABILITADO', 'true').lower() in ('1', 'true', 'si')
+    UMBRAL_MS = float(getenv('CONSULTAS_LENTAS_UMBRAL_MS', '500'))
+    MAX_REGISTROS = int(getenv('CONSULTAS_LENTAS_MAX_REGISTROS', '200'))
+    EXPLAIN = getenv('CONSULTAS_LENTAS_EXPLAIN', 'true').lower() in ('1', 'true', 'si')
+    # Misma sentencia con parámetros distintos en un request -> N+1
+    REPETICIONES_N1 = int(getenv('CONSULTAS_REPETICIONES_N1', '5'))
+
+class AdminConfig:
+    # Token exigido en el header X-Admin-Token por los endpoints de
+    # administración (/admin/*). Sin token configurado, se rechazan.
+    TOKEN = getenv('ADMIN_TOKEN')
+
+class StartupConfig:
+    # eager: todo se carga antes de aceptar requests
+    # lazy: motor y renderizadores se cargan en el primer uso
+    # warmup: la API arranca enseguida y precarga en segundo plano
+    MODO = getenv('STARTUP_MODO', 'warmup')
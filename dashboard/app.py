@@ -1,36 +1,22 @@
+from functools import lru_cache
+
 from dash import Dash, dcc, html, Input, Output
 import plotly.express as px
 
-from services import get_actividad_detalle
+from refresco import Refresco
 
 # ----------------------------------------
 # Datos
 # ----------------------------------------
 
-df = get_actividad_detalle()
-df = df.dropna(subset=["actividad", "institucion"])
-
-instituciones = sorted(df["institucion"].unique())
-
-import pandas as pd
+# Conteos ya agregados por la API (matriz institución x actividad):
+# se cargan una vez al importar y después un thread de fondo trae sólo
+# los cambios y reemplaza el índice precalculado
+refresco = Refresco()
+refresco.refrescar()
+refresco.iniciar()
 
-# ----------------------------------------
-# PRE-CÁLCULOS GLOBALES
-# ----------------------------------------
-
-# Total de adolescentes por institución (global)
-conteo_por_institucion = (
-    df.groupby("institucion")
-      .size()
-      .reset_index(name="total_adolescentes")
-)
-
-# Cuartiles institucionales
-conteo_por_institucion["cuartil"] = pd.qcut(
-    conteo_por_institucion["total_adolescentes"],
-    4,
-    labels=["Q1", "Q2", "Q3", "Q4"]
-)
+instituciones = refresco.estado.instituciones
 
 mapa_cuartil = {
     "Q1": "Q1 – menor volumen",
@@ -99,6 +85,18 @@ app.layout = html.Div(
                         "textAlign": "center"
                     }
                 ),
+
+                html.Div(
+                    id="kpi-ultimo-refresco",
+                    style={
+                        "flex": "1",
+                        "padding": "15px",
+                        "margin": "5px",
+                        "border": "1px solid #ccc",
+                        "borderRadius": "8px",
+                        "textAlign": "center"
+                    }
+                ),
             ]
         ),
 
@@ -110,79 +108,102 @@ app.layout = html.Div(
             clearable=False
         ),
 
-        dcc.Graph(id="grafico-actividades")
+        dcc.Graph(id="grafico-actividades"),
+
+        # Relee el estado publicado por el thread de refresco
+        dcc.Interval(
+            id="intervalo-refresco",
+            interval=max(refresco.intervalo, 30) * 1000,
+            disabled=refresco.intervalo <= 0
+        )
     ]
 )
 
 
 # ----------------------------------------
-# Callback
+# Callbacks
 # ----------------------------------------
 
+@app.callback(
+    Output("institucion-dropdown", "options"),
+    Input("intervalo-refresco", "n_intervals")
+)
+def actualizar_instituciones(_):
+    return [{"label": i, "value": i} for i in refresco.estado.instituciones]
+
+
 @app.callback(
     Output("grafico-actividades", "figure"),
     Output("kpi-total-adolescentes", "children"),
     Output("kpi-cuartil-institucional", "children"),
     Output("kpi-total-talleres", "children"),
-    Input("institucion-dropdown", "value")
+    Output("kpi-ultimo-refresco", "children"),
+    Input("institucion-dropdown", "value"),
+    Input("intervalo-refresco", "n_intervals")
 )
-def actualizar_dashboard(institucion):
+def actualizar_dashboard(institucion, _):
 
-    df_filtrado = df[df["institucion"] == institucion]
+    estado = refresco.estado
+    resumen = estado.indice.get(institucion)
+    if resumen is None:
+        # La institución dejó de existir en el último refresco
+        institucion = estado.instituciones[0]
+        resumen = estado.indice[institucion]
 
     # KPI 1 — Total adolescentes
-    total_adolescentes = len(df_filtrado)
     kpi_total_adolescentes = [
-        html.H3(total_adolescentes),
+        html.H3(resumen.total),
         html.P("Total adolescentes")
     ]
 
     # KPI 2 — Cuartil institucional
-    cuartil = (
-        conteo_por_institucion
-        .loc[
-            conteo_por_institucion["institucion"] == institucion,
-            "cuartil"
-        ]
-        .iloc[0]
-    )
-
     kpi_cuartil = [
-        html.H3(mapa_cuartil[str(cuartil)]),
+        html.H3(mapa_cuartil.get(resumen.cuartil, "Sin cuartil")),
         html.P("Cuartil institucional")
     ]
 
     # KPI 3 — Total talleres
-    total_talleres = len(df_filtrado)
     kpi_total_talleres = [
-        html.H3(total_talleres),
+        html.H3(resumen.total),
         html.P("Total talleres")
     ]
 
-    # Gráfico
-    df_plot = (
-        df_filtrado
-        .groupby("actividad")
-        .size()
-        .reset_index(name="cantidad")
-        .sort_values("cantidad", ascending=False)
+    # KPI 4 — Último refresco de datos
+    kpi_ultimo_refresco = [
+        html.H3(estado.actualizado_en.strftime("%H:%M:%S")),
+        html.P(f"Último refresco ({estado.duracion * 1000:.0f} ms)")
+    ]
+
+    return (
+        figura_institucion(institucion, resumen),
+        kpi_total_adolescentes,
+        kpi_cuartil,
+        kpi_total_talleres,
+        kpi_ultimo_refresco,
     )
 
+
+# ----------------------------------------
+# Gráfico (LRU: las selecciones repetidas no se reconstruyen; la
+# clave incluye el resumen, así un refresco con datos nuevos no
+# reutiliza figuras viejas)
+# ----------------------------------------
+
+@lru_cache(maxsize=128)
+def figura_institucion(institucion, resumen):
     fig = px.bar(
-        df_plot,
-        x="actividad",
-        y="cantidad",
+        x=list(resumen.actividades),
+        y=list(resumen.cantidades),
         title=f"Adolescentes confirmados por actividad – {institucion}",
         labels={
-            "actividad": "Actividad",
-            "cantidad": "Cantidad de adolescentes"
+            "x": "Actividad",
+            "y": "Cantidad de adolescentes"
         }
     )
 
     fig.update_layout(xaxis_tickangle=-45)
 
-    return fig, kpi_total_adolescentes, kpi_cuartil, kpi_total_talleres
-
+    return fig
 
 
 if __name__ == "__main__":
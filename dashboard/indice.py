@@ -0,0 +1,85 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# ----------------------------------------
+# ÍNDICE PRECALCULADO POR INSTITUCIÓN
+# ----------------------------------------
+# Todo lo que el callback necesita para una institución (conteo por
+# actividad, total y cuartil) se calcula una sola vez por cada versión
+# de la matriz institución x actividad que agrega la API, en vez de
+# filtrar un DataFrame de detalle en cada cambio del dropdown. El
+# cuartil no se calcula acá: viene del ranking de la API
+# (/reportes/ranking/institucion), el mismo que usan los reportes.
+
+
+@dataclass(frozen=True)
+class ResumenInstitucion:
+    actividades: tuple     # ordenadas de mayor a menor cantidad
+    cantidades: tuple
+    total: int
+    cuartil: str
+
+
+def pares_de_matriz(matriz: dict) -> dict:
+    """
+    Args:
+        matriz: payload de /reportes/matriz-institucion-actividad
+            (valores distintos + tripletas índice, índice, cantidad)
+
+    Returns:
+        {(institucion, actividad): cantidad}
+    """
+    instituciones, actividades = matriz["instituciones"], matriz["actividades"]
+    return {
+        (instituciones[i], actividades[a]): c
+        for i, a, c in zip(matriz["institucion"], matriz["actividad"], matriz["cantidad"])
+    }
+
+
+def aplicar_matriz(pares: dict | None, matriz: dict) -> dict:
+    """
+    Combina la respuesta de la API con los pares que ya se tienen: si es
+    un delta (trae `base`) se aplican los cambios, si no la reemplaza.
+    Cantidad 0 = el par ya no existe.
+    """
+    nuevos = pares_de_matriz(matriz)
+    if matriz.get("base") is not None and pares is not None:
+        nuevos = {**pares, **nuevos}
+    return {par: c for par, c in nuevos.items() if c}
+
+
+def construir_indice(pares: dict, cuartiles: dict) -> dict:
+    """
+    Args:
+        pares: {(institucion, actividad): cantidad}
+        cuartiles: {institucion: "Q1".."Q4"} (ver services.get_cuartiles)
+
+    Returns:
+        {institucion: ResumenInstitucion}
+    """
+    instituciones = pd.Categorical([i for i, _ in pares])
+    actividades = pd.Categorical([a for _, a in pares])
+    n_inst = len(instituciones.categories)
+    n_act = len(actividades.categories)
+
+    # Pares -> matriz densa institución x actividad
+    conteos = np.zeros((n_inst, n_act), dtype=np.int64)
+    cantidades = np.fromiter(pares.values(), dtype=np.int64, count=len(pares))
+    np.add.at(conteos, (instituciones.codes, actividades.codes), cantidades)
+
+    totales = conteos.sum(axis=1)
+
+    indice = {}
+    for i, institucion in enumerate(instituciones.categories):
+        fila = conteos[i]
+        presentes = np.flatnonzero(fila)
+        orden = presentes[np.argsort(-fila[presentes], kind="stable")]
+        indice[institucion] = ResumenInstitucion(
+            actividades=tuple(actividades.categories[orden]),
+            cantidades=tuple(int(c) for c in fila[orden]),
+            total=int(totales[i]),
+            cuartil=cuartiles.get(institucion, ""),
+        )
+    return indice
@@ -0,0 +1,93 @@
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+
+from indice import aplicar_matriz, construir_indice
+from services import get_cuartiles, get_matriz_institucion_actividad
+
+logger = logging.getLogger(__name__)
+
+# Segundos entre refrescos (0 = sólo la carga inicial)
+INTERVALO = float(os.getenv("DASHBOARD_REFRESCO_SEGUNDOS", "300"))
+
+
+# ----------------------------------------
+# ESTADO INMUTABLE
+# ----------------------------------------
+# Cada refresco arma un Estado nuevo y lo publica con una sola
+# asignación: los callbacks leen `refresco.estado` una vez y trabajan
+# con esa foto, sin locks y sin ver nunca un índice a medio armar.
+
+@dataclass(frozen=True)
+class Estado:
+    indice: dict
+    instituciones: list
+    pares: dict            # base para aplicar el próximo delta
+    version: str | None
+    etag: str | None
+    actualizado_en: datetime
+    duracion: float        # segundos del último refresco
+
+
+class Refresco:
+    """Mantiene el índice del dashboard al día desde un thread de fondo"""
+
+    def __init__(self, intervalo: float = INTERVALO):
+        self.intervalo = intervalo
+        self.estado = None
+        self._detener = threading.Event()
+        self._hilo = None
+
+    def refrescar(self) -> Estado:
+        """
+        Pide sólo los cambios desde la versión actual (o nada, si el
+        ETag coincide) y publica el nuevo estado.
+        """
+        inicio = time.perf_counter()
+        anterior = self.estado
+
+        matriz, etag = get_matriz_institucion_actividad(
+            base=anterior.version if anterior else None,
+            etag=anterior.etag if anterior else None,
+        )
+
+        if matriz is None:
+            # 304: mismos datos, sólo cambia la marca de refresco
+            indice, instituciones, pares = anterior.indice, anterior.instituciones, anterior.pares
+            version = anterior.version
+        else:
+            pares = aplicar_matriz(anterior.pares if anterior else None, matriz)
+            indice = construir_indice(pares, get_cuartiles("institucion"))
+            instituciones = sorted(indice)
+            version = matriz["version"]
+
+        self.estado = Estado(
+            indice=indice,
+            instituciones=instituciones,
+            pares=pares,
+            version=version,
+            etag=etag,
+            actualizado_en=datetime.now(),
+            duracion=time.perf_counter() - inicio,
+        )
+        return self.estado
+
+    def iniciar(self):
+        if self.intervalo <= 0 or self._hilo is not None:
+            return
+        self._hilo = threading.Thread(target=self._bucle, name="refresco-dashboard", daemon=True)
+        self._hilo.start()
+
+    def detener(self):
+        self._detener.set()
+
+    def _bucle(self):
+        while not self._detener.wait(self.intervalo):
+            try:
+                self.refrescar()
+            except Exception:
+                # Si la API no responde se sigue mostrando el último estado
+                logger.exception("No se pudo refrescar el dashboard")
@@ -1,13 +1,108 @@
 import requests
 import pandas as pd
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 API_BASE_URL = "http://127.0.0.1:8000"
 TIMEOUT = 15
 
+# ----------------------------------------
+# Cliente HTTP
+# ----------------------------------------
+# Una sola sesión para todo el dashboard: reutiliza las conexiones
+# (keep-alive) entre llamadas y entre el refresco de fondo y los
+# callbacks y reintenta con backoff los errores transitorios. La
+# compresión la negocia requests por defecto (gzip/deflate, y br/zstd si
+# brotli / zstandard están instalados).
+
+REINTENTOS = Retry(
+    total=3,
+    backoff_factor=0.5,
+    status_forcelist=(502, 503, 504),
+    allowed_methods=("GET",),
+)
+
+
+def crear_sesion(pool: int = 4) -> requests.Session:
+    """
+    Args:
+        pool: conexiones simultáneas a mantener abiertas con la API
+    Returns:
+        requests.Session
+    """
+    sesion = requests.Session()
+    adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=pool, max_retries=REINTENTOS)
+    sesion.mount("http://", adaptador)
+    sesion.mount("https://", adaptador)
+    return sesion
+
+
+sesion = crear_sesion()
+
+
+def _get(ruta: str, **kwargs) -> requests.Response:
+    return sesion.get(f"{API_BASE_URL}{ruta}", timeout=TIMEOUT, **kwargs)
+
+
+# ----------------------------------------
+# Decodificación binaria
+# ----------------------------------------
+
+TIPOS_BINARIOS = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def _tabla_arrow(respuesta: requests.Response, formato: str):
+    import pyarrow as pa
+
+    if formato == "parquet":
+        import pyarrow.parquet as pq
+        # Parquet necesita el archivo completo (el footer va al final);
+        # py_buffer envuelve los bytes de la respuesta sin copiarlos
+        return pq.read_table(pa.BufferReader(pa.py_buffer(respuesta.content)))
+
+    # Arrow IPC se lee lote a lote directo del socket, ya descomprimido,
+    # sin juntar antes el cuerpo entero en memoria
+    respuesta.raw.decode_content = True
+    return pa.ipc.open_stream(respuesta.raw).read_all()
+
+
+def get_dataset(dataset: str, columnas: list | None = None, formato: str = "arrow") -> pd.DataFrame:
+    """
+    Descarga un dataset de /exportar en formato binario y lo convierte
+    directamente a DataFrame, sin pasar por JSON ni por objetos Python
+    fila a fila.
+    Args:
+        dataset: nombre del dataset (ver GET /exportar/)
+        columnas: columnas a pedir; la API sólo envía esas (None = todas)
+        formato: "arrow" (IPC stream) o "parquet"
+    Returns:
+        pd.DataFrame
+    """
+    params = {"formato": formato}
+    if columnas:
+        params["columnas"] = ",".join(columnas)
+    with _get(
+        f"/exportar/{dataset}",
+        params=params,
+        headers={"Accept": TIPOS_BINARIOS[formato]},
+        stream=True,
+    ) as r:
+        r.raise_for_status()
+        tabla = _tabla_arrow(r, formato)
+    # split_blocks + self_destruct: las columnas numéricas se comparten
+    # con Arrow sin copia y la tabla se libera a medida que se convierte
+    return tabla.to_pandas(split_blocks=True, self_destruct=True)
+
+
+# ----------------------------------------
+# Endpoints
+# ----------------------------------------
+
 def get_adolescentes_por_actividad() -> pd.DataFrame:
-    r = requests.get(f"{API_BASE_URL}/reportes/actividad/", timeout=TIMEOUT)
-    r.raise_for_status()
-    return pd.DataFrame(r.json())
+    return get_dataset("actividad")
 
 def get_actividad_detalle() -> pd.DataFrame:
     """
@@ -16,10 +111,37 @@ def get_actividad_detalle() -> pd.DataFrame:
     Returns:
         pd.DataFrame
     """
-    r = requests.get(
-        f"{API_BASE_URL}/reportes/actividad-detalle/",
-        timeout=TIMEOUT
-    )
+    return get_dataset("actividad-detalle", columnas=["actividad", "institucion"])
+
+def get_cuartiles(dimension: str = "institucion") -> dict:
+    """
+    Cuartil de cada valor según el ranking de la API (mismo agregado que
+    los reportes; bordes repetidos no son error)
+    Args:
+        dimension: dimensión del ranking (ver /reportes/ranking/{dimension})
+    Returns:
+        {valor: "Q1".."Q4"}
+    """
+    r = _get(f"/reportes/ranking/{dimension}")
     r.raise_for_status()
-    return pd.DataFrame(r.json())
+    return {fila[dimension]: fila["cuartil"] for fila in r.json()}
 
+def get_matriz_institucion_actividad(base: str | None = None, etag: str | None = None):
+    """
+    Conteos por (institución, actividad) ya agregados por la API,
+    codificados por diccionario (ver /reportes/matriz-institucion-actividad)
+    Args:
+        base: versión que ya se tiene; la API devuelve sólo los cambios
+        etag: ETag de la respuesta anterior; si no cambió, no hay cuerpo
+    Returns:
+        (dict | None, etag): None si la API respondió 304
+    """
+    r = _get(
+        "/reportes/matriz-institucion-actividad",
+        params={"base": base} if base else None,
+        headers={"If-None-Match": etag} if etag else None,
+    )
+    if r.status_code == 304:
+        return None, etag
+    r.raise_for_status()
+    return r.json(), r.headers.get("ETag")
@@ -0,0 +1,72 @@
+-- ---------------------------------------------------------
+-- ÍNDICES RECOMENDADOS PARA LOS REPORTES FILTRADOS (MySQL)
+-- ---------------------------------------------------------
+--
+-- Los filtros de src/reports/filtros.py se compilan a igualdad / IN
+-- sobre las columnas de las vistas:
+--
+--   vista_adolescentes_confirmados_segun_actividad
+--       Institucion, Sede, Categoria, Actividad, Dia, id_adolescente
+--   vista_adolescentes_confirmados_segun_edad_sexo
+--       tramo_edad, genero, id_adolescente
+--
+-- Para que el motor pueda usar índices, las vistas tienen que poder
+-- fusionarse con la consulta (ALGORITHM=MERGE: sin GROUP BY, DISTINCT,
+-- UNION ni agregados en la definición). Verificar con:
+--
+--   EXPLAIN SELECT id_adolescente FROM vista_adolescentes_confirmados_segun_actividad
+--    WHERE Institucion = 'X' AND Categoria = 'Y';
+--
+-- y confirmar que no aparece una tabla derivada (<derived2>) recorrida
+-- entera.
+--
+-- Los índices van en las tablas base de las vistas. Las tablas de
+-- catálogo están en src/models/models_orm.py; las de inscripciones y
+-- adolescentes no están modeladas en este repositorio, así que los
+-- nombres de esa sección son orientativos: ajustarlos a la definición
+-- real de las vistas (SHOW CREATE VIEW ...) antes de ejecutar.
+
+
+-- ---------------------------------------------------------
+-- CATÁLOGOS (tablas del repositorio)
+-- ---------------------------------------------------------
+-- Los filtros llegan por nombre (Institucion = 'X'): el índice por
+-- `valor` resuelve el nombre a id sin recorrer la tabla.
+
+CREATE INDEX ix_instituciones_valor ON instituciones (valor);
+CREATE INDEX ix_sedes_valor ON sedes (valor);
+CREATE INDEX ix_sedes_institucion ON sedes (institucion_id, id);
+CREATE INDEX ix_actividades_valor ON actividades (valor);
+
+
+-- ---------------------------------------------------------
+-- TABLAS BASE DE LAS VISTAS (nombres orientativos)
+-- ---------------------------------------------------------
+-- Inscripción de un adolescente a una actividad en una sede: se filtra
+-- por sede / actividad y se une por adolescente. Los índices compuestos
+-- terminan en adolescente_id para que el semi-join por id_adolescente
+-- (filtros cruzados entre vistas) se resuelva sólo con el índice.
+
+-- CREATE INDEX ix_inscripciones_actividad ON inscripciones (actividad_id, adolescente_id);
+-- CREATE INDEX ix_inscripciones_sede ON inscripciones (sede_id, adolescente_id);
+-- CREATE INDEX ix_inscripciones_adolescente ON inscripciones (adolescente_id);
+
+-- Horarios de la actividad (filtro `dia`)
+-- CREATE INDEX ix_horarios_dia ON horarios (dia, actividad_id);
+
+-- Categorías de actividad (filtro `categoria`)
+-- CREATE INDEX ix_categorias_valor ON categorias (valor);
+-- CREATE INDEX ix_actividades_categoria ON actividades (categoria_id, id);
+
+-- Adolescentes (filtros `genero` y `tramo_edad`). El tramo de edad se
+-- calcula en la vista a partir de la fecha de nacimiento: para que sea
+-- sargable conviene una columna generada e indexada con el mismo
+-- cálculo que use la vista (sólo si es determinístico: la vista usa
+-- edad2025, un año fijo; MySQL no admite CURDATE() en columnas
+-- generadas), p. ej.:
+--
+-- ALTER TABLE adolescentes
+--   ADD COLUMN tramo_edad VARCHAR(50)
+--   GENERATED ALWAYS AS (<misma expresión que la vista>) STORED;
+-- CREATE INDEX ix_adolescentes_genero ON adolescentes (genero, id);
+-- CREATE INDEX ix_adolescentes_tramo ON adolescentes (tramo_edad, id);
@@ -0,0 +1,36 @@
+-- ---------------------------------------------------------
+-- TABLAS RESUMEN DE LOS SNAPSHOTS DE /reportes (MySQL)
+-- ---------------------------------------------------------
+--
+-- Ver src/reports/snapshots.py y los modelos ResumenConteo /
+-- ResumenEstado de src/models/models_orm.py. La API no crea estas
+-- tablas: ejecutar este script una vez en el primario antes de
+-- desplegar. Las filas de estado de cada vista se crean acá, así el
+-- refresco siempre bloquea una fila existente (SELECT ... FOR UPDATE)
+-- y dos refrescos simultáneos no compiten por insertarla.
+--
+-- Para bases locales / de pruebas: src.reports.snapshots.crear_tablas.
+
+CREATE TABLE IF NOT EXISTS resumen_adolescentes_conteo (
+    id INT NOT NULL AUTO_INCREMENT,
+    vista VARCHAR(50),
+    dimension VARCHAR(50),
+    valor VARCHAR(255),
+    cantidad INT,
+    PRIMARY KEY (id),
+    INDEX ix_resumen_adolescentes_conteo_vista (vista)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+CREATE TABLE IF NOT EXISTS resumen_adolescentes_estado (
+    vista VARCHAR(50) NOT NULL,
+    watermark INT,
+    total INT,
+    -- Firma del tramo ya contado (id_adolescente <= watermark)
+    filas INT,
+    suma_ids BIGINT,
+    actualizado_en DATETIME,
+    reconstruido_en DATETIME,
+    PRIMARY KEY (vista)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+INSERT IGNORE INTO resumen_adolescentes_estado (vista) VALUES ('actividad'), ('edad_sexo');
@@ -1,5 +1,17 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from src.models.models_orm import Actividad
 
 def get_actividades(db: Session):
     return db.query(Actividad).all()
+
+# Columnas del listado, en el orden de ActividadOut
+COLUMNAS_ACTIVIDAD = (Actividad.id, Actividad.valor, Actividad.vigente)
+
+def get_actividades_filas(db: Session):
+    return db.execute(select(*COLUMNAS_ACTIVIDAD)).all()
+
+async def get_actividades_filas_async(db: AsyncSession):
+    resultado = await db.execute(select(*COLUMNAS_ACTIVIDAD))
+    return resultado.all()
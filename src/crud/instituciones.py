@@ -1,5 +1,17 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from src.models.models_orm import Institucion
 
 def get_instituciones(db: Session):
     return db.query(Institucion).all()
+
+# Columnas del listado, en el orden de InstitucionOut
+COLUMNAS_INSTITUCION = (Institucion.id, Institucion.valor)
+
+def get_instituciones_filas(db: Session):
+    return db.execute(select(*COLUMNAS_INSTITUCION)).all()
+
+async def get_instituciones_filas_async(db: AsyncSession):
+    resultado = await db.execute(select(*COLUMNAS_INSTITUCION))
+    return resultado.all()
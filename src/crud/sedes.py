@@ -1,5 +1,17 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from src.models.models_orm import Sede
 
 def get_sedes(db: Session):
     return db.query(Sede).all()
+
+# Columnas del listado, en el orden de SedeOut
+COLUMNAS_SEDE = (Sede.id, Sede.valor, Sede.direccion, Sede.institucion_id)
+
+def get_sedes_filas(db: Session):
+    return db.execute(select(*COLUMNAS_SEDE)).all()
+
+async def get_sedes_filas_async(db: AsyncSession):
+    resultado = await db.execute(select(*COLUMNAS_SEDE))
+    return resultado.all()
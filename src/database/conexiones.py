@@ -1,10 +1,20 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
-from config.settings import SQLServerConfig, MySQLConfig
+import itertools
+import threading
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.sql.elements import TextClause
+from starlette.concurrency import run_in_threadpool
+from config.settings import SQLServerConfig, MySQLConfig, DatabaseConfig
 
 # ==========================
 # 1. Motores originales — NO se tocan
 # ==========================
+# (salvo el pool, que ahora sale de MySQLConfig, y el host, para poder
+# crear con la misma configuración los motores de las réplicas)
 
 def conectar_sqlserver():
     connection_string = (
@@ -14,15 +24,24 @@ def conectar_sqlserver():
     )
     return create_engine(connection_string)
 
-def conectar_mysql():
+def _opciones_pool():
+    return dict(
+        pool_size=MySQLConfig.POOL_SIZE,
+        max_overflow=MySQLConfig.MAX_OVERFLOW,
+        pool_timeout=MySQLConfig.POOL_TIMEOUT,
+        pool_recycle=MySQLConfig.POOL_RECYCLE,
+        pool_pre_ping=MySQLConfig.POOL_PRE_PING,
+    )
+
+def conectar_mysql(host=None, puerto=None):
     engine = create_engine(
         f"mysql+pymysql://{MySQLConfig.USER}:{MySQLConfig.PASSWORD}"
-        f"@{MySQLConfig.HOST}:3306/{MySQLConfig.DB}",
-        pool_size=5,
-        pool_recycle=3600,
+        f"@{host or MySQLConfig.HOST}:{puerto or MySQLConfig.PUERTO}/{MySQLConfig.DB}",
+        **_opciones_pool(),
         connect_args={
             'connect_timeout': 10,
-            'charset': 'utf8mb4'
+            'charset': 'utf8mb4',
+            'local_infile': MySQLConfig.LOCAL_INFILE
         }
     )
     return engine
@@ -32,23 +51,347 @@ def conectar_mysql():
 # 2. Agregado para FastAPI + ORM
 # ==========================
 
-# Elegí acá el motor que la API va a usar
-engine = conectar_mysql()
+# El motor se crea recién en el primer uso (o en el warm-up del lifespan),
+# no al importar el módulo: así la API arranca sin esperar a MySQL.
+_engine = None
+_lock_engine = threading.Lock()
 
 SessionLocal = sessionmaker(
     autocommit=False,
-    autoflush=False,
-    bind=engine
+    autoflush=False
 )
 
+
+def obtener_engine():
+    """Devuelve el motor que usa la API, creándolo la primera vez"""
+    global _engine
+    if _engine is None:
+        with _lock_engine:
+            if _engine is None:
+                # Elegí acá el motor que la API va a usar
+                # (DATABASE_URL permite apuntar a otra base, p. ej. SQLite local)
+                _engine = create_engine(DatabaseConfig.URL) if DatabaseConfig.URL else conectar_mysql()
+                SessionLocal.configure(bind=_engine)
+                _registrar_engine(_engine)
+    return _engine
+
+
+def __getattr__(nombre):
+    # `from src.database.conexiones import engine` sigue funcionando,
+    # pero dispara la creación perezosa del motor
+    if nombre == "engine":
+        return obtener_engine()
+    if nombre == "async_engine":
+        return obtener_async_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+
+
 # Base ORM
 Base = declarative_base()
 
 
 # Dependency para FastAPI
 def get_db():
+    obtener_engine()
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+# ==========================
+# 3. Modo asíncrono (DB_MODO=async)
+# ==========================
+
+def conectar_mysql_async(host=None, puerto=None):
+    return create_async_engine(
+        f"mysql+aiomysql://{MySQLConfig.USER}:{MySQLConfig.PASSWORD}"
+        f"@{host or MySQLConfig.HOST}:{puerto or MySQLConfig.PUERTO}/{MySQLConfig.DB}",
+        **_opciones_pool(),
+        connect_args={
+            'connect_timeout': 10,
+            'charset': 'utf8mb4'
+        }
+    )
+
+
+_async_engine = None
+
+AsyncSessionLocal = async_sessionmaker(
+    autoflush=False,
+    expire_on_commit=False
+)
+
+
+def obtener_async_engine():
+    global _async_engine
+    if _async_engine is None:
+        with _lock_engine:
+            if _async_engine is None:
+                _async_engine = (
+                    create_async_engine(DatabaseConfig.URL_ASYNC)
+                    if DatabaseConfig.URL_ASYNC
+                    else conectar_mysql_async()
+                )
+                AsyncSessionLocal.configure(bind=_async_engine)
+                _registrar_engine(_async_engine.sync_engine)
+    return _async_engine
+
+
+async def get_async_db():
+    obtener_async_engine()
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Dependency que usan los routers: sesión sync o async según DB_MODO
+get_sesion = get_async_db if DatabaseConfig.MODO == "async" else get_db
+
+
+async def ejecutar_en_sesion(db, funcion, *args, **kwargs):
+    """
+    Ejecuta una función sync que recibe `db` como primer argumento
+    (reportes, snapshots) sin bloquear el event loop: con AsyncSession
+    vía `run_sync`, con Session en el threadpool.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(funcion, *args, **kwargs)
+    return await run_in_threadpool(funcion, db, *args, **kwargs)
+
+
+
+# ==========================
+# 4. Hooks sobre los motores creados
+# ==========================
+# Otros módulos (métricas, diagnóstico) registran funciones que reciben
+# cada motor que crea la API. En modo async reciben el `sync_engine`,
+# que es donde SQLAlchemy dispara los eventos.
+
+_hooks_engine = []
+_engines_creados = []
+
+
+def al_crear_engine(funcion):
+    """
+    Registra `funcion(engine)`. Se aplica también a los motores que ya
+    estaban creados al registrarla.
+    """
+    with _lock_engine:
+        _hooks_engine.append(funcion)
+        existentes = list(_engines_creados)
+    for engine in existentes:
+        funcion(engine)
+    return funcion
+
+
+def _registrar_engine(engine):
+    # Se llama con _lock_engine tomado
+    _engines_creados.append(engine)
+    for funcion in _hooks_engine:
+        funcion(engine)
+
+
+# ==========================
+# 5. Réplicas de lectura
+# ==========================
+# Los reportes (src/reports) sólo leen: con réplicas configuradas
+# (MYSQL_REPLICAS o DATABASE_URLS_REPLICAS) sus sesiones se reparten
+# round-robin entre ellas. Escrituras, SELECT ... FOR UPDATE y todo lo
+# que siga en la misma sesión después de escribir van al primario, igual
+# que StorageUtils y los routers de catálogo, que usan get_sesion. Sin
+# réplicas, las sesiones de lectura usan el primario.
+
+class SelectorReplicas:
+    """
+    Reparte las sesiones entre réplicas en round-robin. Una réplica que
+    no conecta (o pierde la conexión) queda fuera de la rotación durante
+    `espera` segundos; pasada la espera se prueba una vez antes de
+    volver a usarla (igual que la primera vez que se usa cada réplica).
+    Las réplicas sanas no se prueban: de las conexiones muertas se ocupan
+    pool_pre_ping y el listener de `handle_error`.
+
+    Args:
+        engines: motores sync de las réplicas (en modo async, `sync_engine`)
+        espera: segundos hasta volver a intentar una réplica caída
+    """
+
+    def __init__(self, engines, espera: float):
+        self.engines = list(engines)
+        self.espera = espera
+        self._turno = itertools.count()
+        # Todas empiezan "por verificar", con la espera ya cumplida
+        self._caidas = dict.fromkeys(self.engines, 0)
+        for engine in self.engines:
+            event.listen(engine, "handle_error", self._al_fallar)
+
+    def candidatas(self) -> list:
+        """
+        Réplicas disponibles como (engine, verificar), empezando por la que
+        sigue en la rotación. `verificar` indica que todavía no se usó o
+        que estuvo caída y ya cumplió la espera.
+        """
+        if not self.engines:
+            return []
+        inicio = next(self._turno) % len(self.engines)
+        ahora = time.monotonic()
+        orden = self.engines[inicio:] + self.engines[:inicio]
+        return [(e, e in self._caidas) for e in orden if self._caidas.get(e, 0) <= ahora]
+
+    def marcar_caida(self, engine):
+        self._caidas[engine] = time.monotonic() + self.espera
+
+    def marcar_disponible(self, engine):
+        self._caidas.pop(engine, None)
+
+    def _al_fallar(self, contexto):
+        # Sin `connection`: falló la conexión misma (réplica inaccesible)
+        if contexto.is_disconnect or contexto.connection is None:
+            self.marcar_caida(contexto.engine)
+
+
+def _es_escritura(clausula) -> bool:
+    if clausula is None:
+        return False
+    if getattr(clausula, "is_select", False):
+        return getattr(clausula, "_for_update_arg", None) is not None
+    if isinstance(clausula, TextClause):
+        return not clausula.text.lstrip().upper().startswith(("SELECT", "WITH", "SHOW", "EXPLAIN"))
+    # INSERT / UPDATE / DELETE / DDL
+    return True
+
+
+class SesionEnrutada(Session):
+    """
+    Session que lee de una réplica y escribe en el primario (`bind`).
+
+    La réplica se elige en la primera lectura y se mantiene durante toda
+    la sesión (un request ve un único estado de la base). Después de la
+    primera escritura la sesión queda fijada al primario, para leer lo
+    que escribió.
+    """
+
+    def __init__(self, *args, selector: SelectorReplicas | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.selector = selector
+
+    def get_bind(self, mapper=None, *, clause=None, bind=None, **kwargs):
+        if bind is not None or self.selector is None or not self.selector.engines:
+            return super().get_bind(mapper, clause=clause, bind=bind, **kwargs)
+        if self._flushing or _es_escritura(clause):
+            usar_primario(self)
+        if self.info.get("primario"):
+            return super().get_bind(mapper, clause=clause, **kwargs)
+        if "replica" not in self.info:
+            self.info["replica"] = self._elegir_replica()
+        return self.info["replica"] or super().get_bind(mapper, clause=clause, **kwargs)
+
+    def _elegir_replica(self):
+        for engine, verificar in self.selector.candidatas():
+            if verificar:
+                try:
+                    with engine.connect():
+                        pass
+                except DBAPIError:
+                    self.selector.marcar_caida(engine)
+                    continue
+                self.selector.marcar_disponible(engine)
+            return engine
+        # Ninguna disponible: primario
+        return None
+
+
+def usar_primario(db):
+    """
+    Fija la sesión (Session o AsyncSession) al primario, p. ej. antes de
+    leer algo que la misma sesión va a escribir.
+    """
+    sesion = db.sync_session if isinstance(db, AsyncSession) else db
+    sesion.info["primario"] = True
+
+
+async def engine_lectura_async(db: AsyncSession) -> AsyncEngine:
+    """AsyncEngine del que lee la sesión (la réplica elegida o el primario)"""
+    return AsyncEngine(await db.run_sync(lambda sesion: sesion.get_bind()))
+
+
+def _urls(valor: str) -> list:
+    return [u.strip() for u in valor.split(",") if u.strip()]
+
+
+def _hosts_replicas():
+    for entrada in _urls(MySQLConfig.REPLICAS):
+        host, _, puerto = entrada.partition(":")
+        yield host, int(puerto) if puerto else None
+
+
+_selector = None
+_selector_async = None
+
+SessionLecturaLocal = sessionmaker(
+    class_=SesionEnrutada,
+    autocommit=False,
+    autoflush=False
+)
+
+AsyncSessionLecturaLocal = async_sessionmaker(
+    sync_session_class=SesionEnrutada,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+
+def obtener_selector():
+    """Crea (la primera vez) los motores de las réplicas y el selector sync"""
+    global _selector
+    primario = obtener_engine()
+    if _selector is None:
+        with _lock_engine:
+            if _selector is None:
+                if DatabaseConfig.URL:
+                    replicas = [create_engine(url) for url in _urls(DatabaseConfig.URLS_REPLICAS)]
+                else:
+                    replicas = [conectar_mysql(host, puerto) for host, puerto in _hosts_replicas()]
+                for replica in replicas:
+                    _registrar_engine(replica)
+                _selector = SelectorReplicas(replicas, DatabaseConfig.REPLICA_ESPERA_REINTENTO)
+                SessionLecturaLocal.configure(bind=primario, selector=_selector)
+    return _selector
+
+
+def obtener_selector_async():
+    """Como obtener_selector, para el modo async"""
+    global _selector_async
+    primario = obtener_async_engine()
+    if _selector_async is None:
+        with _lock_engine:
+            if _selector_async is None:
+                if DatabaseConfig.URL_ASYNC:
+                    replicas = [create_async_engine(url) for url in _urls(DatabaseConfig.URLS_REPLICAS_ASYNC)]
+                else:
+                    replicas = [conectar_mysql_async(host, puerto) for host, puerto in _hosts_replicas()]
+                sync_engines = [replica.sync_engine for replica in replicas]
+                for engine in sync_engines:
+                    _registrar_engine(engine)
+                _selector_async = SelectorReplicas(sync_engines, DatabaseConfig.REPLICA_ESPERA_REINTENTO)
+                AsyncSessionLecturaLocal.configure(bind=primario, selector=_selector_async)
+    return _selector_async
+
+
+# Dependencies de los routers de reportes (sólo lectura)
+def get_db_lectura():
+    obtener_selector()
+    db = SessionLecturaLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db_lectura():
+    obtener_selector_async()
+    async with AsyncSessionLecturaLocal() as db:
+        yield db
+
+
+get_sesion_lectura = get_async_db_lectura if DatabaseConfig.MODO == "async" else get_db_lectura
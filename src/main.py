@@ -1,3 +1,6 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from dotenv import load_dotenv
 
@@ -12,12 +15,65 @@ from src.routers.sedes import router as sedes_router
 from src.routers.reportes import router as reportes_router
 from src.routers.reportes_excel import router as reportes_excel_router
 from src.routers.reportes_pdf import router as reportes_pdf_router
+from src.routers.exportaciones import router as exportaciones_router
+from src.routers.cubo import router as cubo_router
+
+from config.settings import CompresionConfig, DiagnosticoConfig, MetricasConfig, SnapshotConfig, StartupConfig
+from src.database.conexiones import al_crear_engine
+from src.utils.arranque import precalentar, refrescar_snapshots_periodicamente
+from src.utils.compresion import CompresionMiddleware
+from src.utils.respuestas import RespuestaJSON
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    tarea = None
+    if StartupConfig.MODO == "eager":
+        await asyncio.to_thread(precalentar)
+    elif StartupConfig.MODO == "warmup":
+        tarea = asyncio.create_task(asyncio.to_thread(precalentar))
+    refresco = None
+    if SnapshotConfig.REFRESCO > 0:
+        refresco = asyncio.create_task(refrescar_snapshots_periodicamente())
+    yield
+    for pendiente in (tarea, refresco):
+        if pendiente is not None and not pendiente.done():
+            pendiente.cancel()
+
 
 app = FastAPI(
     title="API Estadísticas Programa Adolescencia",
     version="1.0",
+    lifespan=lifespan,
+    default_response_class=RespuestaJSON,
 )
 
+app.add_middleware(
+    CompresionMiddleware,
+    minimo=CompresionConfig.MINIMO_BYTES,
+    nivel_gzip=CompresionConfig.NIVEL_GZIP,
+    nivel_brotli=CompresionConfig.NIVEL_BROTLI,
+)
+
+# Consultas lentas y repetidas por request
+if DiagnosticoConfig.HABILITADO:
+    from src.routers.admin import router as admin_router
+    from src.utils.consultas_lentas import ConsultasMiddleware, registro_consultas
+
+    al_crear_engine(registro_consultas.instrumentar_engine)
+    app.add_middleware(ConsultasMiddleware, router=app.router, registro=registro_consultas)
+    app.include_router(admin_router)
+
+# Métricas: se agrega al final para quedar por fuera de la compresión
+# y medir el request completo
+if MetricasConfig.HABILITADAS:
+    from src.routers.metricas import router as metricas_router
+    from src.utils.metricas import MetricasMiddleware, instrumentar_engine
+
+    al_crear_engine(instrumentar_engine)
+    app.add_middleware(MetricasMiddleware, router=app.router)
+    app.include_router(metricas_router)
+
 # Incluir routers
 app.include_router(actividades_router)
 app.include_router(instituciones_router)
@@ -25,6 +81,8 @@ app.include_router(sedes_router)
 app.include_router(reportes_router)
 app.include_router(reportes_excel_router)
 app.include_router(reportes_pdf_router)
+app.include_router(exportaciones_router)
+app.include_router(cubo_router)
 
 
 @app.get("/")
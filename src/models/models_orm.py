@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime
 from src.database.conexiones import Base
 
 # ---------------------------------------------------------
@@ -64,3 +64,30 @@ class VistaEdadSexo(Base):
     genero = Column(String(20))
     tramo_edad = Column(String(50))
 
+
+# ---------------------------------------------------------
+# TABLAS RESUMEN (SNAPSHOTS DE REPORTES)
+# ---------------------------------------------------------
+
+class ResumenConteo(Base):
+    __tablename__ = "resumen_adolescentes_conteo"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    vista = Column(String(50), index=True)
+    dimension = Column(String(50))
+    valor = Column(String(255))
+    cantidad = Column(Integer)
+
+
+class ResumenEstado(Base):
+    __tablename__ = "resumen_adolescentes_estado"
+
+    vista = Column(String(50), primary_key=True)
+    watermark = Column(Integer)
+    total = Column(Integer)
+    # Firma del tramo ya contado (id_adolescente <= watermark): si cambia,
+    # hubo altas, bajas o confirmaciones sobre adolescentes ya contados
+    filas = Column(Integer)
+    suma_ids = Column(BigInteger)
+    actualizado_en = Column(DateTime)
+    reconstruido_en = Column(DateTime)
@@ -1,87 +1,129 @@
+import hashlib
+import json
+
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 
-from src.models.models_orm import VistaActividad, VistaEdadSexo
+from src.models.models_orm import VistaActividad
+from src.reports.agregacion import agregar, VISTA_ACTIVIDAD, VISTA_EDAD_SEXO
+from src.reports.filtros import FiltrosReporte
+from src.reports.ranking import Ranking
 
 
 # ---------------------------------------------------
 # REPORTES GENERALES
 # ---------------------------------------------------
+# Todas comparten un único escaneo de la vista por sesión
+# (ver src/reports/agregacion.py). `filtros` (opcional) restringe el
+# reporte, p. ej. a una institución y categoría (ver src/reports/filtros.py).
 
-def total_adolescentes(db: Session):
-    return db.query(func.count(VistaActividad.id_adolescente.distinct())).scalar()
+def total_adolescentes(db: Session, filtros: FiltrosReporte | None = None):
+    return agregar(db, VISTA_ACTIVIDAD, filtros).total
 
 
-def adolescentes_por_categoria(db: Session):
-    return (
-        db.query(VistaActividad.Categoria, func.count())
-        .group_by(VistaActividad.Categoria)
-        .order_by(func.count().desc())
-        .all()
-    )
+def adolescentes_por_categoria(db: Session, filtros: FiltrosReporte | None = None):
+    return agregar(db, VISTA_ACTIVIDAD, filtros).por("categoria")
 
 
-def adolescentes_por_institucion(db: Session):
-    return (
-        db.query(VistaActividad.Institucion, func.count())
-        .group_by(VistaActividad.Institucion)
-        .order_by(func.count().desc())
-        .all()
-    )
+def adolescentes_por_institucion(db: Session, filtros: FiltrosReporte | None = None):
+    return agregar(db, VISTA_ACTIVIDAD, filtros).por("institucion")
 
 
-def adolescentes_por_actividad(db: Session):
-    return (
-        db.query(VistaActividad.Actividad, func.count())
-        .group_by(VistaActividad.Actividad)
-        .order_by(func.count().desc())
-        .all()
-    )
+def adolescentes_por_actividad(db: Session, filtros: FiltrosReporte | None = None):
+    return agregar(db, VISTA_ACTIVIDAD, filtros).por("actividad")
 
 
-def top10_instituciones(db: Session):
-    return (
-        db.query(VistaActividad.Institucion, func.count())
-        .group_by(VistaActividad.Institucion)
-        .order_by(func.count().desc())
-        .limit(10)
-        .all()
-    )
+# Los TOP-N salen del mismo ranking que los conteos completos: pedir
+# ambos en una sesión (p. ej. el reporte PDF) no agrega consultas.
 
+def ranking(db: Session, dimension: str, filtros: FiltrosReporte | None = None) -> Ranking:
+    vista = VISTA_ACTIVIDAD if dimension in VISTA_ACTIVIDAD.dimensiones else VISTA_EDAD_SEXO
+    return agregar(db, vista, filtros).ranking(dimension)
 
-def top10_actividades(db: Session):
-    return (
-        db.query(VistaActividad.Actividad, func.count())
-        .group_by(VistaActividad.Actividad)
-        .order_by(func.count().desc())
-        .limit(10)
-        .all()
-    )
+
+def top_instituciones(db: Session, filtros: FiltrosReporte | None = None, n: int = 10):
+    return ranking(db, "institucion", filtros).top(n)
+
+
+def top_actividades(db: Session, filtros: FiltrosReporte | None = None, n: int = 10):
+    return ranking(db, "actividad", filtros).top(n)
+
+
+def top10_instituciones(db: Session, filtros: FiltrosReporte | None = None):
+    return top_instituciones(db, filtros, 10)
+
+
+def top10_actividades(db: Session, filtros: FiltrosReporte | None = None):
+    return top_actividades(db, filtros, 10)
 
 
 # ---------------------------------------------------
 # REPORTES DEMOGRÁFICOS
 # ---------------------------------------------------
 
-from sqlalchemy import func
-
-def adolescentes_por_tramo_edad(db: Session):
-    return (
-        db.query(
-            VistaEdadSexo.tramo_edad, 
-            func.count(VistaEdadSexo.id_adolescente)
-        )
-        .group_by(VistaEdadSexo.tramo_edad)
-        .order_by(func.count(VistaEdadSexo.id_adolescente).desc())
-        .all()
-    )
+def adolescentes_por_tramo_edad(db: Session, filtros: FiltrosReporte | None = None):
+    return agregar(db, VISTA_EDAD_SEXO, filtros).por("tramo_edad")
+
 
+def adolescentes_por_genero(db: Session, filtros: FiltrosReporte | None = None):
+    return agregar(db, VISTA_EDAD_SEXO, filtros).por("genero")
 
 
-def adolescentes_por_genero(db: Session):
-    return (
-        db.query(VistaEdadSexo.genero, func.count())
-        .group_by(VistaEdadSexo.genero)
-        .order_by(func.count().desc())
-        .all()
+# ---------------------------------------------------
+# MATRIZ INSTITUCIÓN x ACTIVIDAD
+# ---------------------------------------------------
+#
+# Formato codificado por diccionario: `instituciones` y `actividades`
+# son los valores distintos, e `institucion`, `actividad` y `cantidad`
+# son tripletas (índice, índice, conteo), una por par. Cada matriz lleva
+# una `version` (hash de su contenido) para que el cliente pueda pedir
+# sólo los cambios respecto de la que ya tiene.
+
+def conteos_institucion_actividad(db: Session) -> dict:
+    """Conteo de filas por par (institución, actividad), agrupado en el motor"""
+    institucion = VistaActividad.Institucion
+    actividad = VistaActividad.Actividad
+    consulta = (
+        select(institucion, actividad, func.count())
+        .where(institucion.is_not(None), actividad.is_not(None))
+        .group_by(institucion, actividad)
     )
+    return {(f[0], f[1]): f[2] for f in db.execute(consulta)}
+
+
+def version_matriz(pares: dict) -> str:
+    datos = json.dumps(sorted([i, a, c] for (i, a), c in pares.items()))
+    return hashlib.sha256(datos.encode("utf-8")).hexdigest()[:16]
+
+
+def codificar_matriz(pares: dict) -> dict:
+    """
+    Args:
+        pares: {(institucion, actividad): cantidad}
+
+    Returns:
+        dict con las columnas codificadas por diccionario
+    """
+    instituciones = sorted({i for i, _ in pares})
+    actividades = sorted({a for _, a in pares})
+    codigo_institucion = {valor: n for n, valor in enumerate(instituciones)}
+    codigo_actividad = {valor: n for n, valor in enumerate(actividades)}
+
+    return {
+        "instituciones": instituciones,
+        "actividades": actividades,
+        "institucion": [codigo_institucion[i] for i, _ in pares],
+        "actividad": [codigo_actividad[a] for _, a in pares],
+        "cantidad": list(pares.values()),
+    }
+
+
+def delta_matriz(base: dict, actual: dict) -> dict:
+    """
+    Pares que cambiaron entre dos matrices; los que desaparecieron
+    vuelven con cantidad 0.
+    """
+    cambios = {par: c for par, c in actual.items() if base.get(par) != c}
+    cambios.update({par: 0 for par in base if par not in actual})
+    return cambios
+
@@ -0,0 +1,193 @@
+from collections import Counter
+from dataclasses import dataclass, field
+
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.orm import Session
+
+from src.models.models_orm import VistaActividad, VistaEdadSexo
+from src.reports.filtros import FiltrosReporte
+from src.reports.ranking import Ranking
+
+
+# ---------------------------------------------------
+# MOTOR DE AGREGACIÓN DE UNA SOLA PASADA
+# ---------------------------------------------------
+#
+# Cada vista se recorre UNA sola vez por sesión y de ese recorrido salen
+# todas sus dimensiones, el total de adolescentes distintos y cualquier
+# corte TOP-N. El resultado queda memorizado en `db.info`, así que todas
+# las funciones de `adolescentes.py` que comparten sesión (un request)
+# reutilizan el mismo escaneo. Con filtros, cada combinación de filtros
+# tiene su propio escaneo (y su propia entrada en la memoria).
+
+# Motores que soportan GROUPING SETS + GROUPING(). MySQL sólo tiene
+# WITH ROLLUP (jerárquico), que no sirve para dimensiones independientes.
+DIALECTOS_GROUPING_SETS = {"postgresql", "mssql", "oracle"}
+
+TAMANO_LOTE = 5000
+
+
+@dataclass(frozen=True)
+class DefinicionVista:
+    """Vista de reportes y las dimensiones que se agregan sobre ella"""
+    nombre: str
+    modelo: type
+    dimensiones: dict
+
+
+VISTA_ACTIVIDAD = DefinicionVista(
+    nombre="actividad",
+    modelo=VistaActividad,
+    dimensiones={
+        "categoria": VistaActividad.Categoria,
+        "institucion": VistaActividad.Institucion,
+        "actividad": VistaActividad.Actividad,
+    },
+)
+
+VISTA_EDAD_SEXO = DefinicionVista(
+    nombre="edad_sexo",
+    modelo=VistaEdadSexo,
+    dimensiones={
+        "tramo_edad": VistaEdadSexo.tramo_edad,
+        "genero": VistaEdadSexo.genero,
+    },
+)
+
+
+@dataclass
+class ResultadoAgregado:
+    """
+    Resultado de un escaneo: total distinto y conteos por dimensión,
+    ordenados de mayor a menor cantidad.
+    """
+    total: int
+    conteos: dict
+    _rankings: dict = field(default_factory=dict, repr=False, compare=False)
+
+    def por(self, dimension: str):
+        return self.conteos[dimension]
+
+    def ranking(self, dimension: str) -> Ranking:
+        """Ranking de la dimensión, armado una vez por resultado"""
+        if dimension not in self._rankings:
+            self._rankings[dimension] = Ranking(tuple(self.conteos[dimension]))
+        return self._rankings[dimension]
+
+    def top(self, dimension: str, n: int):
+        return self.ranking(dimension).top(n)
+
+
+# ---------------------------------------------------
+# PUNTO DE ENTRADA
+# ---------------------------------------------------
+
+def clave_memo(vista: DefinicionVista, filtros: FiltrosReporte | None = None):
+    """Sin filtros la clave es el nombre de la vista; con filtros, se agregan"""
+    if not filtros:
+        return vista.nombre
+    return (vista.nombre, filtros.clave())
+
+
+def agregar(db: Session, vista: DefinicionVista, filtros: FiltrosReporte | None = None) -> ResultadoAgregado:
+    """
+    Devuelve el agregado completo de la vista (opcionalmente filtrado),
+    calculándolo en una sola pasada la primera vez que se pide dentro de
+    la sesión.
+    """
+    memo = db.info.setdefault("agregados", {})
+    clave = clave_memo(vista, filtros)
+    if clave not in memo:
+        condiciones = filtros.condiciones(vista.modelo) if filtros else ()
+        memo[clave] = calcular(db, vista, condiciones)
+    return memo[clave]
+
+
+def calcular(db: Session, vista: DefinicionVista, condiciones=()) -> ResultadoAgregado:
+    """
+    Ejecuta el escaneo sin pasar por la memoria de la sesión. `condiciones`
+    son expresiones WHERE opcionales (p. ej. el rango de un refresco
+    incremental).
+    """
+    if db.get_bind().dialect.name in DIALECTOS_GROUPING_SETS:
+        return _agregar_grouping_sets(db, vista, condiciones)
+    return _agregar_en_una_pasada(db, vista, condiciones)
+
+
+def ordenar_conteos(conteo: dict):
+    return sorted(conteo.items(), key=lambda item: item[1], reverse=True)
+
+
+# ---------------------------------------------------
+# ESTRATEGIA 1: GROUPING SETS EN EL MOTOR
+# ---------------------------------------------------
+
+def _agregar_grouping_sets(db: Session, vista: DefinicionVista, condiciones=()) -> ResultadoAgregado:
+    nombres = list(vista.dimensiones)
+    columnas = list(vista.dimensiones.values())
+    id_adolescente = vista.modelo.id_adolescente
+
+    consulta = (
+        select(
+            *columnas,
+            *[func.grouping(c) for c in columnas],
+            func.count(),
+            func.count(id_adolescente.distinct()),
+        )
+        .where(*condiciones)
+        .group_by(func.grouping_sets(*[tuple_(c) for c in columnas], tuple_()))
+    )
+
+    n = len(columnas)
+    total = 0
+    conteos = {nombre: {} for nombre in nombres}
+
+    for fila in db.execute(consulta):
+        valores, agrupado = fila[:n], fila[n:2 * n]
+        cantidad, distintos = fila[2 * n], fila[2 * n + 1]
+
+        activas = [i for i, g in enumerate(agrupado) if not g]
+        if not activas:
+            total = distintos
+        else:
+            i = activas[0]
+            conteos[nombres[i]][valores[i]] = cantidad
+
+    return ResultadoAgregado(
+        total=total or 0,
+        conteos={nombre: ordenar_conteos(conteos[nombre]) for nombre in nombres},
+    )
+
+
+# ---------------------------------------------------
+# ESTRATEGIA 2: UN ESCANEO EN STREAMING + CONTEO EN PYTHON
+# ---------------------------------------------------
+
+def _agregar_en_una_pasada(db: Session, vista: DefinicionVista, condiciones=()) -> ResultadoAgregado:
+    nombres = list(vista.dimensiones)
+    columnas = list(vista.dimensiones.values())
+
+    consulta = (
+        select(vista.modelo.id_adolescente, *columnas)
+        .where(*condiciones)
+        .execution_options(yield_per=TAMANO_LOTE)
+    )
+
+    ids = set()
+    contadores = [Counter() for _ in columnas]
+
+    for lote in db.execute(consulta).partitions():
+        por_columna = list(zip(*lote))
+        ids.update(por_columna[0])
+        for contador, valores in zip(contadores, por_columna[1:]):
+            contador.update(valores)
+
+    ids.discard(None)
+
+    return ResultadoAgregado(
+        total=len(ids),
+        conteos={
+            nombre: ordenar_conteos(contador)
+            for nombre, contador in zip(nombres, contadores)
+        },
+    )
@@ -0,0 +1,337 @@
+from __future__ import annotations
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from config.settings import CuboConfig
+from src.models.models_orm import VistaActividad, VistaEdadSexo
+from src.reports.filtros import FiltrosReporte
+
+# NumPy se importa dentro de las funciones de carga y consulta: el router
+# se importa al arrancar la API y NumPy recién hace falta con el cubo
+if TYPE_CHECKING:
+    import numpy as np
+
+
+# ---------------------------------------------------
+# CUBO OLAP EN MEMORIA
+# ---------------------------------------------------
+#
+# Las dos vistas se leen UNA vez y quedan en memoria como columnas de
+# códigos enteros (codificación por diccionario): una fila por
+# adolescente y actividad, con el tramo de edad y el género de
+# VistaEdadSexo unidos por id_adolescente. Cualquier "contar por X e Y"
+# con cualquier combinación de filtros se resuelve con NumPy
+# (isin + ravel_multi_index + bincount), sin tocar la base.
+#
+# Cuándo se recarga lo decide una política intercambiable (TTL, manual
+# o watermark de id_adolescente), configurada en CuboConfig.
+
+DIMENSIONES_ACTIVIDAD = {
+    "institucion": VistaActividad.Institucion,
+    "sede": VistaActividad.Sede,
+    "categoria": VistaActividad.Categoria,
+    "actividad": VistaActividad.Actividad,
+    "dia": VistaActividad.Dia,
+}
+
+DIMENSIONES_EDAD_SEXO = {
+    "tramo_edad": VistaEdadSexo.tramo_edad,
+    "genero": VistaEdadSexo.genero,
+}
+
+DIMENSIONES = [*DIMENSIONES_ACTIVIDAD, *DIMENSIONES_EDAD_SEXO]
+
+TAMANO_LOTE = 20000
+
+# Hasta este producto de cardinalidades se cuenta con un bincount denso;
+# por encima, con np.unique sobre las combinaciones presentes
+MAX_CELDAS_DENSAS = 1_000_000
+
+
+class _Diccionario:
+    """Valor -> código entero, en orden de aparición"""
+
+    def __init__(self):
+        self.codigos = {}
+        self.valores = []
+
+    def codificar(self, valores) -> np.ndarray:
+        import numpy as np
+
+        codigos = self.codigos
+        for valor in set(valores).difference(codigos):
+            codigos[valor] = len(self.valores)
+            self.valores.append(valor)
+        return np.fromiter(map(codigos.__getitem__, valores), dtype=np.int32, count=len(valores))
+
+
+@dataclass
+class Cubo:
+    ids: np.ndarray            # id_adolescente de cada fila, como índice denso 0..n-1
+    codigos: dict              # {dimension: np.ndarray de códigos}
+    valores: dict              # {dimension: [valor por código]}
+    cargado_en: datetime
+    segundos_carga: float
+    watermark: tuple           # (max id actividad, max id edad/sexo)
+    cantidad_ids: int = 1
+
+    @property
+    def filas(self) -> int:
+        return len(self.ids)
+
+    def cardinalidades(self) -> dict:
+        return {d: len(v) for d, v in self.valores.items()}
+
+    # -----------------------------------------------
+    # CONSULTA
+    # -----------------------------------------------
+
+    def mascara(self, filtros: FiltrosReporte | None) -> np.ndarray | None:
+        if not filtros:
+            return None
+        import numpy as np
+
+        mascara = np.ones(self.filas, dtype=bool)
+        for dimension, pedidos in filtros.activos().items():
+            indice = {v: c for c, v in enumerate(self.valores[dimension])}
+            codigos = [indice[v] for v in pedidos if v in indice]
+            mascara &= np.isin(self.codigos[dimension], codigos)
+        return mascara
+
+    def consultar(self, dimensiones: list, filtros: FiltrosReporte | None = None) -> list:
+        """
+        Args:
+            dimensiones: nombres de DIMENSIONES por los que agrupar
+                (vacío = sólo el total)
+            filtros: restricciones opcionales
+
+        Returns:
+            [{dimension: valor, ..., "filas": n, "adolescentes": m}],
+            sólo combinaciones presentes, de mayor a menor cantidad de filas
+        """
+        import numpy as np
+
+        mascara = self.mascara(filtros)
+        ids = self.ids if mascara is None else self.ids[mascara]
+        columnas = [
+            self.codigos[d] if mascara is None else self.codigos[d][mascara]
+            for d in dimensiones
+        ]
+
+        if not len(ids) and dimensiones:
+            return []
+        if not dimensiones:
+            return [{"filas": int(len(ids)), "adolescentes": int(len(np.unique(ids)))}]
+
+        # Cada combinación de códigos -> un entero (celda)
+        tamanos = [len(self.valores[d]) for d in dimensiones]
+        celda = np.ravel_multi_index(columnas, tamanos)
+        total_celdas = int(np.prod(tamanos, dtype=np.int64))
+
+        if total_celdas <= MAX_CELDAS_DENSAS:
+            conteo = np.bincount(celda, minlength=total_celdas)
+            presentes = np.flatnonzero(conteo)
+            filas = conteo[presentes]
+            compacta = np.empty(total_celdas, dtype=np.int64)
+            compacta[presentes] = np.arange(len(presentes))
+            compacta = compacta[celda]
+        else:
+            presentes, compacta, filas = np.unique(celda, return_inverse=True, return_counts=True)
+
+        combinaciones = np.unravel_index(presentes, tamanos)
+        adolescentes = self._distintos_por_celda(compacta, ids, len(presentes))
+
+        orden = np.argsort(-filas, kind="stable")
+        return [
+            {
+                **{d: self.valores[d][combinaciones[j][i]] for j, d in enumerate(dimensiones)},
+                "filas": int(filas[i]),
+                "adolescentes": int(adolescentes[i]),
+            }
+            for i in orden
+        ]
+
+    def _distintos_por_celda(self, celda: np.ndarray, ids: np.ndarray, cantidad: int) -> np.ndarray:
+        """Adolescentes distintos por celda: pares (celda, id) únicos en un int64"""
+        import numpy as np
+
+        pares = np.unique(celda.astype(np.int64) * self.cantidad_ids + ids)
+        return np.bincount(pares // self.cantidad_ids, minlength=cantidad)
+
+
+# ---------------------------------------------------
+# CARGA
+# ---------------------------------------------------
+
+def _watermark(db: Session) -> tuple:
+    return (
+        db.scalar(select(func.max(VistaActividad.id_adolescente))) or 0,
+        db.scalar(select(func.max(VistaEdadSexo.id_adolescente))) or 0,
+    )
+
+
+def cargar(db: Session) -> Cubo:
+    import numpy as np
+
+    inicio = time.perf_counter()
+    watermark = _watermark(db)
+
+    # Edad / sexo por id: se ordena para unir por búsqueda binaria
+    diccionarios = {d: _Diccionario() for d in DIMENSIONES}
+    edad_ids, edad_codigos = [], {d: [] for d in DIMENSIONES_EDAD_SEXO}
+    consulta = select(VistaEdadSexo.id_adolescente, *DIMENSIONES_EDAD_SEXO.values())
+    for lote in db.execute(consulta.execution_options(yield_per=TAMANO_LOTE)).partitions():
+        columnas = list(zip(*lote))
+        edad_ids.append(np.asarray(columnas[0], dtype=np.int64))
+        for dimension, valores in zip(DIMENSIONES_EDAD_SEXO, columnas[1:]):
+            edad_codigos[dimension].append(diccionarios[dimension].codificar(valores))
+
+    edad_ids = np.concatenate(edad_ids) if edad_ids else np.empty(0, dtype=np.int64)
+    orden_edad = np.argsort(edad_ids, kind="stable")
+    edad_ids = edad_ids[orden_edad]
+    edad_codigos = {
+        d: (np.concatenate(c) if c else np.empty(0, dtype=np.int32))[orden_edad]
+        for d, c in edad_codigos.items()
+    }
+
+    # Filas de actividad
+    ids, codigos = [], {d: [] for d in DIMENSIONES_ACTIVIDAD}
+    consulta = select(VistaActividad.id_adolescente, *DIMENSIONES_ACTIVIDAD.values())
+    for lote in db.execute(consulta.execution_options(yield_per=TAMANO_LOTE)).partitions():
+        columnas = list(zip(*lote))
+        ids.append(np.asarray([-1 if i is None else i for i in columnas[0]], dtype=np.int64))
+        for dimension, valores in zip(DIMENSIONES_ACTIVIDAD, columnas[1:]):
+            codigos[dimension].append(diccionarios[dimension].codificar(valores))
+
+    ids = np.concatenate(ids) if ids else np.empty(0, dtype=np.int64)
+    codigos = {
+        d: np.concatenate(c) if c else np.empty(0, dtype=np.int32)
+        for d, c in codigos.items()
+    }
+
+    # Unión por id_adolescente; sin datos de edad/sexo -> valor None
+    posicion = np.searchsorted(edad_ids, ids)
+    posicion_valida = np.minimum(posicion, max(len(edad_ids) - 1, 0))
+    if len(edad_ids):
+        encontrado = (posicion < len(edad_ids)) & (edad_ids[posicion_valida] == ids)
+    else:
+        encontrado = np.zeros(len(ids), dtype=bool)
+    for dimension in DIMENSIONES_EDAD_SEXO:
+        columna = np.full(len(ids), diccionarios[dimension].codificar([None])[0], dtype=np.int32)
+        columna[encontrado] = edad_codigos[dimension][posicion_valida[encontrado]]
+        codigos[dimension] = columna
+
+    # Ids densos: los conteos de distintos trabajan con enteros chicos
+    distintos, ids_densos = np.unique(ids, return_inverse=True)
+
+    return Cubo(
+        ids=ids_densos.astype(np.int64),
+        codigos=codigos,
+        valores={d: diccionarios[d].valores for d in DIMENSIONES},
+        cargado_en=datetime.now(),
+        segundos_carga=time.perf_counter() - inicio,
+        watermark=watermark,
+        cantidad_ids=max(len(distintos), 1),
+    )
+
+
+# ---------------------------------------------------
+# POLÍTICAS DE REFRESCO
+# ---------------------------------------------------
+
+class PoliticaRefresco(ABC):
+    """Decide si el cubo cargado sigue sirviendo"""
+    nombre = "base"
+
+    @abstractmethod
+    def vigente(self, cubo: Cubo, db: Session) -> bool:
+        ...
+
+
+class PoliticaTTL(PoliticaRefresco):
+    """Recarga cuando el cubo tiene más de `segundos`"""
+    nombre = "ttl"
+
+    def __init__(self, segundos: float):
+        self.segundos = segundos
+
+    def vigente(self, cubo: Cubo, db: Session) -> bool:
+        return (datetime.now() - cubo.cargado_en).total_seconds() < self.segundos
+
+
+class PoliticaManual(PoliticaRefresco):
+    """Sólo se recarga a pedido (POST /cubo/recargar)"""
+    nombre = "manual"
+
+    def vigente(self, cubo: Cubo, db: Session) -> bool:
+        return True
+
+
+class PoliticaWatermark(PoliticaRefresco):
+    """
+    Como los snapshots: recarga cuando aparece un id_adolescente mayor al
+    último cargado. El watermark se consulta como mucho cada `chequeo`
+    segundos, y `max_antiguedad` fuerza una recarga para reflejar bajas o
+    cambios en filas ya cargadas.
+    """
+    nombre = "watermark"
+
+    def __init__(self, chequeo: float, max_antiguedad: float):
+        self.chequeo = chequeo
+        self.max_antiguedad = max_antiguedad
+        self._ultimo_chequeo = 0.0
+
+    def vigente(self, cubo: Cubo, db: Session) -> bool:
+        if (datetime.now() - cubo.cargado_en).total_seconds() >= self.max_antiguedad:
+            return False
+        ahora = time.monotonic()
+        if ahora - self._ultimo_chequeo < self.chequeo:
+            return True
+        self._ultimo_chequeo = ahora
+        return _watermark(db) == cubo.watermark
+
+
+def politica_desde_config() -> PoliticaRefresco:
+    if CuboConfig.POLITICA == "manual":
+        return PoliticaManual()
+    if CuboConfig.POLITICA == "watermark":
+        return PoliticaWatermark(CuboConfig.CHEQUEO, CuboConfig.MAX_ANTIGUEDAD)
+    return PoliticaTTL(CuboConfig.TTL)
+
+
+# ---------------------------------------------------
+# INSTANCIA COMPARTIDA
+# ---------------------------------------------------
+# Se reemplaza con una sola asignación: las consultas en curso siguen
+# usando el cubo anterior hasta terminar.
+
+politica = politica_desde_config()
+_cubo = None
+_lock = threading.Lock()
+
+
+def obtener_cubo(db: Session) -> Cubo:
+    """Devuelve el cubo cargado, recargándolo si la política lo pide"""
+    global _cubo
+    cubo = _cubo
+    if cubo is not None and politica.vigente(cubo, db):
+        return cubo
+    with _lock:
+        if _cubo is cubo:  # nadie lo recargó mientras se esperaba el lock
+            _cubo = cargar(db)
+        return _cubo
+
+
+def recargar(db: Session) -> Cubo:
+    global _cubo
+    with _lock:
+        _cubo = cargar(db)
+        return _cubo
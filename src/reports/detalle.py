@@ -0,0 +1,142 @@
+import base64
+import json
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.models.models_orm import VistaActividad
+from src.reports.filtros import FiltrosReporte
+from src.utils.respuestas import dumps
+
+
+# ---------------------------------------------------
+# DETALLE DE ADOLESCENTES POR ACTIVIDAD E INSTITUCIÓN
+# ---------------------------------------------------
+#
+# Dos formas de leer el detalle sin cargarlo entero en memoria:
+# - páginas con keyset sobre `id_adolescente` (cursor opaco), y
+# - streaming desde un cursor del lado del servidor, por lotes.
+
+COLUMNAS_DETALLE = {
+    "id_adolescente": VistaActividad.id_adolescente,
+    "actividad": VistaActividad.Actividad,
+    "institucion": VistaActividad.Institucion,
+    "sede": VistaActividad.Sede,
+    "categoria": VistaActividad.Categoria,
+    "dia": VistaActividad.Dia,
+    "horario": VistaActividad.Horario,
+}
+
+COLUMNAS_POR_DEFECTO = ["actividad", "institucion"]
+
+TAMANO_LOTE = 5000
+
+
+def proyectar(columnas: str | None) -> list:
+    """Valida la lista "a,b,c" de columnas pedidas"""
+    if not columnas:
+        return list(COLUMNAS_POR_DEFECTO)
+    pedidas = [c.strip() for c in columnas.split(",") if c.strip()]
+    invalidas = [c for c in pedidas if c not in COLUMNAS_DETALLE]
+    if invalidas or not pedidas:
+        raise ValueError(f"Columnas inválidas: {', '.join(invalidas) or columnas}")
+    return pedidas
+
+
+# ---------------------------------------------------
+# CURSOR OPACO
+# ---------------------------------------------------
+
+def codificar_cursor(id_adolescente: int) -> str:
+    crudo = json.dumps({"id": id_adolescente}).encode()
+    return base64.urlsafe_b64encode(crudo).decode().rstrip("=")
+
+
+def decodificar_cursor(token: str) -> int:
+    try:
+        relleno = "=" * (-len(token) % 4)
+        return int(json.loads(base64.urlsafe_b64decode(token + relleno))["id"])
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Cursor inválido") from None
+
+
+# ---------------------------------------------------
+# CONSULTAS
+# ---------------------------------------------------
+
+def _consulta(columnas: list, desde_id: int | None = None, ordenar: bool = False,
+              filtros: FiltrosReporte | None = None):
+    id_adolescente = VistaActividad.id_adolescente
+    consulta = select(id_adolescente, *[COLUMNAS_DETALLE[c] for c in columnas])
+    if filtros:
+        consulta = consulta.where(*filtros.condiciones(VistaActividad))
+    if desde_id is not None:
+        consulta = consulta.where(id_adolescente > desde_id)
+    if ordenar or desde_id is not None:
+        consulta = consulta.order_by(id_adolescente)
+    return consulta
+
+
+def pagina_detalle(db: Session, columnas: list, limite: int, desde_id: int | None = None,
+                   filtros: FiltrosReporte | None = None):
+    """
+    Devuelve (filas, siguiente_id). Un adolescente puede tener varias
+    filas (una por actividad): la página nunca lo corta a la mitad, así
+    el cursor `id > ultimo` no pierde ni repite filas.
+    """
+    filas = db.execute(_consulta(columnas, desde_id, ordenar=True, filtros=filtros).limit(limite)).all()
+    if len(filas) < limite:
+        return [tuple(f[1:]) for f in filas], None
+
+    ultimo = filas[-1][0]
+    completas = [f for f in filas if f[0] != ultimo]
+    del_ultimo = db.execute(
+        _consulta(columnas, filtros=filtros).where(VistaActividad.id_adolescente == ultimo)
+    ).all()
+
+    return [tuple(f[1:]) for f in completas + del_ultimo], ultimo
+
+
+def iterar_detalle(bind, columnas: list, desde_id: int | None = None, tamano_lote: int = TAMANO_LOTE,
+                   filtros: FiltrosReporte | None = None):
+    """Lotes de filas desde un cursor del lado del servidor, en sesión propia"""
+    with Session(bind=bind) as sesion:
+        resultado = sesion.execute(
+            _consulta(columnas, desde_id, filtros=filtros).execution_options(yield_per=tamano_lote)
+        )
+        for lote in resultado.partitions():
+            yield [tuple(f[1:]) for f in lote]
+
+
+async def iterar_detalle_async(bind, columnas: list, desde_id: int | None = None, tamano_lote: int = TAMANO_LOTE,
+                              filtros: FiltrosReporte | None = None):
+    """Versión async de iterar_detalle (bind = AsyncEngine)"""
+    async with AsyncSession(bind=bind) as sesion:
+        resultado = await sesion.stream(_consulta(columnas, desde_id, filtros=filtros))
+        async for lote in resultado.partitions(tamano_lote):
+            yield [tuple(f[1:]) for f in lote]
+
+
+# ---------------------------------------------------
+# SERIALIZACIÓN POR LOTES
+# ---------------------------------------------------
+
+def lote_a_json(lote, columnas: list, formato: str, primero: bool) -> bytes:
+    """
+    - ndjson: un objeto por línea
+    - columnar: un objeto {columna: [valores]} por lote y por línea
+    - json: fragmento de un array JSON (el router agrega "[" y "]")
+    """
+    if formato == "columnar":
+        valores = list(zip(*lote)) if lote else [() for _ in columnas]
+        return dumps(dict(zip(columnas, map(list, valores)))) + b"\n"
+
+    objetos = [dict(zip(columnas, fila)) for fila in lote]
+    if formato == "ndjson":
+        return b"".join(dumps(o) + b"\n" for o in objetos)
+
+    texto = dumps(objetos)[1:-1]  # sin los corchetes del array
+    if texto and not primero:
+        texto = b"," + texto
+    return texto
@@ -0,0 +1,117 @@
+from dataclasses import dataclass, fields
+
+from fastapi import Query
+from sqlalchemy import select
+
+from src.models.models_orm import VistaActividad, VistaEdadSexo
+
+
+# ---------------------------------------------------
+# FILTROS DE REPORTES (DRILL-DOWN)
+# ---------------------------------------------------
+#
+# Cada filtro se compila a `columna = :valor` o `columna IN (:valores)`
+# sobre la columna tal cual (sin funciones ni LIKE), así el motor puede
+# usar índices. Si el filtro pertenece a la otra vista (p. ej. `genero`
+# al pedir reportes por actividad) se aplica como semi-join por
+# id_adolescente: `id_adolescente IN (SELECT id_adolescente ... WHERE ...)`.
+
+COLUMNAS_FILTRO = {
+    "institucion": VistaActividad.Institucion,
+    "sede": VistaActividad.Sede,
+    "categoria": VistaActividad.Categoria,
+    "actividad": VistaActividad.Actividad,
+    "dia": VistaActividad.Dia,
+    "tramo_edad": VistaEdadSexo.tramo_edad,
+    "genero": VistaEdadSexo.genero,
+}
+
+
+def _normalizar(valores) -> tuple:
+    if valores is None:
+        return ()
+    if isinstance(valores, str):
+        valores = [valores]
+    return tuple(sorted({v.strip() for v in valores if v and v.strip()}))
+
+
+@dataclass(frozen=True)
+class FiltrosReporte:
+    """Valores aceptados por campo; un campo vacío no filtra"""
+    institucion: tuple = ()
+    sede: tuple = ()
+    categoria: tuple = ()
+    actividad: tuple = ()
+    dia: tuple = ()
+    tramo_edad: tuple = ()
+    genero: tuple = ()
+
+    @classmethod
+    def crear(cls, **valores) -> "FiltrosReporte":
+        """Acepta str o listas; descarta vacíos y duplicados"""
+        return cls(**{campo: _normalizar(v) for campo, v in valores.items()})
+
+    def activos(self) -> dict:
+        return {
+            f.name: getattr(self, f.name)
+            for f in fields(self)
+            if getattr(self, f.name)
+        }
+
+    def __bool__(self) -> bool:
+        return bool(self.activos())
+
+    def clave(self) -> tuple:
+        """Clave hashable y estable, para memorizar resultados"""
+        return tuple(self.activos().items())
+
+    def condiciones(self, modelo) -> list:
+        """
+        Expresiones WHERE para consultar `modelo` (VistaActividad o
+        VistaEdadSexo) con estos filtros.
+        """
+        propias = []
+        por_vista = {}
+        for campo, valores in self.activos().items():
+            columna = COLUMNAS_FILTRO[campo]
+            expresion = columna == valores[0] if len(valores) == 1 else columna.in_(valores)
+            if columna.class_ is modelo:
+                propias.append(expresion)
+            else:
+                por_vista.setdefault(columna.class_, []).append(expresion)
+
+        for otra, expresiones in por_vista.items():
+            propias.append(
+                modelo.id_adolescente.in_(select(otra.id_adolescente).where(*expresiones))
+            )
+        return propias
+
+    def describir(self) -> str:
+        return "; ".join(f"{campo}: {', '.join(v)}" for campo, v in self.activos().items())
+
+
+SIN_FILTROS = FiltrosReporte()
+
+
+def parametros_filtros(
+    institucion: list[str] | None = Query(None),
+    sede: list[str] | None = Query(None),
+    categoria: list[str] | None = Query(None),
+    actividad: list[str] | None = Query(None),
+    dia: list[str] | None = Query(None),
+    tramo_edad: list[str] | None = Query(None),
+    genero: list[str] | None = Query(None),
+) -> FiltrosReporte:
+    """
+    Dependencia de FastAPI: `?institucion=A&institucion=B&genero=mujer`.
+    Cada parámetro se puede repetir (IN).
+    """
+    return FiltrosReporte.crear(
+        institucion=institucion,
+        sede=sede,
+        categoria=categoria,
+        actividad=actividad,
+        dia=dia,
+        tramo_edad=tramo_edad,
+        genero=genero,
+    )
@@ -0,0 +1,178 @@
+import atexit
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from config.settings import GraficosConfig
+from src.utils.cache_utils import CacheMemoriaLRU
+
+
+# ---------------------------------------------------------
+# SERVICIO DE GRÁFICOS PARA LOS REPORTES PDF
+# ---------------------------------------------------------
+#
+# - Se renderiza con la API orientada a objetos de matplotlib (Figure),
+#   sin el estado global de pyplot, en un pool de procesos aparte del
+#   thread del request.
+# - Cada PNG se cachea en memoria y en disco, con clave = hash de
+#   (tipo, título, etiquetas, valores, dpi): si los datos no cambian,
+#   no se vuelve a renderizar.
+
+
+# ---------------------------------------------------------
+# RENDER (corre dentro de los procesos del pool)
+# ---------------------------------------------------------
+def _png(fig, dpi: int) -> bytes:
+    buffer = io.BytesIO()
+    fig.tight_layout()
+    fig.savefig(buffer, format="png", dpi=dpi)
+    return buffer.getvalue()
+
+
+def renderizar_barras(titulo, etiquetas, valores, dpi) -> bytes:
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(10, 5))  # tamaño grande
+    ax = fig.subplots()
+    ax.set_title(titulo, fontsize=14)
+    ax.bar(etiquetas, valores)
+    for etiqueta in ax.get_xticklabels():
+        etiqueta.set_rotation(45)
+        etiqueta.set_horizontalalignment("right")
+        etiqueta.set_fontsize(8)
+    return _png(fig, dpi)
+
+
+def renderizar_torta(titulo, etiquetas, valores, dpi) -> bytes:
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(7, 7))  # torta grande
+    ax = fig.subplots()
+    ax.set_title(titulo, fontsize=14)
+    ax.pie(valores, labels=etiquetas, autopct='%1.1f%%')
+    return _png(fig, dpi)
+
+
+RENDERIZADORES = {
+    "barras": renderizar_barras,
+    "torta": renderizar_torta,
+}
+
+
+# ---------------------------------------------------------
+# POOL DE PROCESOS
+# ---------------------------------------------------------
+_pool = None
+_lock_pool = threading.Lock()
+
+
+def obtener_pool():
+    """Crea el pool la primera vez (con 'spawn': el proceso padre tiene threads)"""
+    global _pool
+    if _pool is None and GraficosConfig.PROCESOS > 0:
+        with _lock_pool:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(
+                    max_workers=GraficosConfig.PROCESOS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                atexit.register(_pool.shutdown, wait=False, cancel_futures=True)
+    return _pool
+
+
+# ---------------------------------------------------------
+# CACHE EN MEMORIA + DISCO
+# ---------------------------------------------------------
+_memoria = CacheMemoriaLRU(
+    max_entradas=GraficosConfig.CACHE_MEMORIA_ENTRADAS,
+    max_bytes=GraficosConfig.CACHE_MEMORIA_BYTES,
+)
+
+
+def clave_grafico(tipo: str, titulo: str, etiquetas, valores, dpi: int) -> str:
+    datos = json.dumps([tipo, titulo, list(etiquetas), list(valores), dpi], default=str)
+    return hashlib.sha256(datos.encode("utf-8")).hexdigest()
+
+
+def _ruta(clave: str) -> Path:
+    return Path(GraficosConfig.DIRECTORIO) / f"{clave}.png"
+
+
+def _leer_disco(clave: str):
+    ruta = _ruta(clave)
+    try:
+        datos = ruta.read_bytes()
+        os.utime(ruta)  # marca de uso para el desalojo LRU
+        return datos
+    except OSError:
+        return None
+
+
+def _guardar_disco(clave: str, datos: bytes):
+    directorio = Path(GraficosConfig.DIRECTORIO)
+    try:
+        directorio.mkdir(parents=True, exist_ok=True)
+        temporal = directorio / f"{clave}.{os.getpid()}.{threading.get_ident()}.tmp"
+        temporal.write_bytes(datos)
+        os.replace(temporal, _ruta(clave))
+        _desalojar_disco(directorio)
+    except OSError:
+        pass  # el disco es sólo un cache: si falla, se sigue sin él
+
+
+def _desalojar_disco(directorio: Path):
+    archivos = []
+    total = 0
+    for ruta in directorio.glob("*.png"):
+        try:
+            info = ruta.stat()
+        except OSError:
+            continue
+        archivos.append((info.st_mtime, info.st_size, ruta))
+        total += info.st_size
+
+    archivos.sort()
+    while archivos and total > GraficosConfig.CACHE_DISCO_BYTES:
+        _, tamano, ruta = archivos.pop(0)
+        ruta.unlink(missing_ok=True)
+        total -= tamano
+
+
+# ---------------------------------------------------------
+# API PÚBLICA
+# ---------------------------------------------------------
+def obtener_grafico(tipo: str, titulo: str, etiquetas, valores) -> bytes:
+    """Devuelve el PNG del gráfico, desde cache o renderizándolo en el pool"""
+    dpi = GraficosConfig.DPI
+    etiquetas, valores = list(etiquetas), list(valores)
+    clave = clave_grafico(tipo, titulo, etiquetas, valores, dpi)
+
+    datos = _memoria.obtener(clave)
+    if datos is not None:
+        return datos
+
+    datos = _leer_disco(clave)
+    if datos is None:
+        pool = obtener_pool()
+        renderizar = RENDERIZADORES[tipo]
+        if pool is not None:
+            datos = pool.submit(renderizar, titulo, etiquetas, valores, dpi).result()
+        else:
+            datos = renderizar(titulo, etiquetas, valores, dpi)
+        _guardar_disco(clave, datos)
+
+    _memoria.guardar(clave, datos)
+    return datos
+
+
+def grafico_barras(titulo, etiquetas, valores) -> bytes:
+    return obtener_grafico("barras", titulo, etiquetas, valores)
+
+
+def grafico_torta(titulo, etiquetas, valores) -> bytes:
+    return obtener_grafico("torta", titulo, etiquetas, valores)
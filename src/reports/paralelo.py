@@ -0,0 +1,65 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy.orm import Session
+
+from config.settings import ParaleloConfig
+from src.reports.agregacion import calcular, clave_memo
+from src.reports.filtros import FiltrosReporte
+
+
+# ---------------------------------------------------
+# FAN-OUT DE CONSULTAS INDEPENDIENTES
+# ---------------------------------------------------
+# Los reportes compuestos (Excel completo, PDF general) necesitan varias
+# consultas que no dependen entre sí. Acá se lanzan en paralelo, cada una
+# con su propia sesión (y por lo tanto su propia conexión del pool), con
+# un tope de concurrencia por request.
+
+def ejecutar_en_paralelo(db: Session, tareas: dict, max_paralelo: int | None = None) -> dict:
+    """
+    Ejecuta `tareas` ({nombre: funcion(sesion)}) en paralelo. Cada función
+    recibe una sesión nueva sobre el mismo motor que `db`.
+    """
+    if not tareas:
+        return {}
+
+    bind = db.get_bind()
+    limite = max(1, min(max_paralelo or ParaleloConfig.MAX_POR_REQUEST, len(tareas)))
+
+    def correr(funcion):
+        with Session(bind=bind) as sesion:
+            return funcion(sesion)
+
+    # Cada tarea corre con una copia del contexto del request (la ruta que
+    # etiquetan las métricas de consultas, ver src/utils/metricas.py)
+    with ThreadPoolExecutor(max_workers=limite) as executor:
+        futuros = {
+            nombre: executor.submit(contextvars.copy_context().run, correr, funcion)
+            for nombre, funcion in tareas.items()
+        }
+        return {nombre: futuro.result() for nombre, futuro in futuros.items()}
+
+
+def precargar_agregados(
+    db: Session,
+    vistas,
+    max_paralelo: int | None = None,
+    filtros: FiltrosReporte | None = None,
+):
+    """
+    Calcula en paralelo el agregado de cada vista (con `filtros`, si hay)
+    y lo deja en la memoria de `db`, así las funciones de `adolescentes.py`
+    lo encuentran listo.
+    """
+    memo = db.info.setdefault("agregados", {})
+    pendientes = {
+        clave_memo(vista, filtros): (
+            lambda sesion, vista=vista: calcular(
+                sesion, vista, filtros.condiciones(vista.modelo) if filtros else ()
+            )
+        )
+        for vista in vistas
+        if clave_memo(vista, filtros) not in memo
+    }
+    memo.update(ejecutar_en_paralelo(db, pendientes, max_paralelo))
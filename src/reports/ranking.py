@@ -0,0 +1,82 @@
+from bisect import bisect_left
+from dataclasses import dataclass
+from functools import cached_property
+
+
+# ---------------------------------------------------
+# RANKING DE UNA DIMENSIÓN
+# ---------------------------------------------------
+#
+# Los conteos completos de una dimensión, ya ordenados de mayor a menor,
+# se calculan una sola vez (ver src/reports/agregacion.py) y de ahí sale
+# cualquier corte: TOP-N, BOTTOM-N, percentiles y cuartiles, sin volver
+# a consultar la base.
+
+ETIQUETAS_CUARTIL = ("Q1", "Q2", "Q3", "Q4")
+
+# Tope del parámetro `n` de los endpoints TOP-N
+MAX_TOP = 1000
+
+
+@dataclass(frozen=True)
+class Ranking:
+    """Filas (valor, cantidad) de una dimensión, de mayor a menor cantidad"""
+    filas: tuple
+
+    def __len__(self) -> int:
+        return len(self.filas)
+
+    @cached_property
+    def _ascendentes(self) -> list:
+        return [cantidad for _, cantidad in reversed(self.filas)]
+
+    # -----------------------------------------------
+    # CORTES
+    # -----------------------------------------------
+
+    def top(self, n: int) -> list:
+        return list(self.filas[:max(n, 0)])
+
+    def bottom(self, n: int) -> list:
+        """Las `n` de menor cantidad, de menor a mayor"""
+        if n <= 0:
+            return []
+        return list(reversed(self.filas[-n:]))
+
+    def percentil(self, p: float) -> float | None:
+        """
+        Cantidad en el percentil `p` (0-100), con interpolación lineal
+        entre posiciones (igual que numpy.percentile / pandas.quantile).
+        """
+        valores = self._ascendentes
+        if not valores:
+            return None
+        posicion = (len(valores) - 1) * min(max(p, 0), 100) / 100
+        abajo = int(posicion)
+        arriba = min(abajo + 1, len(valores) - 1)
+        return valores[abajo] + (valores[arriba] - valores[abajo]) * (posicion - abajo)
+
+    def desde_percentil(self, p: float) -> list:
+        """Filas con cantidad >= al percentil `p` (p. ej. 90 = el 10% más alto)"""
+        corte = self.percentil(p)
+        if corte is None:
+            return []
+        return [fila for fila in self.filas if fila[1] >= corte]
+
+    def cuartiles(self, etiquetas=ETIQUETAS_CUARTIL) -> dict:
+        """
+        Cuartil de cada valor, con el mismo criterio que pd.qcut(..., 4):
+        intervalos (borde_i, borde_i+1], con el primero cerrado a izquierda.
+        A diferencia de qcut, bordes repetidos no son error: el valor queda
+        en el primer intervalo que lo contiene.
+
+        Returns:
+            {valor: etiqueta}
+        """
+        if not self.filas:
+            return {}
+        bordes = [self.percentil(100 * i / len(etiquetas)) for i in range(1, len(etiquetas))]
+        return {
+            valor: etiquetas[bisect_left(bordes, cantidad)]
+            for valor, cantidad in self.filas
+        }
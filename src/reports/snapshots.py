@@ -0,0 +1,183 @@
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from config.settings import SnapshotConfig
+from src.database.conexiones import usar_primario
+from src.models.models_orm import ResumenConteo, ResumenEstado
+from src.reports.agregacion import (
+    calcular, ResultadoAgregado, DefinicionVista, ordenar_conteos,
+    VISTA_ACTIVIDAD, VISTA_EDAD_SEXO,
+)
+
+
+# ---------------------------------------------------
+# SNAPSHOTS MATERIALIZADOS DE LOS REPORTES
+# ---------------------------------------------------
+#
+# Los conteos por dimensión de cada vista se guardan en tablas resumen
+# (`resumen_adolescentes_conteo` / `_estado`, ver sql/resumen_snapshots.sql).
+# Los GET sólo leen: el refresco corre en segundo plano (SNAPSHOT_REFRESCO)
+# o con POST /reportes/snapshots/refrescar.
+#
+# El refresco es incremental: se agregan las filas con `id_adolescente`
+# mayor al watermark y sus conteos se suman a los existentes. Las vistas
+# no tienen una marca de modificación, así que antes se compara la firma
+# (cantidad de filas y suma de ids) del tramo ya contado: si cambió
+# (inscripciones o confirmaciones nuevas de adolescentes ya contados,
+# bajas) se reconstruye todo. Un cambio que no altera la firma (p. ej.
+# una inscripción movida de actividad) se refleja en la reconstrucción
+# periódica (`SnapshotConfig.RECONSTRUCCION`).
+
+VISTAS = {v.nombre: v for v in (VISTA_ACTIVIDAD, VISTA_EDAD_SEXO)}
+
+_TABLAS = [ResumenConteo.__table__, ResumenEstado.__table__]
+
+# Un refresco a la vez por proceso (entre procesos serializa el FOR UPDATE)
+_lock_refresco = threading.Lock()
+
+
+@dataclass
+class Snapshot:
+    resultado: ResultadoAgregado
+    actualizado_en: datetime | None
+    vencido: bool
+
+
+def crear_tablas(conexion):
+    """
+    Crea las tablas resumen y las filas de estado de cada vista (bases
+    locales y de pruebas; en MySQL, sql/resumen_snapshots.sql).
+    """
+    ResumenConteo.metadata.create_all(conexion, tables=_TABLAS)
+    existentes = set(conexion.scalars(select(ResumenEstado.vista)))
+    faltantes = [{"vista": nombre} for nombre in VISTAS if nombre not in existentes]
+    if faltantes:
+        conexion.execute(insert(ResumenEstado), faltantes)
+
+
+# ---------------------------------------------------
+# REFRESCO
+# ---------------------------------------------------
+
+def _firma(db: Session, vista: DefinicionVista, watermark: int) -> tuple:
+    id_adolescente = vista.modelo.id_adolescente
+    filas, suma = db.execute(
+        select(func.count(), func.coalesce(func.sum(id_adolescente), 0))
+        .where(id_adolescente <= watermark)
+    ).one()
+    return filas, int(suma)
+
+
+def refrescar(db: Session, vista: DefinicionVista, completo: bool = False):
+    """
+    Actualiza el snapshot de la vista. Si no hay snapshot previo, si se
+    pide `completo`, si venció el plazo de reconstrucción o si cambió la
+    firma del tramo ya contado, recalcula todo; si no, sólo agrega el
+    tramo nuevo desde el watermark.
+
+    Escribe las tablas resumen: el resto de la sesión lee del primario.
+    """
+    usar_primario(db)
+    ahora = datetime.now()
+    id_adolescente = vista.modelo.id_adolescente
+
+    estado = db.get(ResumenEstado, vista.nombre, with_for_update=True)
+    if estado is None:
+        raise RuntimeError(
+            f"Falta la fila de estado del snapshot {vista.nombre!r}: ejecutar sql/resumen_snapshots.sql"
+        )
+    nuevo_watermark = db.scalar(select(func.max(id_adolescente))) or 0
+
+    reconstruir = (
+        completo
+        or estado.reconstruido_en is None
+        or ahora - estado.reconstruido_en > timedelta(seconds=SnapshotConfig.RECONSTRUCCION)
+        or nuevo_watermark < (estado.watermark or 0)
+        or _firma(db, vista, estado.watermark or 0) != (estado.filas, estado.suma_ids)
+    )
+
+    if reconstruir:
+        resultado = calcular(db, vista, [id_adolescente <= nuevo_watermark])
+        db.query(ResumenConteo).filter(ResumenConteo.vista == vista.nombre).delete()
+        _sumar_conteos(db, vista, resultado, existentes={})
+        estado.total = resultado.total
+        estado.reconstruido_en = ahora
+
+    elif nuevo_watermark > estado.watermark:
+        delta = calcular(db, vista, [
+            id_adolescente > estado.watermark,
+            id_adolescente <= nuevo_watermark,
+        ])
+        existentes = {
+            (fila.dimension, fila.valor): fila
+            for fila in db.query(ResumenConteo).filter(ResumenConteo.vista == vista.nombre)
+        }
+        _sumar_conteos(db, vista, delta, existentes)
+        estado.total = (estado.total or 0) + delta.total
+
+    estado.watermark = nuevo_watermark
+    estado.filas, estado.suma_ids = _firma(db, vista, nuevo_watermark)
+    estado.actualizado_en = ahora
+    db.commit()
+
+    # Los datos cambiaron: lo memorizado en la sesión ya no vale
+    db.info.pop("agregados", None)
+
+
+def _sumar_conteos(db: Session, vista: DefinicionVista, resultado: ResultadoAgregado, existentes: dict):
+    for dimension, filas in resultado.conteos.items():
+        for valor, cantidad in filas:
+            fila = existentes.get((dimension, valor))
+            if fila is not None:
+                fila.cantidad += cantidad
+            else:
+                db.add(ResumenConteo(
+                    vista=vista.nombre,
+                    dimension=dimension,
+                    valor=valor,
+                    cantidad=cantidad,
+                ))
+
+
+def refrescar_todo(db: Session, completo: bool = False):
+    with _lock_refresco:
+        for vista in VISTAS.values():
+            refrescar(db, vista, completo=completo)
+
+
+# ---------------------------------------------------
+# LECTURA
+# ---------------------------------------------------
+
+def leer(db: Session, vista: DefinicionVista) -> Snapshot:
+    """
+    Lee el snapshot de la vista desde las tablas resumen, sin escribir.
+    Si supera `SnapshotConfig.MAX_ANTIGUEDAD` se devuelve igual, marcado
+    como vencido; si todavía no se calculó nunca, se agrega la vista en
+    el momento (también marcado como vencido).
+    """
+    estado = db.get(ResumenEstado, vista.nombre)
+    if estado is None or estado.actualizado_en is None:
+        return Snapshot(resultado=calcular(db, vista), actualizado_en=None, vencido=True)
+
+    conteos = {nombre: {} for nombre in vista.dimensiones}
+    filas = db.execute(
+        select(ResumenConteo.dimension, ResumenConteo.valor, ResumenConteo.cantidad)
+        .where(ResumenConteo.vista == vista.nombre)
+    )
+    for dimension, valor, cantidad in filas:
+        if dimension in conteos:
+            conteos[dimension][valor] = cantidad
+
+    return Snapshot(
+        resultado=ResultadoAgregado(
+            total=estado.total or 0,
+            conteos={nombre: ordenar_conteos(c) for nombre, c in conteos.items()},
+        ),
+        actualizado_en=estado.actualizado_en,
+        vencido=datetime.now() - estado.actualizado_en > timedelta(seconds=SnapshotConfig.MAX_ANTIGUEDAD),
+    )
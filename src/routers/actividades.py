@@ -1,11 +1,19 @@
 from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from src.database.conexiones import get_db
-from src.crud.actividades import get_actividades
+from starlette.concurrency import run_in_threadpool
+from src.database.conexiones import get_sesion
+from src.crud.actividades import COLUMNAS_ACTIVIDAD, get_actividades_filas, get_actividades_filas_async
 from src.models.schemas import ActividadOut
+from src.utils.respuestas import respuesta_filas
 
 router = APIRouter(prefix="/actividades", tags=["Actividades"])
 
 @router.get("/", response_model=list[ActividadOut])
-def listar_actividades(db: Session = Depends(get_db)):
-    return get_actividades(db)
+async def listar_actividades(db: Session | AsyncSession = Depends(get_sesion)):
+    # Tuplas de la base -> JSON, sin entidades ORM ni validación Pydantic
+    if isinstance(db, AsyncSession):
+        filas = await get_actividades_filas_async(db)
+    else:
+        filas = await run_in_threadpool(get_actividades_filas, db)
+    return respuesta_filas([c.key for c in COLUMNAS_ACTIVIDAD], filas)
@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, Query
+
+from src.utils.consultas_lentas import registro_consultas
+from src.utils.seguridad import verificar_token_admin
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(verificar_token_admin)])
+
+
+# ---------------------------------------------------------
+# DIAGNÓSTICO DE CONSULTAS (ver src/utils/consultas_lentas.py)
+# ---------------------------------------------------------
+@router.get("/consultas-lentas")
+def consultas_lentas(limite: int | None = Query(None, ge=1)):
+    """Más recientes primero, con el plan de EXPLAIN cuando ya está listo"""
+    return {
+        "umbral_ms": registro_consultas.umbral * 1000,
+        "consultas": registro_consultas.consultas_lentas(limite),
+    }
+
+
+@router.get("/consultas-repetidas")
+def consultas_repetidas(limite: int | None = Query(None, ge=1)):
+    """Sentencias repetidas y patrones N+1 detectados por request"""
+    return {
+        "repeticiones_n1": registro_consultas.repeticiones_n1,
+        "hallazgos": registro_consultas.consultas_repetidas(limite),
+    }
+
+
+@router.delete("/consultas")
+def limpiar_consultas():
+    registro_consultas.limpiar()
+    return {"mensaje": "Registros de consultas vaciados"}
@@ -0,0 +1,67 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from src.database.conexiones import get_sesion_lectura, ejecutar_en_sesion
+from src.reports import cubo
+from src.reports.filtros import FiltrosReporte, parametros_filtros
+from src.utils.seguridad import verificar_token_admin
+
+router = APIRouter(prefix="/cubo", tags=["Cubo"])
+
+
+# ---------------------------------------------------------
+# CONSULTAS AD-HOC SOBRE EL CUBO EN MEMORIA
+# ---------------------------------------------------------
+# La base sólo se lee al (re)cargar el cubo; cada consulta se resuelve
+# con NumPy en un thread, fuera del event loop.
+
+def _info(c: cubo.Cubo) -> dict:
+    return {
+        "filas": c.filas,
+        "adolescentes": c.cantidad_ids,
+        "cardinalidades": c.cardinalidades(),
+        "cargado_en": c.cargado_en.isoformat(),
+        "segundos_carga": round(c.segundos_carga, 3),
+        "politica": cubo.politica.nombre,
+    }
+
+
+@router.get("/")
+async def consultar_cubo(
+    dimensiones: str | None = Query(None, description="Agrupar por, p. ej. institucion,genero"),
+    filtros: FiltrosReporte = Depends(parametros_filtros),
+    db: Session | AsyncSession = Depends(get_sesion_lectura),
+):
+    """
+    Cuenta filas (adolescente x actividad) y adolescentes distintos por
+    cualquier combinación de dimensiones, con los mismos filtros que los
+    reportes. Sin `dimensiones` devuelve sólo el total.
+    """
+    pedidas = [d.strip() for d in (dimensiones or "").split(",") if d.strip()]
+    invalidas = [d for d in pedidas if d not in cubo.DIMENSIONES]
+    if invalidas or len(set(pedidas)) != len(pedidas):
+        raise HTTPException(
+            400,
+            f"Dimensiones inválidas: {', '.join(invalidas) or dimensiones} "
+            f"(disponibles: {', '.join(cubo.DIMENSIONES)})",
+        )
+
+    c = await ejecutar_en_sesion(db, cubo.obtener_cubo)
+    datos = await run_in_threadpool(c.consultar, pedidas, filtros)
+    return {
+        "dimensiones": pedidas,
+        "cargado_en": c.cargado_en.isoformat(),
+        "datos": datos,
+    }
+
+
+@router.get("/info")
+async def info_cubo(db: Session | AsyncSession = Depends(get_sesion_lectura)):
+    return _info(await ejecutar_en_sesion(db, cubo.obtener_cubo))
+
+
+@router.post("/recargar", dependencies=[Depends(verificar_token_admin)])
+async def recargar_cubo(db: Session | AsyncSession = Depends(get_sesion_lectura)):
+    return _info(await ejecutar_en_sesion(db, cubo.recargar))
@@ -0,0 +1,223 @@
+from dataclasses import dataclass
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from src.database.conexiones import get_db_lectura
+from src.models.models_orm import VistaActividad, VistaEdadSexo
+from src.reports.adolescentes import (
+    adolescentes_por_categoria,
+    adolescentes_por_institucion,
+    adolescentes_por_actividad,
+    top10_instituciones,
+    top10_actividades,
+    adolescentes_por_tramo_edad,
+    adolescentes_por_genero,
+)
+from src.utils.stream_utils import Sumidero
+
+router = APIRouter(prefix="/exportar", tags=["Exportaciones"])
+
+
+# ---------------------------------------------------------
+# FORMATOS
+# ---------------------------------------------------------
+FORMATOS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrow"),
+}
+
+# Tipos de Accept reconocidos -> formato
+TIPOS_ACEPTADOS = {
+    "text/csv": "csv",
+    "application/vnd.apache.parquet": "parquet",
+    "application/x-parquet": "parquet",
+    "application/vnd.apache.arrow.stream": "arrow",
+    "application/vnd.apache.arrow.file": "arrow",
+}
+
+
+def elegir_formato(formato: str | None, accept: str | None) -> str:
+    if formato:
+        if formato not in FORMATOS:
+            raise HTTPException(400, f"Formato no soportado: {formato}")
+        return formato
+
+    for parte in (accept or "").split(","):
+        tipo = parte.split(";")[0].strip().lower()
+        if tipo in TIPOS_ACEPTADOS:
+            return TIPOS_ACEPTADOS[tipo]
+    return "csv"
+
+
+# ---------------------------------------------------------
+# DATASETS
+# ---------------------------------------------------------
+@dataclass(frozen=True)
+class Dataset:
+    # [(nombre_columna, tipo python)], define el esquema de salida
+    columnas: list
+    # funcion(db, tamano_lote, columnas) -> iterable de DataFrames con
+    # sólo esas columnas, en ese orden
+    lotes: object
+
+
+# pandas / pyarrow se importan dentro de las funciones para no
+# cargarlos en el arranque de la API
+def _reporte(funcion, dimension: str) -> Dataset:
+    def lotes(db: Session, _, columnas: list):
+        import pandas as pd
+        return [pd.DataFrame(funcion(db), columns=[dimension, "cantidad"])[columnas]]
+
+    return Dataset(columnas=[(dimension, str), ("cantidad", int)], lotes=lotes)
+
+
+def _detalle(columnas: dict) -> Dataset:
+    def lotes(db: Session, tamano_lote: int, seleccion: list):
+        from src.utils.query_utils import DTYPES_CATEGORIA, leer_en_lotes
+
+        # Sólo las columnas pedidas viajan desde la base
+        consulta = select(*[columnas[nombre].label(nombre) for nombre in seleccion])
+
+        # Sesión propia: el generador vive mientras dura el streaming. La
+        # lectura usa un cursor del servidor (stream_results): el driver no
+        # trae la vista entera antes del primer lote. Institución, sede,
+        # actividad y categoría van como category (el esquema de salida
+        # las vuelve a string)
+        with Session(bind=db.get_bind()) as sesion:
+            yield from leer_en_lotes(sesion, consulta, chunksize=tamano_lote, dtypes=DTYPES_CATEGORIA)
+
+    return Dataset(
+        columnas=[(nombre, col.type.python_type) for nombre, col in columnas.items()],
+        lotes=lotes,
+    )
+
+
+DATASETS = {
+    "categoria": _reporte(adolescentes_por_categoria, "categoria"),
+    "institucion": _reporte(adolescentes_por_institucion, "institucion"),
+    "actividad": _reporte(adolescentes_por_actividad, "actividad"),
+    "top10-instituciones": _reporte(top10_instituciones, "institucion"),
+    "top10-actividades": _reporte(top10_actividades, "actividad"),
+    "tramo-edad": _reporte(adolescentes_por_tramo_edad, "tramo_edad"),
+    "genero": _reporte(adolescentes_por_genero, "genero"),
+    "actividad-detalle": _detalle({
+        "id_adolescente": VistaActividad.id_adolescente,
+        "institucion": VistaActividad.Institucion,
+        "sede": VistaActividad.Sede,
+        "actividad": VistaActividad.Actividad,
+        "categoria": VistaActividad.Categoria,
+        "dia": VistaActividad.Dia,
+        "horario": VistaActividad.Horario,
+    }),
+    "edad-sexo-detalle": _detalle({
+        "id_adolescente": VistaEdadSexo.id_adolescente,
+        "edad": VistaEdadSexo.edad2025,
+        "genero": VistaEdadSexo.genero,
+        "tramo_edad": VistaEdadSexo.tramo_edad,
+    }),
+}
+
+
+def elegir_columnas(definicion: Dataset, columnas: str | None) -> list:
+    """
+    Proyección pedida en ?columnas=a,b (en ese orden); sin parámetro,
+    todas las del dataset
+    """
+    if not columnas:
+        return list(definicion.columnas)
+
+    tipos = dict(definicion.columnas)
+    pedidas = list(dict.fromkeys(c.strip() for c in columnas.split(",") if c.strip()))
+    invalidas = [c for c in pedidas if c not in tipos]
+    if invalidas or not pedidas:
+        raise HTTPException(400, f"Columnas inválidas: {invalidas} (opciones: {', '.join(tipos)})")
+    return [(nombre, tipos[nombre]) for nombre in pedidas]
+
+
+# ---------------------------------------------------------
+# ESCRITORES EN STREAMING
+# ---------------------------------------------------------
+def escribir_csv(columnas: list, lotes):
+    nombres = [nombre for nombre, _ in columnas]
+    yield (",".join(nombres) + "\n").encode("utf-8")
+    for df in lotes:
+        yield df.to_csv(index=False, header=False).encode("utf-8")
+
+
+def _esquema_arrow(columnas: list):
+    import pyarrow as pa
+
+    tipos = {int: pa.int64(), float: pa.float64(), bool: pa.bool_()}
+    return pa.schema([(nombre, tipos.get(tipo, pa.string())) for nombre, tipo in columnas])
+
+
+def escribir_arrow(columnas: list, lotes):
+    import pyarrow as pa
+
+    esquema = _esquema_arrow(columnas)
+    sumidero = Sumidero()
+    with pa.ipc.new_stream(sumidero, esquema) as escritor:
+        for df in lotes:
+            escritor.write_table(pa.Table.from_pandas(df, schema=esquema, preserve_index=False))
+            yield sumidero.drenar()
+    yield sumidero.drenar()
+
+
+def escribir_parquet(columnas: list, lotes):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    esquema = _esquema_arrow(columnas)
+    sumidero = Sumidero()
+    # Un row group por lote: el footer se escribe al cerrar
+    with pq.ParquetWriter(sumidero, esquema, compression="zstd") as escritor:
+        for df in lotes:
+            escritor.write_table(pa.Table.from_pandas(df, schema=esquema, preserve_index=False))
+            yield sumidero.drenar()
+    yield sumidero.drenar()
+
+
+ESCRITORES = {
+    "csv": escribir_csv,
+    "parquet": escribir_parquet,
+    "arrow": escribir_arrow,
+}
+
+
+# ---------------------------------------------------------
+# ENDPOINTS
+# ---------------------------------------------------------
+@router.get("/")
+def listar_datasets():
+    return {"datasets": list(DATASETS), "formatos": list(FORMATOS)}
+
+
+@router.get("/{dataset}")
+def exportar(
+    dataset: str,
+    request: Request,
+    formato: str | None = None,
+    columnas: str | None = Query(None, description="Columnas a exportar, separadas por coma (por defecto, todas)"),
+    tamano_lote: int = Query(10000, ge=100, le=500000),
+    db: Session = Depends(get_db_lectura),
+):
+    if dataset not in DATASETS:
+        raise HTTPException(404, f"Dataset inexistente: {dataset}")
+
+    formato = elegir_formato(formato, request.headers.get("accept"))
+    media_type, extension = FORMATOS[formato]
+    definicion = DATASETS[dataset]
+    seleccion = elegir_columnas(definicion, columnas)
+
+    lotes = definicion.lotes(db, tamano_lote, [nombre for nombre, _ in seleccion])
+    contenido = ESCRITORES[formato](seleccion, lotes)
+
+    return StreamingResponse(
+        contenido,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={dataset}.{extension}"}
+    )
@@ -1,12 +1,20 @@
 from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from src.database.conexiones import get_db
-from src.crud.instituciones import get_instituciones
+from src.database.conexiones import get_sesion
+from src.crud.instituciones import COLUMNAS_INSTITUCION, get_instituciones_filas, get_instituciones_filas_async
 from src.models.schemas import InstitucionOut
+from src.utils.respuestas import respuesta_filas
 
 router = APIRouter(prefix="/instituciones", tags=["Instituciones"])
 
 @router.get("/", response_model=list[InstitucionOut])
-def listar_instituciones(db: Session = Depends(get_db)):
-    return get_instituciones(db)
+async def listar_instituciones(db: Session | AsyncSession = Depends(get_sesion)):
+    # Tuplas de la base -> JSON, sin entidades ORM ni validación Pydantic
+    if isinstance(db, AsyncSession):
+        filas = await get_instituciones_filas_async(db)
+    else:
+        filas = await run_in_threadpool(get_instituciones_filas, db)
+    return respuesta_filas([c.key for c in COLUMNAS_INSTITUCION], filas)
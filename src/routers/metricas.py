@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from src.utils.metricas import exportar
+
+router = APIRouter(tags=["Métricas"])
+
+
+@router.get("/metrics", include_in_schema=False)
+def metricas():
+    cuerpo, tipo = exportar()
+    return Response(cuerpo, media_type=tipo)
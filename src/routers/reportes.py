@@ -1,86 +1,287 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from src.models.models_orm import VistaActividad
 
-from src.database.conexiones import get_db
+from config.settings import CacheConfig
+from src.database.conexiones import get_sesion, get_sesion_lectura, ejecutar_en_sesion, engine_lectura_async
+from src.reports import detalle, snapshots
 from src.reports.adolescentes import (
-    total_adolescentes,
-    adolescentes_por_categoria,
-    adolescentes_por_institucion,
-    adolescentes_por_actividad,
-    top10_instituciones,
-    top10_actividades,
-    adolescentes_por_tramo_edad,
-    adolescentes_por_genero,
+    conteos_institucion_actividad,
+    codificar_matriz,
+    delta_matriz,
+    version_matriz,
 )
+from src.reports.agregacion import agregar, VISTA_ACTIVIDAD, VISTA_EDAD_SEXO
+from src.reports.filtros import FiltrosReporte, parametros_filtros
+from src.reports.ranking import MAX_TOP
+from src.utils.cache_utils import CacheRespuestas, CacheMemoriaLRU, parsear_ttls
+from src.utils.seguridad import verificar_token_admin
 
 router = APIRouter(prefix="/reportes", tags=["Reportes"])
 
+cache_reportes = CacheRespuestas(
+    CacheMemoriaLRU(
+        max_entradas=CacheConfig.MAX_ENTRADAS,
+        max_bytes=CacheConfig.MAX_BYTES,
+    ),
+    ttls=parsear_ttls(CacheConfig.TTL_ENDPOINTS),
+    ttl_por_defecto=CacheConfig.TTL_POR_DEFECTO,
+)
+
+# {version: pares} de las últimas matrices servidas, para los deltas
+versiones_matriz = CacheMemoriaLRU(max_entradas=CacheConfig.VERSIONES_MATRIZ)
+
+
+# ---------------------------------------------------
+# Los agregados se leen de las tablas resumen (snapshots) y se
+# cachean por endpoint; la fecha del snapshot viaja en el header
+# X-Snapshot-Actualizado y X-Snapshot-Vencido indica si supera la
+# antigüedad máxima (o si todavía no hay snapshot y se calculó en el
+# momento). Los GET no refrescan: ver snapshots.py. Con filtros (?institucion=...&genero=...)
+# se consulta la vista directamente: las tablas resumen sólo guardan
+# los totales globales.
+# ---------------------------------------------------
+async def _reporte(request: Request, db, endpoint: str, vista, construir, filtros: FiltrosReporte):
+    async def producir():
+        if filtros:
+            resultado = await ejecutar_en_sesion(db, agregar, vista, filtros)
+            return construir(resultado), {}
+        snapshot = await ejecutar_en_sesion(db, snapshots.leer, vista)
+        headers = {"X-Snapshot-Vencido": "true" if snapshot.vencido else "false"}
+        if snapshot.actualizado_en is not None:
+            headers["X-Snapshot-Actualizado"] = snapshot.actualizado_en.isoformat()
+        return construir(snapshot.resultado), headers
+
+    return await cache_reportes.responder_async(request, endpoint, producir)
+
 
 @router.get("/total")
-def _total(db: Session = Depends(get_db)):
-    return {"total_adolescentes": total_adolescentes(db)}
+async def _total(
+    request: Request,
+    filtros: FiltrosReporte = Depends(parametros_filtros),
+    db: Session | AsyncSession = Depends(get_sesion_lectura),
+):
+    return await _reporte(request, db, "total", VISTA_ACTIVIDAD, lambda r: {
+        "total_adolescentes": r.total
+    }, filtros)
 
 
 @router.get("/categoria")
-def _categoria(db: Session = Depends(get_db)):
-    datos = adolescentes_por_categoria(db)
-    return [{"categoria": fila[0], "cantidad": fila[1]} for fila in datos]
+async def _categoria(
+    request: Request,
+    filtros: FiltrosReporte = Depends(parametros_filtros),
+    db: Session | AsyncSession = Depends(get_sesion_lectura),
+):
+    return await _reporte(request, db, "categoria", VISTA_ACTIVIDAD, lambda r: [
+        {"categoria": fila[0], "cantidad": fila[1]} for fila in r.por("categoria")
+    ], filtros)
 
 
 @router.get("/institucion")
-def _institucion(db: Session = Depends(get_db)):
-    datos = adolescentes_por_institucion(db)
-    return [{"institucion": fila[0], "cantidad": fila[1]} for fila in datos]
+async def _institucion(
+    request: Request,
+    filtros: FiltrosReporte = Depends(parametros_filtros),
+    db: Session | AsyncSession = Depends(get_sesion_lectura),
+):
+    return await _reporte(request, db, "institucion", VISTA_ACTIVIDAD, lambda r: [
+        {"institucion": fila[0], "cantidad": fila[1]} for fila in r.por("institucion")
+    ], filtros)
 
 
 @router.get("/actividad")
-def _actividad(db: Session = Depends(get_db)):
-    datos = adolescentes_por_actividad(db)
-    return [{"actividad": fila[0], "cantidad": fila[1]} for fila in datos]
+async def _actividad(
+    request: Request,
+    filtros: FiltrosReporte = Depends(parametros_filtros),
+    db: Session | AsyncSession = Depends(get_sesion_lectura),
+):
+    return await _reporte(request, db, "actividad", VISTA_ACTIVIDAD, lambda r: [
+        {"actividad": fila[0], "cantidad": fila[1]} for fila in r.por("actividad")
+    ], filtros)
 
 
 @router.get("/top10-instituciones")
-def _top10i(db: Session = Depends(get_db)):
-    datos = top10_instituciones(db)
-    return [{"institucion": fila[0], "cantidad": fila[1]} for fila in datos]
+async def _top10i(
+    request: Request,
+    n: int = Query(10, ge=1, le=MAX_TOP),
+    filtros: FiltrosReporte = Depends(parametros_filtros),
+    db: Session | AsyncSession = Depends(get_sesion_lectura),
+):
+    return await _reporte(request, db, "top10-instituciones", VISTA_ACTIVIDAD, lambda r: [
+        {"institucion": fila[0], "cantidad": fila[1]} for fila in r.top("institucion", n)
+    ], filtros)
 
 
 @router.get("/top10-actividades")
-def _top10a(db: Session = Depends(get_db)):
-    datos = top10_actividades(db)
-    return [{"actividad": fila[0], "cantidad": fila[1]} for fila in datos]
+async def _top10a(
+    request: Request,
+    n: int = Query(10, ge=1, le=MAX_TOP),
+    filtros: FiltrosReporte = Depends(parametros_filtros),
+    db: Session | AsyncSession = Depends(get_sesion_lectura),
+):
+    return await _reporte(request, db, "top10-actividades", VISTA_ACTIVIDAD, lambda r: [
+        {"actividad": fila[0], "cantidad": fila[1]} for fila in r.top("actividad", n)
+    ], filtros)
+
+
+# ---------------------------------------------------
+# Cualquier corte del ranking de una dimensión (top / bottom N o desde
+# un percentil), con el cuartil de cada valor. Sale del mismo agregado
+# que los demás reportes de la vista.
+# ---------------------------------------------------
+@router.get("/ranking/{dimension}")
+async def _ranking(
+    request: Request,
+    dimension: str,
+    orden: str = Query("top", pattern="^(top|bottom)$"),
+    n: int | None = Query(None, ge=1, le=MAX_TOP),
+    percentil: float | None = Query(None, ge=0, le=100),
+    filtros: FiltrosReporte = Depends(parametros_filtros),
+    db: Session | AsyncSession = Depends(get_sesion_lectura),
+):
+    vistas = {d: v for v in (VISTA_ACTIVIDAD, VISTA_EDAD_SEXO) for d in v.dimensiones}
+    if dimension not in vistas:
+        raise HTTPException(400, f"Dimensión inválida (disponibles: {', '.join(vistas)})")
+
+    def construir(r):
+        ranking = r.ranking(dimension)
+        filas = ranking.desde_percentil(percentil) if percentil is not None else list(ranking.filas)
+        if orden == "bottom":
+            filas.reverse()
+        if n is not None:
+            filas = filas[:n]
+        cuartiles = ranking.cuartiles()
+        return [
+            {dimension: valor, "cantidad": cantidad, "cuartil": cuartiles[valor]}
+            for valor, cantidad in filas
+        ]
+
+    return await _reporte(request, db, f"ranking-{dimension}", vistas[dimension], construir, filtros)
 
 
 @router.get("/tramo-edad")
-def _edad(db: Session = Depends(get_db)):
-    datos = adolescentes_por_tramo_edad(db)
-    return [{"tramo_edad": fila[0], "cantidad": fila[1]} for fila in datos]
+async def _edad(
+    request: Request,
+    filtros: FiltrosReporte = Depends(parametros_filtros),
+    db: Session | AsyncSession = Depends(get_sesion_lectura),
+):
+    return await _reporte(request, db, "tramo-edad", VISTA_EDAD_SEXO, lambda r: [
+        {"tramo_edad": fila[0], "cantidad": fila[1]} for fila in r.por("tramo_edad")
+    ], filtros)
 
 
 @router.get("/genero")
-def _genero(db: Session = Depends(get_db)):
-    datos = adolescentes_por_genero(db)
-    return [{"genero": fila[0], "cantidad": fila[1]} for fila in datos]
+async def _genero(
+    request: Request,
+    filtros: FiltrosReporte = Depends(parametros_filtros),
+    db: Session | AsyncSession = Depends(get_sesion_lectura),
+):
+    return await _reporte(request, db, "genero", VISTA_EDAD_SEXO, lambda r: [
+        {"genero": fila[0], "cantidad": fila[1]} for fila in r.por("genero")
+    ], filtros)
+
+
+@router.get("/matriz-institucion-actividad")
+async def _matriz(
+    request: Request,
+    base: str | None = Query(None, description="Versión que ya tiene el cliente"),
+    db: Session | AsyncSession = Depends(get_sesion_lectura),
+):
+    """
+    Conteos por (institución, actividad) codificados por diccionario:
+    el tamaño depende de la cantidad de pares distintos, no de la
+    cantidad de adolescentes.
+
+    Con `base` (una `version` anterior) devuelve sólo los pares que
+    cambiaron (cantidad 0 = el par ya no existe) y el mismo `base` en la
+    respuesta. Si esa versión ya no se conserva, devuelve la matriz
+    completa, sin `base`.
+    """
+    async def producir():
+        pares = await ejecutar_en_sesion(db, conteos_institucion_actividad)
+        version = version_matriz(pares)
+        versiones_matriz.guardar(version, pares)
+
+        anterior = versiones_matriz.obtener(base) if base else None
+        if anterior is not None:
+            return {"version": version, "base": base, **codificar_matriz(delta_matriz(anterior, pares))}, {}
+        return {"version": version, **codificar_matriz(pares)}, {}
+
+    return await cache_reportes.responder_async(request, "matriz-institucion-actividad", producir)
+
+
+@router.post("/snapshots/refrescar", dependencies=[Depends(verificar_token_admin)])
+async def _refrescar_snapshots(completo: bool = False, db: Session | AsyncSession = Depends(get_sesion)):
+    await ejecutar_en_sesion(db, snapshots.refrescar_todo, completo=completo)
+    cache_reportes.limpiar()
+    return {"refrescado": True, "completo": completo}
+
+MEDIA_TYPES_DETALLE = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "columnar": "application/x-ndjson",
+}
+
 
 @router.get("/actividad-detalle")
-def actividad_detalle(db: Session = Depends(get_db)):
+async def actividad_detalle(
+    formato: str = Query("json", pattern="^(json|ndjson|columnar)$"),
+    columnas: str | None = Query(None, description="Proyección, p. ej. actividad,institucion,sede"),
+    limite: int | None = Query(None, ge=1, le=50000, description="Tamaño de página (keyset)"),
+    cursor: str | None = Query(None, description="Cursor devuelto por la página anterior"),
+    filtros: FiltrosReporte = Depends(parametros_filtros),
+    db: Session | AsyncSession = Depends(get_sesion_lectura),
+):
     """
     Devuelve adolescentes confirmados con actividad e institución
-    (una fila por adolescente)
+    (una fila por adolescente y actividad)
+
+    - Sin `limite`: todo el detalle, en streaming desde un cursor del
+      servidor (json = array, ndjson = una fila por línea,
+      columnar = un objeto de columnas por lote y por línea).
+    - Con `limite`: una página `{"datos", "siguiente_cursor"}` ordenada
+      por id_adolescente.
+    - Acepta los mismos filtros que los reportes (el cursor no los
+      guarda: hay que repetirlos en cada página).
     """
-    resultados = (
-        db.query(
-            VistaActividad.Actividad.label("actividad"),
-            VistaActividad.Institucion.label("institucion")
-        )
-        .all()
-    )
+    try:
+        proyeccion = detalle.proyectar(columnas)
+        desde_id = detalle.decodificar_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(400, str(e))
 
-    return [
-        {
-            "actividad": r.actividad,
-            "institucion": r.institucion
+    if limite is not None:
+        filas, siguiente = await ejecutar_en_sesion(
+            db, detalle.pagina_detalle, proyeccion, limite, desde_id, filtros
+        )
+        return {
+            "datos": [dict(zip(proyeccion, fila)) for fila in filas],
+            "siguiente_cursor": detalle.codificar_cursor(siguiente) if siguiente is not None else None,
         }
-        for r in resultados
-    ]
+
+    if isinstance(db, AsyncSession):
+        lotes = detalle.iterar_detalle_async(await engine_lectura_async(db), proyeccion, desde_id, filtros=filtros)
+
+        async def contenido():
+            vacio = True
+            if formato == "json":
+                yield b"["
+            async for lote in lotes:
+                yield detalle.lote_a_json(lote, proyeccion, formato, vacio)
+                vacio = vacio and not lote
+            if formato == "json":
+                yield b"]"
+    else:
+        lotes = detalle.iterar_detalle(db.get_bind(), proyeccion, desde_id, filtros=filtros)
+
+        def contenido():
+            vacio = True
+            if formato == "json":
+                yield b"["
+            for lote in lotes:
+                yield detalle.lote_a_json(lote, proyeccion, formato, vacio)
+                vacio = vacio and not lote
+            if formato == "json":
+                yield b"]"
+
+    return StreamingResponse(contenido(), media_type=MEDIA_TYPES_DETALLE[formato])
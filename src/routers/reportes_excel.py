@@ -1,20 +1,25 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-import io
-from openpyxl import Workbook
 
-from src.database.conexiones import get_db
+from src.database.conexiones import get_db_lectura
+from src.models.models_orm import VistaActividad
 from src.reports.adolescentes import (
     total_adolescentes,
     adolescentes_por_categoria,
     adolescentes_por_institucion,
     adolescentes_por_actividad,
-    top10_instituciones,
-    top10_actividades,
+    top_instituciones,
+    top_actividades,
     adolescentes_por_tramo_edad,
     adolescentes_por_genero
 )
+from src.reports.agregacion import VISTA_ACTIVIDAD, VISTA_EDAD_SEXO
+from src.reports.filtros import FiltrosReporte, parametros_filtros
+from src.reports.paralelo import precargar_agregados
+from src.reports.ranking import MAX_TOP
+from src.utils.xlsx_stream import generar_xlsx
 
 router = APIRouter(prefix="/reportes-excel", tags=["Reportes Excel"])
 
@@ -22,29 +27,34 @@ router = APIRouter(prefix="/reportes-excel", tags=["Reportes Excel"])
 # ---------------------------------------------
 # FUNCIÓN AUXILIAR PARA GENERAR ARCHIVO EXCEL
 # ---------------------------------------------
-def crear_excel(nombre_hoja: str, encabezados: list, filas: list):
-    wb = Workbook()
-    ws = wb.active
-    ws.title = nombre_hoja
+def crear_excel(nombre_hoja: str, encabezados: list, filas):
+    # Devuelve un generador de bytes: el archivo se arma mientras se envía
+    return generar_xlsx([(nombre_hoja, encabezados, filas)])
 
-    ws.append(encabezados)
 
-    for fila in filas:
-        ws.append(list(fila))
-
-    stream = io.BytesIO()
-    wb.save(stream)
-    stream.seek(0)
-    return stream
+def filas_en_streaming(bind, consulta, tamano_lote: int = 2000):
+    """
+    Recorre `consulta` con un cursor del lado del servidor, en su propia
+    sesión, para que viva mientras dura el StreamingResponse.
+    """
+    with Session(bind=bind) as sesion:
+        resultado = sesion.execute(consulta.execution_options(yield_per=tamano_lote))
+        for lote in resultado.partitions():
+            yield from lote
 
 
 # ---------------------------------------------
 # REPORTES INDIVIDUALES
 # ---------------------------------------------
+# Todos aceptan los filtros de src/reports/filtros.py
+# (?institucion=...&categoria=...&genero=...)
 
 @router.get("/categoria")
-def excel_categoria(db: Session = Depends(get_db)):
-    datos = adolescentes_por_categoria(db)
+def excel_categoria(
+    filtros: FiltrosReporte = Depends(parametros_filtros),
+    db: Session = Depends(get_db_lectura),
+):
+    datos = adolescentes_por_categoria(db, filtros)
     excel = crear_excel(
         "Categorías",
         ["Categoría", "Cantidad"],
@@ -58,8 +68,11 @@ def excel_categoria(db: Session = Depends(get_db)):
 
 
 @router.get("/instituciones")
-def excel_instituciones(db: Session = Depends(get_db)):
-    datos = adolescentes_por_institucion(db)
+def excel_instituciones(
+    filtros: FiltrosReporte = Depends(parametros_filtros),
+    db: Session = Depends(get_db_lectura),
+):
+    datos = adolescentes_por_institucion(db, filtros)
     excel = crear_excel(
         "Instituciones",
         ["Institución", "Cantidad"],
@@ -73,8 +86,11 @@ def excel_instituciones(db: Session = Depends(get_db)):
 
 
 @router.get("/actividades")
-def excel_actividades(db: Session = Depends(get_db)):
-    datos = adolescentes_por_actividad(db)
+def excel_actividades(
+    filtros: FiltrosReporte = Depends(parametros_filtros),
+    db: Session = Depends(get_db_lectura),
+):
+    datos = adolescentes_por_actividad(db, filtros)
     excel = crear_excel(
         "Actividades",
         ["Actividad", "Cantidad"],
@@ -88,38 +104,49 @@ def excel_actividades(db: Session = Depends(get_db)):
 
 
 @router.get("/top10-instituciones")
-def excel_top10_instituciones(db: Session = Depends(get_db)):
-    datos = top10_instituciones(db)
+def excel_top10_instituciones(
+    n: int = Query(10, ge=1, le=MAX_TOP),
+    filtros: FiltrosReporte = Depends(parametros_filtros),
+    db: Session = Depends(get_db_lectura),
+):
+    datos = top_instituciones(db, filtros, n)
     excel = crear_excel(
-        "Top 10 Instituciones",
+        f"Top {n} Instituciones",
         ["Institución", "Cantidad"],
         datos
     )
     return StreamingResponse(
         excel,
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": "attachment; filename=top10_instituciones.xlsx"}
+        headers={"Content-Disposition": f"attachment; filename=top{n}_instituciones.xlsx"}
     )
 
 
 @router.get("/top10-actividades")
-def excel_top10_actividades(db: Session = Depends(get_db)):
-    datos = top10_actividades(db)
+def excel_top10_actividades(
+    n: int = Query(10, ge=1, le=MAX_TOP),
+    filtros: FiltrosReporte = Depends(parametros_filtros),
+    db: Session = Depends(get_db_lectura),
+):
+    datos = top_actividades(db, filtros, n)
     excel = crear_excel(
-        "Top 10 Actividades",
+        f"Top {n} Actividades",
         ["Actividad", "Cantidad"],
         datos
     )
     return StreamingResponse(
         excel,
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": "attachment; filename=top10_actividades.xlsx"}
+        headers={"Content-Disposition": f"attachment; filename=top{n}_actividades.xlsx"}
     )
 
 
 @router.get("/tramo-edad")
-def excel_tramo_edad(db: Session = Depends(get_db)):
-    datos = adolescentes_por_tramo_edad(db)
+def excel_tramo_edad(
+    filtros: FiltrosReporte = Depends(parametros_filtros),
+    db: Session = Depends(get_db_lectura),
+):
+    datos = adolescentes_por_tramo_edad(db, filtros)
     excel = crear_excel(
         "Tramo Edad",
         ["Tramo Edad", "Cantidad"],
@@ -133,8 +160,11 @@ def excel_tramo_edad(db: Session = Depends(get_db)):
 
 
 @router.get("/genero")
-def excel_genero(db: Session = Depends(get_db)):
-    datos = adolescentes_por_genero(db)
+def excel_genero(
+    filtros: FiltrosReporte = Depends(parametros_filtros),
+    db: Session = Depends(get_db_lectura),
+):
+    datos = adolescentes_por_genero(db, filtros)
     excel = crear_excel(
         "Género",
         ["Género", "Cantidad"],
@@ -151,47 +181,52 @@ def excel_genero(db: Session = Depends(get_db)):
 # OPCIONAL: TODO JUNTO EN UN SOLO ARCHIVO MULTI-HOJA
 # ----------------------------------------------------
 @router.get("/completo")
-def excel_completo(db: Session = Depends(get_db)):
-    wb = Workbook()
-
-    # Hoja 1 — Categoría
-    ws = wb.active
-    ws.title = "Categoría"
-    ws.append(["Categoría", "Cantidad"])
-    for fila in adolescentes_por_categoria(db):
-        ws.append(list(fila))
-
-    # Hoja 2 — Institución
-    ws2 = wb.create_sheet("Institución")
-    ws2.append(["Institución", "Cantidad"])
-    for fila in adolescentes_por_institucion(db):
-        ws2.append(list(fila))
-
-    # Hoja 3 — Actividades
-    ws3 = wb.create_sheet("Actividad")
-    ws3.append(["Actividad", "Cantidad"])
-    for fila in adolescentes_por_actividad(db):
-        ws3.append(list(fila))
-
-    # Hoja 4 — Tramo Edad
-    ws4 = wb.create_sheet("Edad")
-    ws4.append(["Tramo Edad", "Cantidad"])
-    for fila in adolescentes_por_tramo_edad(db):
-        ws4.append(list(fila))
-
-    # Hoja 5 — Género
-    ws5 = wb.create_sheet("Género")
-    ws5.append(["Género", "Cantidad"])
-    for fila in adolescentes_por_genero(db):
-        ws5.append(list(fila))
-
-    # Guardar
-    stream = io.BytesIO()
-    wb.save(stream)
-    stream.seek(0)
+def excel_completo(
+    filtros: FiltrosReporte = Depends(parametros_filtros),
+    db: Session = Depends(get_db_lectura),
+):
+    # Ambas vistas se escanean en paralelo, en conexiones separadas
+    precargar_agregados(db, [VISTA_ACTIVIDAD, VISTA_EDAD_SEXO], filtros=filtros)
+
+    hojas = [
+        ("Categoría", ["Categoría", "Cantidad"], adolescentes_por_categoria(db, filtros)),
+        ("Institución", ["Institución", "Cantidad"], adolescentes_por_institucion(db, filtros)),
+        ("Actividad", ["Actividad", "Cantidad"], adolescentes_por_actividad(db, filtros)),
+        ("Edad", ["Tramo Edad", "Cantidad"], adolescentes_por_tramo_edad(db, filtros)),
+        ("Género", ["Género", "Cantidad"], adolescentes_por_genero(db, filtros)),
+    ]
 
     return StreamingResponse(
-        stream,
+        generar_xlsx(hojas),
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         headers={"Content-Disposition": "attachment; filename=reporte_completo.xlsx"}
     )
+
+
+# ----------------------------------------------------
+# DETALLE: UNA FILA POR ADOLESCENTE Y ACTIVIDAD
+# ----------------------------------------------------
+@router.get("/detalle")
+def excel_detalle(
+    filtros: FiltrosReporte = Depends(parametros_filtros),
+    db: Session = Depends(get_db_lectura),
+):
+    consulta = select(
+        VistaActividad.id_adolescente,
+        VistaActividad.Institucion,
+        VistaActividad.Sede,
+        VistaActividad.Actividad,
+        VistaActividad.Categoria,
+        VistaActividad.Dia,
+        VistaActividad.Horario,
+    ).where(*filtros.condiciones(VistaActividad))
+    excel = crear_excel(
+        "Detalle",
+        ["ID Adolescente", "Institución", "Sede", "Actividad", "Categoría", "Día", "Horario"],
+        filas_en_streaming(db.get_bind(), consulta)
+    )
+    return StreamingResponse(
+        excel,
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        headers={"Content-Disposition": "attachment; filename=detalle.xlsx"}
+    )
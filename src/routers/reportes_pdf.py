@@ -2,26 +2,12 @@ from fastapi import APIRouter, Depends
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import (
-    SimpleDocTemplate, Table, TableStyle,
-    Paragraph, Spacer, Image
-)
-from reportlab.lib.units import inch
-
 from src.reports.adolescentes import top10_instituciones, top10_actividades
 
 import io
+from xml.sax.saxutils import escape
 
-# --- FIX PARA EL ERROR DE TKINTER ---
-import matplotlib
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
-# -------------------------------------
-
-from src.database.conexiones import get_db
+from src.database.conexiones import get_db_lectura
 from src.reports.adolescentes import (
     total_adolescentes,
     adolescentes_por_categoria,
@@ -30,48 +16,48 @@ from src.reports.adolescentes import (
     adolescentes_por_tramo_edad,
     adolescentes_por_genero
 )
+from src.reports.agregacion import VISTA_ACTIVIDAD, VISTA_EDAD_SEXO
+from src.reports.filtros import FiltrosReporte, parametros_filtros
+from src.reports.paralelo import precargar_agregados
+from src.reports.graficos import grafico_barras, grafico_torta
 
 router = APIRouter(prefix="/reportes-pdf", tags=["PDF"])
 
 
 # ---------------------------------------------------------
-# Gráfico de barras
+# Gráfico de barras (renderizado y cacheado en src/reports/graficos.py)
 # ---------------------------------------------------------
 def generar_grafico(titulo, etiquetas, valores):
-    fig, ax = plt.subplots(figsize=(10, 5))  # tamaño grande
-    plt.title(titulo, fontsize=14)
-    ax.bar(etiquetas, valores)
-    plt.xticks(rotation=45, ha='right', fontsize=8)
-
-    buffer = io.BytesIO()
-    plt.tight_layout()
-    plt.savefig(buffer, format="png", dpi=150)
-    plt.close(fig)
-    buffer.seek(0)
-    return buffer
+    return io.BytesIO(grafico_barras(titulo, etiquetas, valores))
 
 
 # ---------------------------------------------------------
 # Gráfico de torta
 # ---------------------------------------------------------
 def generar_torta(titulo, etiquetas, valores):
-    fig, ax = plt.subplots(figsize=(7, 7))  # torta grande
-    plt.title(titulo, fontsize=14)
-    ax.pie(valores, labels=etiquetas, autopct='%1.1f%%')
-
-    buffer = io.BytesIO()
-    plt.tight_layout()
-    plt.savefig(buffer, format="png", dpi=150)
-    plt.close(fig)
-    buffer.seek(0)
-    return buffer
+    return io.BytesIO(grafico_torta(titulo, etiquetas, valores))
 
 
 # ---------------------------------------------------------
 # ENDPOINT PRINCIPAL
 # ---------------------------------------------------------
 @router.get("/general")
-def reporte_general(db: Session = Depends(get_db)):
+def reporte_general(
+    filtros: FiltrosReporte = Depends(parametros_filtros),
+    db: Session = Depends(get_db_lectura),
+):
+    # reportlab se importa recién acá: no pesa en el arranque de la API
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import (
+        SimpleDocTemplate, Table, TableStyle,
+        Paragraph, Spacer, Image
+    )
+    from reportlab.lib.units import inch
+
+    # Ambas vistas se escanean en paralelo, en conexiones separadas
+    precargar_agregados(db, [VISTA_ACTIVIDAD, VISTA_EDAD_SEXO], filtros=filtros)
 
     buffer = io.BytesIO()
     pdf = SimpleDocTemplate(buffer, pagesize=letter)
@@ -82,7 +68,11 @@ def reporte_general(db: Session = Depends(get_db)):
     elementos.append(Paragraph("<b>Reporte General de Adolescentes</b>", styles["Title"]))
     elementos.append(Spacer(1, 12))
 
-    total = total_adolescentes(db)
+    if filtros:
+        elementos.append(Paragraph(f"<b>Filtros:</b> {escape(filtros.describir())}", styles["Normal"]))
+        elementos.append(Spacer(1, 12))
+
+    total = total_adolescentes(db, filtros)
     elementos.append(Paragraph(f"<b>Total de adolescentes:</b> {total}", styles["Heading2"]))
     elementos.append(Spacer(1, 12))
 
@@ -113,17 +103,17 @@ def reporte_general(db: Session = Depends(get_db)):
     # ---------------------------------------------------------
     # TABLAS
     # ---------------------------------------------------------
-    tabla_desde_resultados("Adolescentes por Categoría", adolescentes_por_categoria(db))
-    tabla_desde_resultados("Adolescentes por Institución", adolescentes_por_institucion(db))
-    tabla_desde_resultados("Adolescentes por Actividad", adolescentes_por_actividad(db))
-    tabla_desde_resultados("Adolescentes por Tramo de Edad", adolescentes_por_tramo_edad(db))
-    tabla_desde_resultados("Adolescentes por Género", adolescentes_por_genero(db))
+    tabla_desde_resultados("Adolescentes por Categoría", adolescentes_por_categoria(db, filtros))
+    tabla_desde_resultados("Adolescentes por Institución", adolescentes_por_institucion(db, filtros))
+    tabla_desde_resultados("Adolescentes por Actividad", adolescentes_por_actividad(db, filtros))
+    tabla_desde_resultados("Adolescentes por Tramo de Edad", adolescentes_por_tramo_edad(db, filtros))
+    tabla_desde_resultados("Adolescentes por Género", adolescentes_por_genero(db, filtros))
 
     # ---------------------------------------------------------
     # GRÁFICOS
     # ---------------------------------------------------------
     def insertar_grafico(titulo, funcion):
-        datos = funcion(db)
+        datos = funcion(db, filtros)
         etiquetas = [d[0] for d in datos]
         valores = [d[1] for d in datos]
 
@@ -139,7 +129,7 @@ def reporte_general(db: Session = Depends(get_db)):
     # ---------------------------------------------------------
     # TORTA GÉNERO AGRUPADA
     # ---------------------------------------------------------
-    genero = adolescentes_por_genero(db)
+    genero = adolescentes_por_genero(db, filtros)
 
     conteo = {"mujer": 0, "varon": 0, "otros": 0}
 
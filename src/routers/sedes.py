@@ -1,12 +1,20 @@
 from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from src.database.conexiones import get_db
-from src.crud.sedes import get_sedes
+from src.database.conexiones import get_sesion
+from src.crud.sedes import COLUMNAS_SEDE, get_sedes_filas, get_sedes_filas_async
 from src.models.schemas import SedeOut
+from src.utils.respuestas import respuesta_filas
 
 router = APIRouter(prefix="/sedes", tags=["Sedes"])
 
 @router.get("/", response_model=list[SedeOut])
-def listar_sedes(db: Session = Depends(get_db)):
-    return get_sedes(db)
+async def listar_sedes(db: Session | AsyncSession = Depends(get_sesion)):
+    # Tuplas de la base -> JSON, sin entidades ORM ni validación Pydantic
+    if isinstance(db, AsyncSession):
+        filas = await get_sedes_filas_async(db)
+    else:
+        filas = await run_in_threadpool(get_sedes_filas, db)
+    return respuesta_filas([c.key for c in COLUMNAS_SEDE], filas)
@@ -1,5 +1,12 @@
 """Utilidades compartidas para el proyecto."""
 
-from .model_utils import ModelUtils
+__all__ = ["ModelUtils"]
 
-__all__ = ["ModelUtils"]
\ No newline at end of file
+
+def __getattr__(nombre):
+    # Import perezoso: ModelUtils arrastra pandas, que no hace falta
+    # para arrancar la API
+    if nombre == "ModelUtils":
+        from .model_utils import ModelUtils
+        return ModelUtils
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
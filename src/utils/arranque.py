@@ -0,0 +1,70 @@
+import asyncio
+import importlib
+import logging
+
+from config.settings import DatabaseConfig, SnapshotConfig
+
+logger = logging.getLogger(__name__)
+
+# Dependencias pesadas que los routers importan recién en el primer uso
+MODULOS_PESADOS = [
+    "numpy",
+    "pandas",
+    "pyarrow",
+    "pyarrow.parquet",
+    "reportlab.platypus",
+]
+
+
+def precalentar():
+    """
+    Crea los motores de base de datos (primario y réplicas), importa los renderizadores pesados y
+    levanta el pool de gráficos. Se llama desde el lifespan de la API, en
+    el arranque (STARTUP_MODO=eager) o en segundo plano (warmup).
+    """
+    from src.database import conexiones
+
+    conexiones.obtener_engine()
+    conexiones.obtener_selector()
+    if DatabaseConfig.MODO == "async":
+        conexiones.obtener_async_engine()
+        conexiones.obtener_selector_async()
+
+    for modulo in MODULOS_PESADOS:
+        try:
+            importlib.import_module(modulo)
+        except ImportError:
+            logger.warning("No se pudo precargar %s", modulo)
+
+    from src.reports.graficos import obtener_pool
+
+    try:
+        pool = obtener_pool()
+        if pool is not None:
+            # Fuerza el arranque de los procesos (importan matplotlib una vez)
+            pool.submit(importlib.import_module, "matplotlib.figure").result()
+    except Exception:
+        logger.exception("No se pudo precalentar el pool de gráficos")
+
+
+def refrescar_snapshots():
+    """Refresca los snapshots de /reportes con una sesión propia sobre el primario"""
+    from src.database import conexiones
+    from src.reports import snapshots
+
+    conexiones.obtener_engine()
+    with conexiones.SessionLocal() as db:
+        snapshots.refrescar_todo(db)
+
+
+async def refrescar_snapshots_periodicamente(intervalo: int = SnapshotConfig.REFRESCO):
+    """
+    Tarea del lifespan: refresca los snapshots al arrancar y después cada
+    `intervalo` segundos, en un thread (los GET de /reportes sólo leen).
+    """
+    while True:
+        try:
+            await asyncio.to_thread(refrescar_snapshots)
+        except Exception:
+            logger.exception("No se pudieron refrescar los snapshots de reportes")
+        await asyncio.sleep(intervalo)
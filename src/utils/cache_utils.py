@@ -0,0 +1,197 @@
+import hashlib
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from src.utils.compresion import etag_sin_codificacion, header_entidad_304
+from src.utils.respuestas import dumps
+
+
+@dataclass
+class EntradaCache:
+    """Respuesta ya serializada, lista para reenviar"""
+    cuerpo: bytes
+    etag: str
+    headers: dict = field(default_factory=dict)
+
+
+class BackendCache(ABC):
+    """
+    Interfaz mínima de almacenamiento. Cualquier backend (memoria, Redis,
+    etc.) que implemente estos tres métodos puede usarse con CacheRespuestas.
+    """
+
+    @abstractmethod
+    def obtener(self, clave: str):
+        ...
+
+    @abstractmethod
+    def guardar(self, clave: str, valor, ttl: float | None):
+        ...
+
+    @abstractmethod
+    def limpiar(self):
+        ...
+
+
+class CacheMemoriaLRU(BackendCache):
+    """Cache en memoria con TTL por entrada, desalojo LRU y tope de tamaño"""
+
+    def __init__(self, max_entradas: int = 256, max_bytes: int | None = None):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self._datos = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _tamano(valor) -> int:
+        if isinstance(valor, EntradaCache):
+            return len(valor.cuerpo)
+        if isinstance(valor, (bytes, bytearray)):
+            return len(valor)
+        return 0
+
+    def obtener(self, clave: str):
+        with self._lock:
+            item = self._datos.get(clave)
+            if item is None:
+                return None
+            valor, expira = item
+            if expira is not None and expira < time.monotonic():
+                self._quitar(clave)
+                return None
+            self._datos.move_to_end(clave)
+            return valor
+
+    def guardar(self, clave: str, valor, ttl: float | None = None):
+        expira = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            if clave in self._datos:
+                self._quitar(clave)
+            self._datos[clave] = (valor, expira)
+            self._bytes += self._tamano(valor)
+            while self._datos and (
+                len(self._datos) > self.max_entradas
+                or (self.max_bytes is not None and self._bytes > self.max_bytes)
+            ):
+                self._quitar(next(iter(self._datos)))
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+            self._bytes = 0
+
+    def _quitar(self, clave: str):
+        valor, _ = self._datos.pop(clave)
+        self._bytes -= self._tamano(valor)
+
+    def __len__(self):
+        return len(self._datos)
+
+
+# ---------------------------------------------------
+# CACHE DE RESPUESTAS HTTP CON ETAG
+# ---------------------------------------------------
+
+def parsear_ttls(texto: str) -> dict:
+    """Convierte "total=60,genero=600" en {"total": 60.0, "genero": 600.0}"""
+    ttls = {}
+    for par in filter(None, (p.strip() for p in (texto or "").split(","))):
+        endpoint, _, segundos = par.partition("=")
+        ttls[endpoint.strip()] = float(segundos)
+    return ttls
+
+
+def _etag(cuerpo: bytes) -> str:
+    return '"' + hashlib.sha256(cuerpo).hexdigest()[:32] + '"'
+
+
+def _coincide(if_none_match: str | None, etag: str) -> bool:
+    """
+    Comparación débil de If-None-Match (RFC 9110 §13.1.2). Acepta también
+    el ETag con sufijo de codificación ("abc-br") que pone el middleware
+    de compresión.
+    """
+    if not if_none_match:
+        return False
+    candidatos = [e.strip() for e in if_none_match.split(",")]
+    if "*" in candidatos:
+        return True
+    return any(etag_sin_codificacion(c.removeprefix("W/")) == etag for c in candidatos)
+
+
+class CacheRespuestas:
+    """
+    Cachea respuestas JSON por endpoint + query string, con TTL propio por
+    endpoint. Emite ETag fuerte y responde 304 a If-None-Match, sin tocar
+    la base de datos mientras la entrada siga vigente.
+    """
+
+    def __init__(self, backend: BackendCache, ttls: dict | None = None, ttl_por_defecto: float = 300):
+        self.backend = backend
+        self.ttls = ttls or {}
+        self.ttl_por_defecto = ttl_por_defecto
+
+    def ttl(self, endpoint: str) -> float:
+        return self.ttls.get(endpoint, self.ttl_por_defecto)
+
+    @staticmethod
+    def clave(request: Request) -> str:
+        query = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+        return f"{request.url.path}?{query}"
+
+    def responder(self, request: Request, endpoint: str, producir) -> Response:
+        """
+        `producir()` devuelve `(contenido, headers)` y sólo se llama en un
+        miss; el contenido se serializa igual que lo haría FastAPI.
+        """
+        entrada = self.backend.obtener(self.clave(request))
+        if entrada is not None:
+            return self._respuesta(request, entrada, "HIT")
+
+        contenido, headers = producir()
+        return self._respuesta(request, self._guardar(request, endpoint, contenido, headers), "MISS")
+
+    async def responder_async(self, request: Request, endpoint: str, producir) -> Response:
+        """Igual que `responder`, pero `producir` es una corrutina"""
+        entrada = self.backend.obtener(self.clave(request))
+        if entrada is not None:
+            return self._respuesta(request, entrada, "HIT")
+
+        contenido, headers = await producir()
+        return self._respuesta(request, self._guardar(request, endpoint, contenido, headers), "MISS")
+
+    def _guardar(self, request: Request, endpoint: str, contenido, headers) -> EntradaCache:
+        cuerpo = dumps(contenido)
+        entrada = EntradaCache(
+            cuerpo=cuerpo,
+            etag=_etag(cuerpo),
+            headers=dict(headers or {}),
+        )
+        self.backend.guardar(self.clave(request), entrada, self.ttl(endpoint))
+        return entrada
+
+    @staticmethod
+    def _respuesta(request: Request, entrada: EntradaCache, estado_cache: str) -> Response:
+        headers = {
+            **entrada.headers,
+            "ETag": entrada.etag,
+            "Cache-Control": "no-cache",
+            "X-Cache": estado_cache,
+        }
+
+        if _coincide(request.headers.get("if-none-match"), entrada.etag):
+            # El middleware de compresión decide con esto el sufijo del ETag
+            headers.update(header_entidad_304(len(entrada.cuerpo), "application/json"))
+            return Response(status_code=304, headers=headers)
+
+        return Response(content=entrada.cuerpo, media_type="application/json", headers=headers)
+
+    def limpiar(self):
+        self.backend.limpiar()
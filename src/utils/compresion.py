@@ -0,0 +1,219 @@
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin él sólo se ofrece gzip
+    brotli = None
+
+
+# ---------------------------------------------------
+# COMPRESIÓN DE RESPUESTAS (ASGI)
+# ---------------------------------------------------
+#
+# Negocia br / gzip según Accept-Encoding y comprime las respuestas de
+# texto (JSON, NDJSON, CSV) y Arrow a partir de un tamaño mínimo. Las
+# respuestas en streaming se comprimen bloque a bloque con un flush por
+# bloque, así el cliente sigue recibiendo datos a medida que se generan.
+# Los formatos ya comprimidos (xlsx, Parquet, PDF, PNG) no se tocan.
+
+TIPOS_COMPRIMIBLES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/vnd.apache.arrow.stream",
+    "text/",
+)
+
+
+def codificaciones_disponibles() -> tuple:
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def elegir_codificacion(accept_encoding: str | None, disponibles=None) -> str | None:
+    """
+    Elige la codificación con mayor q de Accept-Encoding; a igual q
+    gana el orden de `disponibles` (br antes que gzip).
+    """
+    disponibles = disponibles or codificaciones_disponibles()
+    pesos = {}
+    for parte in (accept_encoding or "").split(","):
+        nombre, _, parametros = parte.strip().partition(";")
+        nombre = nombre.strip().lower()
+        q = 1.0
+        if parametros.strip().startswith("q="):
+            try:
+                q = float(parametros.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if nombre:
+            pesos[nombre] = q
+
+    candidatos = [
+        (pesos.get(c, pesos.get("*", 0.0)), -i, c)
+        for i, c in enumerate(disponibles)
+    ]
+    q, _, mejor = max(candidatos)
+    return mejor if q > 0 else None
+
+
+# ---------------------------------------------------
+# ETAG POR CODIFICACIÓN
+# ---------------------------------------------------
+# Cada representación comprimida es distinta byte a byte, así que su
+# ETag lleva la codificación como sufijo ("abc" -> "abc-br").
+#
+# Un 304 no tiene cuerpo: para que su ETag coincida con el de la 200 que
+# valida, quien lo genera (CacheRespuestas) indica en HEADER_ENTIDAD_304
+# el tamaño y el Content-Type de esa 200. El middleware sólo agrega el
+# sufijo si la 200 se habría comprimido, y quita el header antes de
+# enviar. Sin ese header el 304 sale como está.
+
+HEADER_ENTIDAD_304 = "x-entidad-304"
+
+
+def header_entidad_304(largo: int, media_type: str) -> dict:
+    return {HEADER_ENTIDAD_304: f"{largo} {media_type}"}
+
+
+def etag_con_codificacion(etag: str, codificacion: str) -> str:
+    if etag.endswith('"'):
+        return f'{etag[:-1]}-{codificacion}"'
+    return etag
+
+
+def etag_sin_codificacion(etag: str) -> str:
+    for codificacion in ("br", "gzip"):
+        sufijo = f'-{codificacion}"'
+        if etag.endswith(sufijo):
+            return etag[:-len(sufijo)] + '"'
+    return etag
+
+
+# ---------------------------------------------------
+# COMPRESORES INCREMENTALES
+# ---------------------------------------------------
+
+class _Compresor:
+    def __init__(self, codificacion: str, nivel_gzip: int, nivel_brotli: int):
+        if codificacion == "br":
+            self._br = brotli.Compressor(quality=nivel_brotli)
+        else:
+            self._br = None
+            self._zlib = zlib.compressobj(nivel_gzip, zlib.DEFLATED, 31)  # 31 = formato gzip
+
+    def comprimir(self, datos: bytes, fin: bool) -> bytes:
+        if self._br is not None:
+            salida = self._br.process(datos) if datos else b""
+            return salida + (self._br.finish() if fin else self._br.flush())
+        salida = self._zlib.compress(datos)
+        return salida + self._zlib.flush(zlib.Z_FINISH if fin else zlib.Z_SYNC_FLUSH)
+
+
+class CompresionMiddleware:
+    """
+    Args:
+        app: aplicación ASGI
+        minimo: bytes mínimos para comprimir una respuesta de tamaño conocido
+        nivel_gzip: 1-9
+        nivel_brotli: 0-11 (4-5 es un buen equilibrio para contenido dinámico)
+    """
+
+    def __init__(self, app, minimo: int = 1024, nivel_gzip: int = 6, nivel_brotli: int = 4):
+        self.app = app
+        self.minimo = minimo
+        self.nivel_gzip = nivel_gzip
+        self.nivel_brotli = nivel_brotli
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # HEAD no se comprime (pasa igual por `enviar` por los 304)
+        codificacion = None
+        if scope["method"] != "HEAD":
+            codificacion = elegir_codificacion(Headers(scope=scope).get("accept-encoding"))
+
+        inicio = None
+        compresor = None
+
+        async def enviar(mensaje):
+            nonlocal inicio, compresor
+
+            if mensaje["type"] == "http.response.start":
+                if mensaje["status"] == 304:
+                    await send(self._etag_304(mensaje, codificacion))
+                elif codificacion is None:
+                    await send(mensaje)
+                else:
+                    inicio = mensaje  # se decide con el primer bloque del cuerpo
+                return
+            if mensaje["type"] != "http.response.body":
+                await send(mensaje)
+                return
+
+            cuerpo = mensaje.get("body", b"")
+            mas = mensaje.get("more_body", False)
+
+            if inicio is not None:
+                primero, inicio = inicio, None
+                if not self._comprimible(primero, cuerpo, mas):
+                    await send(primero)
+                    await send(mensaje)
+                    return
+
+                headers = MutableHeaders(raw=primero["headers"])
+                headers["Content-Encoding"] = codificacion
+                headers.add_vary_header("Accept-Encoding")
+                if "content-length" in headers:
+                    del headers["content-length"]
+                if "etag" in headers:
+                    headers["ETag"] = etag_con_codificacion(headers["etag"], codificacion)
+                compresor = _Compresor(codificacion, self.nivel_gzip, self.nivel_brotli)
+                await send({**primero, "headers": headers.raw})
+
+            if compresor is None:
+                await send(mensaje)
+                return
+
+            await send({
+                "type": "http.response.body",
+                "body": compresor.comprimir(cuerpo, fin=not mas),
+                "more_body": mas,
+            })
+
+        await self.app(scope, receive, enviar)
+
+    def _etag_304(self, inicio, codificacion: str | None):
+        """ETag del 304 igual al de la 200 validada (ver HEADER_ENTIDAD_304)"""
+        headers = MutableHeaders(raw=list(inicio["headers"]))
+        entidad = headers.get(HEADER_ENTIDAD_304)
+        if entidad is None:
+            return inicio
+        del headers[HEADER_ENTIDAD_304]
+
+        largo, _, tipo = entidad.partition(" ")
+        validada = {
+            "status": 200,
+            "headers": [(b"content-type", tipo.encode("latin-1")), (b"content-length", largo.encode("latin-1"))],
+        }
+        if codificacion is not None and "etag" in headers and self._comprimible(validada, b"", False):
+            headers["ETag"] = etag_con_codificacion(headers["etag"], codificacion)
+            headers.add_vary_header("Accept-Encoding")
+        return {**inicio, "headers": headers.raw}
+
+    def _comprimible(self, inicio, cuerpo: bytes, mas: bool) -> bool:
+        if inicio["status"] in (204, 304) or inicio["status"] < 200:
+            return False
+        headers = Headers(raw=inicio["headers"])
+        if "content-encoding" in headers:
+            return False
+        if not headers.get("content-type", "").startswith(TIPOS_COMPRIMIBLES):
+            return False
+        largo = headers.get("content-length")
+        if largo is not None:
+            return int(largo) >= self.minimo
+        # Sin Content-Length: si llegó todo en un bloque se conoce el tamaño,
+        # si es streaming se comprime
+        return mas or len(cuerpo) >= self.minimo
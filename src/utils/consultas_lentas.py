@@ -0,0 +1,313 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from config.settings import DiagnosticoConfig
+from src.utils.metricas import plantilla_ruta
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------
+# REGISTRO DE CONSULTAS LENTAS Y REPETIDAS
+# ---------------------------------------------------
+#
+# Sobre los mismos eventos de cursor que las métricas:
+#   - Toda sentencia que supere el umbral se guarda (texto, parámetros,
+#     ruta, función de src/ que la originó y duración) en un buffer
+#     circular. El EXPLAIN se pide después, con otra conexión, para no
+#     demorar el request: en un thread aparte con motores sync, como
+#     tarea del event loop con motores async (DB_MODO=async).
+#   - Por request se cuentan las sentencias: la misma sentencia con los
+#     mismos parámetros más de una vez es una consulta repetida; la misma
+#     sentencia con muchos parámetros distintos, un patrón N+1.
+# Ambos se leen desde /admin/consultas-*.
+
+ESTE_ARCHIVO = Path(__file__).resolve()
+RAIZ_SRC = ESTE_ARCHIVO.parents[1]
+MAX_PARAMETROS = 500
+MAX_EXPLAIN_PENDIENTES = 16
+
+# Prefijo de EXPLAIN por dialecto; otros motores se registran sin plan
+EXPLAIN = {
+    "mysql": "EXPLAIN ",
+    "sqlite": "EXPLAIN QUERY PLAN ",
+    "postgresql": "EXPLAIN ",
+}
+
+
+@dataclass
+class ConsultaLenta:
+    fecha: datetime
+    duracion_ms: float
+    sentencia: str
+    parametros: str
+    ruta: str
+    origen: str
+    plan: list | str | None = None
+
+
+@dataclass
+class ConsultaRepetida:
+    fecha: datetime
+    tipo: str              # "repetida" | "n+1"
+    ruta: str
+    sentencia: str
+    veces: int
+    origen: str
+
+
+@dataclass
+class _Seguimiento:
+    """Sentencias ejecutadas durante un request (puede usarse desde varios threads)"""
+    ruta: str
+    ejecuciones: Counter = field(default_factory=Counter)
+    origenes: dict = field(default_factory=dict)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def anotar(self, sentencia: str, parametros: str):
+        with self.lock:
+            clave = (sentencia, parametros)
+            self.ejecuciones[clave] += 1
+            # El origen sólo se calcula la primera vez que una sentencia se repite
+            if sentencia not in self.origenes and self.ejecuciones[clave] > 1:
+                self.origenes[sentencia] = origen_llamada()
+
+
+SEGUIMIENTO: ContextVar[_Seguimiento | None] = ContextVar("seguimiento_consultas", default=None)
+_EN_EXPLAIN: ContextVar[bool] = ContextVar("en_explain", default=False)
+
+
+def origen_llamada(max_frames: int = 6) -> str:
+    """
+    Frames de src/ que llevaron a la consulta (sin contar este módulo),
+    del más interno al más externo: "modulo.funcion:linea <- ...".
+    """
+    frame = sys._getframe(1)
+    cadena = []
+    while frame is not None and len(cadena) < max_frames:
+        archivo = Path(frame.f_code.co_filename)
+        if archivo.is_relative_to(RAIZ_SRC) and archivo != ESTE_ARCHIVO:
+            modulo = ".".join(archivo.relative_to(RAIZ_SRC.parent).with_suffix("").parts)
+            cadena.append(f"{modulo}.{frame.f_code.co_name}:{frame.f_lineno}")
+        frame = frame.f_back
+    return " <- ".join(cadena) or "desconocido"
+
+
+class RegistroConsultas:
+    """
+    Buffer circular de consultas lentas y de hallazgos por request.
+
+    Args:
+        umbral_ms: duración a partir de la cual una sentencia es lenta
+        max_registros: capacidad de cada buffer
+        repeticiones_n1: ejecuciones de una misma sentencia (con
+            parámetros distintos) en un request para marcarla como N+1
+        explain: pedir el plan de las consultas lentas
+    """
+
+    def __init__(self, umbral_ms: float, max_registros: int = 200, repeticiones_n1: int = 5, explain: bool = True):
+        self.umbral = umbral_ms / 1000
+        self.repeticiones_n1 = repeticiones_n1
+        self.explain = explain
+        self.lentas = deque(maxlen=max_registros)
+        self.repetidas = deque(maxlen=max_registros)
+        self._lock = threading.Lock()
+        self._explain_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="explain")
+        self._explain_pendientes = 0
+        # Referencias a las tareas async de EXPLAIN en curso (el loop sólo
+        # guarda referencias débiles)
+        self._tareas_explain = set()
+
+    # -----------------------------------------------
+    # EVENTOS DE SQLALCHEMY
+    # -----------------------------------------------
+
+    def instrumentar_engine(self, engine):
+        """Hook para src.database.conexiones.al_crear_engine"""
+        event.listen(engine, "before_cursor_execute", self._antes_de_ejecutar)
+        event.listen(engine, "after_cursor_execute", self._despues_de_ejecutar)
+
+    def _antes_de_ejecutar(self, conn, cursor, sentencia, parametros, contexto, executemany):
+        contexto._inicio_diagnostico = time.perf_counter()
+
+    def _despues_de_ejecutar(self, conn, cursor, sentencia, parametros, contexto, executemany):
+        if _EN_EXPLAIN.get():
+            return
+        duracion = time.perf_counter() - getattr(contexto, "_inicio_diagnostico", time.perf_counter())
+        texto_parametros = repr(parametros)[:MAX_PARAMETROS]
+
+        seguimiento = SEGUIMIENTO.get()
+        if seguimiento is not None and not executemany:
+            seguimiento.anotar(sentencia, texto_parametros)
+
+        if duracion >= self.umbral:
+            registro = ConsultaLenta(
+                fecha=datetime.now(),
+                duracion_ms=round(duracion * 1000, 2),
+                sentencia=sentencia,
+                parametros=texto_parametros,
+                ruta=seguimiento.ruta if seguimiento else "fuera_de_request",
+                origen=origen_llamada(),
+            )
+            with self._lock:
+                self.lentas.append(registro)
+            logger.warning("Consulta lenta (%.0f ms) desde %s: %s", registro.duracion_ms, registro.origen, sentencia[:200])
+            if self.explain and not executemany:
+                self._pedir_explain(conn.engine, registro, parametros)
+
+    # -----------------------------------------------
+    # EXPLAIN EN SEGUNDO PLANO
+    # -----------------------------------------------
+
+    def _pedir_explain(self, engine, registro: ConsultaLenta, parametros):
+        prefijo = EXPLAIN.get(engine.dialect.name)
+        if prefijo is None or not registro.sentencia.lstrip().upper().startswith(("SELECT", "WITH")):
+            return
+
+        if engine.dialect.is_async:
+            # `engine` es el sync_engine de un AsyncEngine: fuera del event
+            # loop no puede conectar (MissingGreenlet). La sentencia corre
+            # dentro de un greenlet del loop, así que el loop está activo.
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                registro.plan = "omitido: motor async fuera del event loop"
+                return
+
+        with self._lock:
+            if self._explain_pendientes >= MAX_EXPLAIN_PENDIENTES:
+                registro.plan = "omitido: demasiados EXPLAIN pendientes"
+                return
+            self._explain_pendientes += 1
+
+        if engine.dialect.is_async:
+            tarea = loop.create_task(self._explain_async(AsyncEngine(engine), prefijo, registro, parametros))
+            self._tareas_explain.add(tarea)
+            tarea.add_done_callback(self._tareas_explain.discard)
+        else:
+            self._explain_pool.submit(self._explain, engine, prefijo, registro, parametros)
+
+    def _explain(self, engine, prefijo: str, registro: ConsultaLenta, parametros):
+        _EN_EXPLAIN.set(True)
+        try:
+            with engine.connect() as conn:
+                self._guardar_plan(registro, conn.exec_driver_sql(prefijo + registro.sentencia, parametros))
+        except Exception as e:
+            registro.plan = f"error: {e}"
+        finally:
+            self._explain_terminado()
+
+    async def _explain_async(self, engine: AsyncEngine, prefijo: str, registro: ConsultaLenta, parametros):
+        # La tarea corre con una copia del contexto: no afecta al request
+        _EN_EXPLAIN.set(True)
+        try:
+            async with engine.connect() as conn:
+                self._guardar_plan(registro, await conn.exec_driver_sql(prefijo + registro.sentencia, parametros))
+        except Exception as e:
+            registro.plan = f"error: {e}"
+        finally:
+            self._explain_terminado()
+
+    @staticmethod
+    def _guardar_plan(registro: ConsultaLenta, resultado):
+        columnas = list(resultado.keys())
+        registro.plan = [dict(zip(columnas, fila)) for fila in resultado]
+
+    def _explain_terminado(self):
+        with self._lock:
+            self._explain_pendientes -= 1
+
+    # -----------------------------------------------
+    # FIN DE REQUEST
+    # -----------------------------------------------
+
+    def analizar(self, seguimiento: _Seguimiento):
+        """Registra las sentencias repetidas y los patrones N+1 de un request"""
+        with seguimiento.lock:
+            ejecuciones = dict(seguimiento.ejecuciones)
+            origenes = dict(seguimiento.origenes)
+
+        por_sentencia = Counter()
+        hallazgos = []
+        for (sentencia, _), veces in ejecuciones.items():
+            por_sentencia[sentencia] += 1
+            if veces > 1:
+                hallazgos.append(("repetida", sentencia, veces))
+        for sentencia, distintas in por_sentencia.items():
+            if distintas >= self.repeticiones_n1:
+                hallazgos.append(("n+1", sentencia, distintas))
+
+        if not hallazgos:
+            return
+        ahora = datetime.now()
+        with self._lock:
+            for tipo, sentencia, veces in hallazgos:
+                self.repetidas.append(ConsultaRepetida(
+                    fecha=ahora,
+                    tipo=tipo,
+                    ruta=seguimiento.ruta,
+                    sentencia=sentencia,
+                    veces=veces,
+                    origen=origenes.get(sentencia, "desconocido"),
+                ))
+
+    # -----------------------------------------------
+    # LECTURA
+    # -----------------------------------------------
+
+    def consultas_lentas(self, limite: int | None = None) -> list:
+        with self._lock:
+            registros = list(self.lentas)
+        return [asdict(r) for r in reversed(registros[-limite:] if limite else registros)]
+
+    def consultas_repetidas(self, limite: int | None = None) -> list:
+        with self._lock:
+            registros = list(self.repetidas)
+        return [asdict(r) for r in reversed(registros[-limite:] if limite else registros)]
+
+    def limpiar(self):
+        with self._lock:
+            self.lentas.clear()
+            self.repetidas.clear()
+
+
+registro_consultas = RegistroConsultas(
+    umbral_ms=DiagnosticoConfig.UMBRAL_MS,
+    max_registros=DiagnosticoConfig.MAX_REGISTROS,
+    repeticiones_n1=DiagnosticoConfig.REPETICIONES_N1,
+    explain=DiagnosticoConfig.EXPLAIN,
+)
+
+
+class ConsultasMiddleware:
+    """Abre un seguimiento por request y lo analiza al terminar"""
+
+    def __init__(self, app, router, registro: RegistroConsultas):
+        self.app = app
+        self.router = router
+        self.registro = registro
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        seguimiento = _Seguimiento(ruta=plantilla_ruta(self.router, scope))
+        token = SEGUIMIENTO.set(seguimiento)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            SEGUIMIENTO.reset(token)
+            self.registro.analizar(seguimiento)
@@ -0,0 +1,231 @@
+import time
+from contextvars import ContextVar
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event
+from starlette.routing import Match
+
+
+# ---------------------------------------------------
+# MÉTRICAS DE LA API (formato Prometheus, GET /metrics)
+# ---------------------------------------------------
+#
+# Tres fuentes:
+#   - MetricasMiddleware: latencia y requests en curso por ruta
+#     (la plantilla, p. ej. /reportes/ranking/{dimension}, no la URL).
+#   - Eventos de cursor de SQLAlchemy: duración de cada sentencia,
+#     etiquetada con la ruta que la originó.
+#   - Pool de conexiones: tiempo hasta obtener una conexión, tiempo en
+#     uso y estado actual (tamaño, prestadas, overflow) de cada motor.
+#
+# La ruta viaja en un ContextVar: el threadpool de Starlette, `run_sync`
+# y src/reports/paralelo.py copian el contexto, así las consultas hechas
+# fuera del event loop quedan asociadas a su request.
+
+RUTA_ACTUAL: ContextVar[str] = ContextVar("ruta_actual", default="fuera_de_request")
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+OPERACIONES = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "CREATE", "DROP"}
+
+duracion_requests = Histogram(
+    "api_request_duracion_segundos",
+    "Latencia de los requests por ruta",
+    ["metodo", "ruta", "estado"],
+    buckets=BUCKETS,
+)
+requests_en_curso = Gauge(
+    "api_requests_en_curso",
+    "Requests que se están atendiendo",
+    ["metodo", "ruta"],
+)
+duracion_consultas = Histogram(
+    "db_consulta_duracion_segundos",
+    "Duración de las sentencias SQL por ruta de origen",
+    ["ruta", "operacion"],
+    buckets=BUCKETS,
+)
+checkout_pool = Histogram(
+    "db_pool_checkout_segundos",
+    "Tiempo hasta obtener una conexión del pool (espera + conexión nueva)",
+    ["motor"],
+    buckets=BUCKETS,
+)
+conexion_en_uso = Histogram(
+    "db_pool_conexion_en_uso_segundos",
+    "Tiempo entre que una conexión sale del pool y vuelve",
+    ["motor"],
+    buckets=BUCKETS,
+)
+errores_checkout = Counter(
+    "db_pool_checkout_errores",
+    "Errores al pedir una conexión al pool (p. ej. TimeoutError)",
+    ["motor", "tipo"],
+)
+
+
+# ---------------------------------------------------
+# REQUESTS
+# ---------------------------------------------------
+
+def plantilla_ruta(router, scope) -> str:
+    """Path declarado de la ruta que atiende el request ("sin_ruta" si no hay)"""
+    parcial = None
+    for ruta in router.routes:
+        coincidencia, _ = ruta.matches(scope)
+        if coincidencia == Match.FULL:
+            return ruta.path
+        if coincidencia == Match.PARTIAL and parcial is None:
+            parcial = ruta.path
+    return parcial or "sin_ruta"
+
+
+class MetricasMiddleware:
+    """
+    Middleware ASGI: histograma de latencia por método, ruta y estado, y
+    gauge de requests en curso. Para respuestas en streaming la latencia
+    incluye el envío completo del cuerpo.
+    """
+
+    def __init__(self, app, router):
+        self.app = app
+        self.router = router
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metodo = scope["method"]
+        ruta = plantilla_ruta(self.router, scope)
+        estado = 500
+
+        async def enviar(mensaje):
+            nonlocal estado
+            if mensaje["type"] == "http.response.start":
+                estado = mensaje["status"]
+            await send(mensaje)
+
+        en_curso = requests_en_curso.labels(metodo, ruta)
+        en_curso.inc()
+        token = RUTA_ACTUAL.set(ruta)
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            duracion_requests.labels(metodo, ruta, str(estado)).observe(time.perf_counter() - inicio)
+            RUTA_ACTUAL.reset(token)
+            en_curso.dec()
+
+
+# ---------------------------------------------------
+# CONSULTAS Y POOL
+# ---------------------------------------------------
+
+def nombre_motor(engine) -> str:
+    """
+    Etiqueta `motor` de las métricas: driver, host, puerto y base, para
+    no mezclar el primario con una réplica del mismo host ni el motor
+    sync con el async (p. ej. "mysql+pymysql://db1:3307/estadisticas")
+    """
+    url = engine.url
+    if not url.host:
+        return f"{url.drivername}:{url.database or 'memoria'}"
+    puerto = f":{url.port}" if url.port else ""
+    return f"{url.drivername}://{url.host}{puerto}/{url.database or ''}"
+
+
+def _operacion(sentencia: str) -> str:
+    palabra = sentencia.lstrip().split(None, 1)[0].upper() if sentencia.strip() else ""
+    return palabra if palabra in OPERACIONES else "OTRA"
+
+
+def _antes_de_ejecutar(conn, cursor, sentencia, parametros, contexto, executemany):
+    contexto._inicio_metricas = time.perf_counter()
+
+
+def _despues_de_ejecutar(conn, cursor, sentencia, parametros, contexto, executemany):
+    inicio = getattr(contexto, "_inicio_metricas", None)
+    if inicio is not None:
+        duracion_consultas.labels(RUTA_ACTUAL.get(), _operacion(sentencia)).observe(
+            time.perf_counter() - inicio
+        )
+
+
+def _medir_checkout(pool, motor: str):
+    """Envuelve pool.connect() para medir cuánto tarda en entregar una conexión"""
+    conectar = pool.connect
+
+    def connect():
+        inicio = time.perf_counter()
+        try:
+            conexion = conectar()
+        except Exception as e:
+            errores_checkout.labels(motor, type(e).__name__).inc()
+            raise
+        checkout_pool.labels(motor).observe(time.perf_counter() - inicio)
+        return conexion
+
+    pool.connect = connect
+
+
+def _medir_prestamos(pool, motor: str):
+    @event.listens_for(pool, "checkout")
+    def _al_prestar(dbapi_conn, registro, proxy):
+        registro.info["prestada_en"] = time.perf_counter()
+
+    @event.listens_for(pool, "checkin")
+    def _al_devolver(dbapi_conn, registro):
+        prestada_en = registro.info.pop("prestada_en", None)
+        if prestada_en is not None:
+            conexion_en_uso.labels(motor).observe(time.perf_counter() - prestada_en)
+
+
+_motores = {}
+
+
+def instrumentar_engine(engine):
+    """Hook para src.database.conexiones.al_crear_engine"""
+    motor = nombre_motor(engine)
+    _motores[motor] = engine
+    event.listen(engine, "before_cursor_execute", _antes_de_ejecutar)
+    event.listen(engine, "after_cursor_execute", _despues_de_ejecutar)
+    _medir_checkout(engine.pool, motor)
+    _medir_prestamos(engine.pool, motor)
+
+    # dispose() reemplaza el pool; los listeners pasan solos al nuevo,
+    # connect() hay que volver a envolverlo
+    @event.listens_for(engine, "engine_disposed")
+    def _al_descartar(engine):
+        _medir_checkout(engine.pool, motor)
+
+
+class _ColectorPool:
+    """Estado del pool de cada motor, leído al momento del scrape"""
+
+    def collect(self):
+        metricas = {
+            "tamano": ("size", "Conexiones que el pool mantiene abiertas"),
+            "prestadas": ("checkedout", "Conexiones prestadas en este momento"),
+            "disponibles": ("checkedin", "Conexiones libres en el pool"),
+            "overflow": ("overflow", "Conexiones por encima de pool_size"),
+        }
+        familias = {
+            nombre: GaugeMetricFamily(f"db_pool_{nombre}", ayuda, labels=["motor"])
+            for nombre, (_, ayuda) in metricas.items()
+        }
+        for motor, engine in list(_motores.items()):
+            pool = engine.pool
+            for nombre, (metodo, _) in metricas.items():
+                if hasattr(pool, metodo):
+                    familias[nombre].add_metric([motor], getattr(pool, metodo)())
+        yield from familias.values()
+
+
+REGISTRY.register(_ColectorPool())
+
+
+def exportar() -> tuple[bytes, str]:
+    """Cuerpo y content-type de la respuesta de /metrics"""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
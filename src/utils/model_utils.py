@@ -1,6 +1,9 @@
 import pandas as pd
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from src.utils.query_utils import DTYPES_CATEGORIA, leer_en_lotes
+
 class ModelUtils:
     """Utilidades para trabajar con modelos SQLAlchemy y convertirlos a DataFrames"""
     
@@ -17,4 +20,31 @@ class ModelUtils:
             DataFrame con todos los registros de la tabla
         """
         query = session.query(model_class)
-        return pd.read_sql(query.statement, session.bind)
\ No newline at end of file
+        return pd.read_sql(query.statement, session.bind)
+
+    @staticmethod
+    def model_to_dataframe_stream(session: Session, model_class, chunksize=10000, columnas=None, dtypes=None):
+        """
+        Como model_to_dataframe, pero en lotes leídos de un cursor del
+        servidor (`stream_results`), con proyección de columnas y las
+        columnas de texto repetidas (Institucion, Sede, ...) como category:
+        el pico de memoria depende de `chunksize`, no del tamaño de la tabla
+
+        Args:
+            session: Sesión de SQLAlchemy
+            model_class: Clase del modelo SQLAlchemy
+            chunksize: Cantidad de filas por lote
+            columnas: Atributos del modelo a traer (opcional; por defecto, todos)
+            dtypes: {columna: dtype} a aplicar a cada lote (por defecto
+                DTYPES_CATEGORIA; {} para no convertir nada)
+
+        Yields:
+            DataFrames de hasta `chunksize` filas
+        """
+        atributos = model_class.__mapper__.column_attrs
+        nombres = columnas or [atributo.key for atributo in atributos]
+        faltantes = [n for n in nombres if n not in atributos]
+        if faltantes:
+            raise ValueError(f"{model_class.__name__} no tiene las columnas {faltantes}")
+        consulta = select(*[getattr(model_class, n).label(n) for n in nombres])
+        yield from leer_en_lotes(session, consulta, None, chunksize, DTYPES_CATEGORIA if dtypes is None else dtypes)
@@ -1,6 +1,23 @@
 import pandas as pd
+from sqlalchemy import column, select, text
 from sqlalchemy.orm import Session
 
+# Columnas de texto de las vistas de detalle con pocos valores distintos
+# repetidos en muchas filas: como category se guarda un código por fila
+# en lugar de un str de Python por fila. Van con el nombre de la vista
+# (atributos del modelo) y con el rótulo en minúsculas que usa /exportar
+DTYPES_CATEGORIA = {
+    "Institucion": "category",
+    "Sede": "category",
+    "Actividad": "category",
+    "Categoria": "category",
+    "institucion": "category",
+    "sede": "category",
+    "actividad": "category",
+    "categoria": "category",
+}
+
+
 class QueryUtils:
     """Utilidades para trabajar con queries SQL directos y convertirlos a DataFrames"""
     
@@ -17,4 +34,57 @@ class QueryUtils:
         Returns:
             DataFrame con los resultados del query
         """
-        return pd.read_sql(query, session.bind, params=params)
\ No newline at end of file
+        return pd.read_sql(query, session.bind, params=params)
+
+    @staticmethod
+    def query_to_dataframe_stream(session: Session, query, params=None, chunksize=10000, columnas=None, dtypes=None):
+        """
+        Como query_to_dataframe, pero en lotes leídos de un cursor del
+        servidor (`stream_results`): el driver no trae todo el resultado
+        a memoria y el pico queda en el orden de un lote, no de la tabla.
+        Mientras se consume, la conexión de la sesión queda ocupada.
+
+        Args:
+            session: Sesión de SQLAlchemy
+            query: Query SQL como string (parámetros :nombre) o sentencia SQLAlchemy
+            params: Parámetros para el query (opcional)
+            chunksize: Cantidad de filas por lote
+            columnas: Columnas a traer (opcional; por defecto, todas)
+            dtypes: {columna: dtype} a aplicar a cada lote (por defecto
+                DTYPES_CATEGORIA; {} para no convertir nada). Cada lote
+                tiene sus propias categorías: para unir lotes conviene
+                pandas.api.types.union_categoricals
+
+        Yields:
+            DataFrames de hasta `chunksize` filas
+        """
+        if isinstance(query, str):
+            query = text(query)
+        if columnas:
+            if hasattr(query, "with_only_columns"):
+                faltantes = [c for c in columnas if c not in query.selected_columns]
+                if faltantes:
+                    raise ValueError(f"Columnas inexistentes: {faltantes}")
+                query = query.with_only_columns(*[query.selected_columns[c] for c in columnas])
+            else:
+                query = select(*map(column, columnas)).select_from(query.columns().subquery("consulta"))
+        yield from leer_en_lotes(session, query, params, chunksize, DTYPES_CATEGORIA if dtypes is None else dtypes)
+
+
+def leer_en_lotes(session: Session, sentencia, params=None, chunksize=10000, dtypes=None):
+    """
+    Ejecuta la sentencia con `stream_results` y arma un DataFrame por cada
+    `chunksize` filas, aplicando `dtypes` a las columnas presentes.
+    """
+    # Core sobre la conexión de la sesión: el camino ORM de session.execute
+    # procesa cada fila y, sin yield_per, arma el resultado completo
+    conexion = session.connection().execution_options(stream_results=True, max_row_buffer=chunksize)
+    resultado = conexion.execute(sentencia, params or {})
+    try:
+        nombres = list(resultado.keys())
+        conversiones = {c: t for c, t in (dtypes or {}).items() if c in nombres}
+        for filas in resultado.partitions(chunksize):
+            df = pd.DataFrame.from_records(filas, columns=nombres)
+            yield df.astype(conversiones) if conversiones else df
+    finally:
+        resultado.close()
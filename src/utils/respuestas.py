@@ -0,0 +1,63 @@
+from datetime import date
+from decimal import Decimal
+
+import orjson
+from fastapi.responses import ORJSONResponse, Response
+
+# ---------------------------------------------------
+# SERIALIZACIÓN JSON RÁPIDA
+# ---------------------------------------------------
+#
+# orjson serializa en C y devuelve bytes directamente. Se usa como
+# clase de respuesta por defecto de la app y en los caminos que arman
+# JSON a mano (cache de reportes, detalle en streaming, listados).
+
+OPCIONES = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _por_defecto(valor):
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if isinstance(valor, date):
+        return valor.isoformat()
+    raise TypeError(f"Tipo no serializable: {type(valor).__name__}")
+
+
+def dumps(contenido) -> bytes:
+    return orjson.dumps(contenido, default=_por_defecto, option=OPCIONES)
+
+
+class RespuestaJSON(ORJSONResponse):
+    """ORJSONResponse que además acepta Decimal"""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+# ---------------------------------------------------
+# LISTADOS DESDE TUPLAS DE LA BASE
+# ---------------------------------------------------
+
+def filas_json(columnas, filas) -> bytes:
+    """
+    Serializa filas (tuplas de un SELECT de columnas) como array de
+    objetos, en una sola llamada a orjson.
+
+    Args:
+        columnas: nombres de las claves, en el orden del SELECT
+        filas: iterable de tuplas / Row
+
+    Returns:
+        bytes JSON
+    """
+    columnas = tuple(columnas)
+    return dumps([dict(zip(columnas, fila)) for fila in filas])
+
+
+def respuesta_filas(columnas, filas) -> Response:
+    """
+    Respuesta para endpoints de listado: evita entidades ORM y la
+    validación de Pydantic (el `response_model` del endpoint queda sólo
+    para la documentación OpenAPI).
+    """
+    return Response(content=filas_json(columnas, filas), media_type="application/json")
@@ -0,0 +1,17 @@
+import secrets
+
+from fastapi import Header, HTTPException
+
+from config.settings import AdminConfig
+
+
+def verificar_token_admin(x_admin_token: str | None = Header(None)):
+    """
+    Dependency de los endpoints de administración. Exige el header
+    X-Admin-Token igual a ADMIN_TOKEN; si ADMIN_TOKEN no está configurado
+    los rechaza siempre (exponen SQL con datos personales o escriben).
+    """
+    if not AdminConfig.TOKEN:
+        raise HTTPException(403, "Endpoints de administración deshabilitados: falta configurar ADMIN_TOKEN")
+    if not secrets.compare_digest(x_admin_token or "", AdminConfig.TOKEN):
+        raise HTTPException(403, "Token de administración inválido")
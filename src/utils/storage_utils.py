@@ -1,23 +1,229 @@
+import csv
+import logging
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
-from sqlalchemy.orm import Session
+from sqlalchemy import MetaData, Table, inspect
+
+from config.settings import MySQLConfig
+
+logger = logging.getLogger(__name__)
+
+MODOS = ("to_sql", "lotes", "load_data")
+
 
 class StorageUtils:
     """Utilidades para guardar DataFrames en la base de datos"""
-    
+
     @staticmethod
-    def dataframe_to_database(df, table_name, session, if_exists='append'):
+    def dataframe_to_database(df, table_name, session, if_exists='append', modo='to_sql',
+                              chunksize=10000, upsert=False, hilos=1):
         """
         Guarda un DataFrame en la base de datos
-        
+
+        Modos:
+            - 'to_sql': df.to_sql de pandas, fila por fila (por defecto)
+            - 'lotes': la tabla se crea con pandas si hace falta y las filas
+              se insertan de a `chunksize` con un executemany del driver
+              (PyMySQL lo convierte en INSERT de muchas filas)
+            - 'load_data': MySQL LOAD DATA LOCAL INFILE desde un CSV
+              temporal. Requiere MYSQL_LOCAL_INFILE=true (y local_infile
+              habilitado en el servidor); si no, o en otro motor, usa 'lotes'
+
+        Con 'lotes' y 'load_data' cada lote se confirma por separado: una
+        falla a mitad de la carga deja los lotes anteriores guardados.
+
         Args:
             df: DataFrame a guardar
             table_name: Nombre de la tabla destino
-            session: Sesión de SQLAlchemy
+            session: Sesión de SQLAlchemy (se escribe en su motor, el primario)
             if_exists: Comportamiento si la tabla existe ('fail', 'replace', 'append')
+            modo: 'to_sql', 'lotes' o 'load_data'
+            chunksize: Filas por lote
+            upsert: Actualizar las filas cuya clave ya existe (MySQL: ON
+                DUPLICATE KEY UPDATE; SQLite: ON CONFLICT sobre la clave
+                primaria o única). Sólo con modo 'lotes', sobre una tabla
+                que ya existe con clave primaria o única, y no con
+                if_exists='replace' (pandas la recrearía sin claves)
+            hilos: Lotes escritos en paralelo, cada uno con su conexión
+                (SQLite admite un solo escritor: ahí siempre es 1)
+
+        Returns:
+            Cantidad de filas escritas
         """
-        df.to_sql(
-            table_name,
-            session.bind,
-            if_exists=if_exists,
-            index=False
-        )
\ No newline at end of file
+        if modo not in MODOS:
+            raise ValueError(f"modo inválido: {modo!r} (opciones: {', '.join(MODOS)})")
+        if upsert and modo != 'lotes':
+            raise ValueError("upsert sólo se admite con modo='lotes'")
+        if upsert and if_exists == 'replace':
+            raise ValueError("upsert no se admite con if_exists='replace'")
+
+        engine = session.bind
+        claves = _clave_upsert(engine, table_name) if upsert else None
+        if modo == 'to_sql':
+            df.to_sql(
+                table_name,
+                engine,
+                if_exists=if_exists,
+                index=False
+            )
+            return len(df)
+
+        # pandas crea (o reemplaza) la tabla con sus tipos; los datos van aparte
+        df.head(0).to_sql(table_name, engine, if_exists=if_exists, index=False)
+        if df.empty:
+            return 0
+
+        if modo == 'load_data':
+            if engine.dialect.name == 'mysql' and MySQLConfig.LOCAL_INFILE:
+                return _cargar_load_data(engine, df, table_name, chunksize)
+            logger.warning("LOAD DATA LOCAL INFILE no disponible para %s: se inserta por lotes", engine.dialect.name)
+
+        tabla = Table(table_name, MetaData(), autoload_with=engine)
+        columnas = list(df.columns)
+        sql, orden, procesadores = _sentencia_insert(tabla, columnas, claves, engine.dialect)
+        if engine.dialect.name == 'sqlite':
+            hilos = 1
+
+        def escribir(lote):
+            with engine.begin() as conexion:
+                conexion.exec_driver_sql(sql, _registros(lote, orden, procesadores))
+            return len(lote)
+
+        lotes = (df.iloc[inicio:inicio + chunksize] for inicio in range(0, len(df), chunksize))
+        if hilos <= 1:
+            return sum(map(escribir, lotes))
+        with ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="storage") as pool:
+            return sum(pool.map(escribir, lotes))
+
+
+# ---------------------------------------------------
+# CARGA POR LOTES
+# ---------------------------------------------------
+
+def _clave_upsert(engine, table_name: str) -> list:
+    """
+    Columnas de la clave primaria de la tabla o, si no tiene, de su
+    primera restricción (o índice) única. Sin tabla o sin clave el upsert
+    sería un INSERT común: se rechaza.
+    """
+    inspector = inspect(engine)
+    if not inspector.has_table(table_name):
+        raise ValueError(f"upsert necesita que la tabla {table_name} ya exista con clave primaria o única")
+
+    claves = inspector.get_pk_constraint(table_name).get("constrained_columns")
+    if claves:
+        return claves
+    unicas = [u["column_names"] for u in inspector.get_unique_constraints(table_name)]
+    unicas += [i["column_names"] for i in inspector.get_indexes(table_name) if i.get("unique")]
+    for columnas in unicas:
+        if columnas and all(columnas):
+            return columnas
+    raise ValueError(f"upsert necesita una clave primaria o única en {table_name}")
+
+
+def _registros(lote: pd.DataFrame, orden: list, procesadores: dict) -> list:
+    """
+    Filas como tuplas en el orden de los parámetros, con NaN / NaT como
+    None y los procesadores de tipo del dialecto aplicados (p. ej. fechas
+    a texto en SQLite)
+    """
+    lote = lote[orden]
+    lote = lote.astype(object).where(lote.notna(), None)
+    columnas = [
+        [procesadores[c](v) for v in lote[c]] if c in procesadores else lote[c].tolist()
+        for c in orden
+    ]
+    return list(zip(*columnas))
+
+
+def _sentencia_insert(tabla: Table, columnas: list, claves: list | None, dialecto):
+    """
+    SQL del driver para el INSERT (o, con `claves`, upsert) de las
+    columnas del DataFrame. Se compila una vez y se ejecuta con tuplas:
+    armar dicts y procesarlos con SQLAlchemy fila por fila cuesta más que
+    la inserción.
+
+    Returns:
+        (sql, columnas en el orden de los parámetros,
+         {columna: procesador de tipo} para las que lo necesitan)
+    """
+    compilado = _insert_dialecto(tabla, columnas, claves, dialecto.name).compile(
+        dialect=dialecto, column_keys=columnas
+    )
+    if not compilado.positional:
+        raise ValueError(f"paramstyle no soportado: {dialecto.paramstyle}")
+    orden = list(compilado.positiontup)
+    procesadores = {}
+    for columna in orden:
+        procesador = tabla.c[columna].type.dialect_impl(dialecto).bind_processor(dialecto)
+        if procesador is not None:
+            procesadores[columna] = procesador
+    return str(compilado), orden, procesadores
+
+
+def _insert_dialecto(tabla: Table, columnas: list, claves: list | None, dialecto: str):
+    if not claves:
+        return tabla.insert()
+
+    if dialecto == 'mysql':
+        from sqlalchemy.dialects.mysql import insert
+        sentencia = insert(tabla)
+        return sentencia.on_duplicate_key_update({c: sentencia.inserted[c] for c in columnas})
+
+    if dialecto == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+        sentencia = insert(tabla)
+        actualizar = {c: sentencia.excluded[c] for c in columnas if c not in claves}
+        if not actualizar:
+            return sentencia.on_conflict_do_nothing(index_elements=claves)
+        return sentencia.on_conflict_do_update(index_elements=claves, set_=actualizar)
+
+    raise ValueError(f"upsert no soportado para {dialecto}")
+
+
+# ---------------------------------------------------
+# MYSQL: LOAD DATA LOCAL INFILE
+# ---------------------------------------------------
+
+def _cargar_load_data(engine, df: pd.DataFrame, table_name: str, chunksize: int) -> int:
+    """
+    Escribe el DataFrame a un CSV temporal (de a `chunksize` filas) y lo
+    carga con una sola sentencia LOAD DATA LOCAL INFILE.
+    """
+    preparador = engine.dialect.identifier_preparer
+    columnas = ", ".join(preparador.quote(c) for c in df.columns)
+    descriptor, ruta = tempfile.mkstemp(suffix=".csv")
+    os.close(descriptor)
+    try:
+        for inicio in range(0, len(df), chunksize):
+            _a_csv(df.iloc[inicio:inicio + chunksize]).to_csv(
+                ruta, mode='a', header=False, index=False, na_rep='\\N',
+                quoting=csv.QUOTE_MINIMAL, lineterminator='\n',
+            )
+        with engine.begin() as conexion:
+            resultado = conexion.exec_driver_sql(
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE {preparador.quote(table_name)} "
+                "CHARACTER SET utf8mb4 "
+                "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '\\\\' "
+                f"LINES TERMINATED BY '\\n' ({columnas})",
+                (ruta,),
+            )
+            return resultado.rowcount
+    finally:
+        os.remove(ruta)
+
+
+def _a_csv(lote: pd.DataFrame) -> pd.DataFrame:
+    """Adapta un lote a lo que LOAD DATA espera (escapes, booleanos)"""
+    lote = lote.copy()
+    for columna in lote.columns:
+        serie = lote[columna]
+        if serie.dtype == bool:
+            lote[columna] = serie.astype(int)
+        elif serie.dtype == object:
+            # Con ESCAPED BY '\\' la barra es un escape: se duplica
+            lote[columna] = serie.map(lambda v: v.replace('\\', '\\\\') if isinstance(v, str) else v)
+    return lote
@@ -0,0 +1,33 @@
+class Sumidero:
+    """
+    Destino de escritura no seekable para generar archivos en streaming
+    (zip, Parquet, Arrow): acumula lo escrito hasta que se drena.
+    """
+
+    def __init__(self):
+        self._partes = []
+        self.tamano = 0
+        self.posicion = 0
+        self.closed = False
+
+    def write(self, datos):
+        datos = bytes(datos)
+        self._partes.append(datos)
+        self.tamano += len(datos)
+        self.posicion += len(datos)
+        return len(datos)
+
+    def tell(self):
+        return self.posicion
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drenar(self) -> bytes:
+        datos = b"".join(self._partes)
+        self._partes.clear()
+        self.tamano = 0
+        return datos
@@ -0,0 +1,214 @@
+import math
+import numbers
+import re
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from xml.sax.saxutils import escape, quoteattr
+
+from src.utils.stream_utils import Sumidero
+
+# ---------------------------------------------------
+# ESCRITOR XLSX EN STREAMING
+# ---------------------------------------------------
+#
+# openpyxl (incluso en modo write-only) necesita terminar `wb.save()`
+# antes de entregar el primer byte. Acá el .xlsx se arma directamente
+# como un zip sobre un destino no seekable: cada hoja se escribe fila a
+# fila y los bytes comprimidos se van entregando a medida que se generan,
+# así la memoria no depende de la cantidad de filas.
+
+TAMANO_BLOQUE = 64 * 1024
+
+_CARACTERES_INVALIDOS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+_CARACTERES_HOJA = re.compile(r"[\[\]\:\*\?\/\\]")
+
+_NS_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_NS_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_NS_PKG_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+_TIPO_HOJA = "application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"
+
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    f'<styleSheet xmlns="{_NS_MAIN}">'
+    '<numFmts count="2"><numFmt numFmtId="164" formatCode="yyyy-mm-dd"/>'
+    '<numFmt numFmtId="165" formatCode="yyyy-mm-dd h:mm:ss"/></numFmts>'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="4"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="165" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+# Índices de cellXfs con formato de fecha (mismos formatos que usa openpyxl)
+_ESTILO_FECHA = ' s="2"'
+_ESTILO_FECHA_HORA = ' s="3"'
+
+# Las fechas van como número de serie de Excel (días desde 1899-12-30)
+_EPOCA_EXCEL = datetime(1899, 12, 30)
+
+
+def _nombre_hoja(nombre: str, usados: set) -> str:
+    base = _CARACTERES_HOJA.sub("_", str(nombre or "Hoja")).strip("'")[:31] or "Hoja"
+    candidato, n = base, 1
+    while candidato.lower() in usados:
+        n += 1
+        sufijo = f" ({n})"
+        candidato = base[:31 - len(sufijo)] + sufijo
+    usados.add(candidato.lower())
+    return candidato
+
+
+def _celda(valor, estilo: str = "") -> str:
+    if type(valor).__module__ == "numpy" and hasattr(valor, "item"):
+        valor = valor.item()  # np.int64, np.float64, np.bool_ de las filas de un DataFrame
+    if valor is None:
+        return "<c/>"
+    if isinstance(valor, bool):
+        return f'<c t="b"{estilo}><v>{int(valor)}</v></c>'
+    if isinstance(valor, Decimal):
+        return f"<c{estilo}><v>{valor}</v></c>" if valor.is_finite() else "<c/>"
+    if isinstance(valor, numbers.Real):
+        return f"<c{estilo}><v>{valor}</v></c>" if math.isfinite(valor) else "<c/>"
+    if isinstance(valor, datetime):
+        if valor != valor:  # NaT de pandas
+            return "<c/>"
+        return f'<c{estilo or _ESTILO_FECHA_HORA}><v>{_serial(valor)}</v></c>'
+    if isinstance(valor, date):
+        return f'<c{estilo or _ESTILO_FECHA}><v>{_serial(valor)}</v></c>'
+    texto = escape(_CARACTERES_INVALIDOS.sub("", str(valor)))
+    return f'<c t="inlineStr"{estilo}><is><t xml:space="preserve">{texto}</t></is></c>'
+
+
+def _serial(valor: date):
+    """Número de serie de Excel; la zona horaria se descarta, como en openpyxl"""
+    if not isinstance(valor, datetime):
+        return (valor - _EPOCA_EXCEL.date()).days
+    delta = valor.replace(tzinfo=None) - _EPOCA_EXCEL
+    return delta.days + delta.seconds / 86400 + delta.microseconds / 86_400_000_000
+
+
+def _fila(numero: int, valores, estilo: str = "") -> str:
+    return f'<row r="{numero}">' + "".join(_celda(v, estilo) for v in valores) + "</row>"
+
+
+# ---------------------------------------------------
+# GENERADOR PRINCIPAL
+# ---------------------------------------------------
+
+def generar_xlsx(hojas, tamano_bloque: int = TAMANO_BLOQUE):
+    """
+    Genera un .xlsx en bloques de bytes, listo para `StreamingResponse`.
+
+    Args:
+        hojas: iterable de (nombre, encabezados, filas); `filas` puede ser
+            cualquier iterable (p. ej. un cursor del lado del servidor)
+        tamano_bloque: bytes a acumular antes de entregar un bloque
+
+    Yields:
+        bytes del archivo comprimido
+    """
+    sumidero = Sumidero()
+    nombres = []
+    usados = set()
+
+    with zipfile.ZipFile(sumidero, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for indice, (nombre, encabezados, filas) in enumerate(hojas, start=1):
+            nombres.append(_nombre_hoja(nombre, usados))
+
+            with zf.open(f"xl/worksheets/sheet{indice}.xml", mode="w", force_zip64=True) as hoja:
+                hoja.write(
+                    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                    f'<worksheet xmlns="{_NS_MAIN}"><sheetData>'.encode()
+                )
+                numero = 0
+                if encabezados:
+                    numero += 1
+                    hoja.write(_fila(numero, encabezados, ' s="1"').encode())
+
+                buffer = []
+                for fila in filas:
+                    numero += 1
+                    buffer.append(_fila(numero, fila))
+                    if len(buffer) >= 500:
+                        hoja.write("".join(buffer).encode())
+                        buffer.clear()
+                        if sumidero.tamano >= tamano_bloque:
+                            yield sumidero.drenar()
+                if buffer:
+                    hoja.write("".join(buffer).encode())
+
+                hoja.write(b"</sheetData></worksheet>")
+
+            if sumidero.tamano >= tamano_bloque:
+                yield sumidero.drenar()
+
+        # Partes fijas del paquete: se escriben al final, cuando ya se
+        # conocen todas las hojas
+        zf.writestr("[Content_Types].xml", _content_types(len(nombres)))
+        zf.writestr("_rels/.rels", _rels_paquete())
+        zf.writestr("xl/workbook.xml", _workbook(nombres))
+        zf.writestr("xl/_rels/workbook.xml.rels", _rels_workbook(len(nombres)))
+        zf.writestr("xl/styles.xml", _STYLES)
+
+    yield sumidero.drenar()
+
+
+def _content_types(cantidad: int) -> str:
+    hojas = "".join(
+        f'<Override PartName="/xl/worksheets/sheet{i}.xml" ContentType="{_TIPO_HOJA}"/>'
+        for i in range(1, cantidad + 1)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/styles.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        f"{hojas}</Types>"
+    )
+
+
+def _rels_paquete() -> str:
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<Relationships xmlns="{_NS_PKG_REL}">'
+        f'<Relationship Id="rId1" Type="{_NS_REL}/officeDocument" Target="xl/workbook.xml"/>'
+        "</Relationships>"
+    )
+
+
+def _workbook(nombres: list) -> str:
+    hojas = "".join(
+        f'<sheet name={quoteattr(nombre)} sheetId="{i}" r:id="rId{i}"/>'
+        for i, nombre in enumerate(nombres, start=1)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<workbook xmlns="{_NS_MAIN}" xmlns:r="{_NS_REL}">'
+        f"<sheets>{hojas}</sheets></workbook>"
+    )
+
+
+def _rels_workbook(cantidad: int) -> str:
+    hojas = "".join(
+        f'<Relationship Id="rId{i}" Type="{_NS_REL}/worksheet" Target="worksheets/sheet{i}.xml"/>'
+        for i in range(1, cantidad + 1)
+    )
+    estilos = (
+        f'<Relationship Id="rId{cantidad + 1}" Type="{_NS_REL}/styles" Target="styles.xml"/>'
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<Relationships xmlns="{_NS_PKG_REL}">{hojas}{estilos}</Relationships>'
+    )